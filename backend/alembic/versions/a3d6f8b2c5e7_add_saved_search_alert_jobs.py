@@ -0,0 +1,73 @@
+"""add saved search alert jobs
+
+Revision ID: a3d6f8b2c5e7
+Revises: f4c8a2e6b1d9
+Create Date: 2026-05-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d6f8b2c5e7"
+down_revision: Union[str, Sequence[str], None] = "f4c8a2e6b1d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "saved_search_alert_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("saved_search_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("leased_by", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error_code", sa.String(), nullable=True),
+        sa.Column("last_error_message", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_saved_search_alert_jobs_saved_search_id",
+        "saved_search_alert_jobs",
+        ["saved_search_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_saved_search_alert_jobs_status_available_at",
+        "saved_search_alert_jobs",
+        ["status", "available_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ux_saved_search_alert_jobs_open",
+        "saved_search_alert_jobs",
+        ["saved_search_id"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'leased')"),
+        sqlite_where=sa.text("status IN ('pending', 'leased')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_saved_search_alert_jobs_open", table_name="saved_search_alert_jobs")
+    op.drop_index("ix_saved_search_alert_jobs_status_available_at", table_name="saved_search_alert_jobs")
+    op.drop_index("ix_saved_search_alert_jobs_saved_search_id", table_name="saved_search_alert_jobs")
+    op.drop_table("saved_search_alert_jobs")
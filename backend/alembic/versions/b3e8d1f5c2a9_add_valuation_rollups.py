@@ -0,0 +1,46 @@
+"""add valuation rollups
+
+Revision ID: b3e8d1f5c2a9
+Revises: a7c9f2d4e6b1
+Create Date: 2026-05-02 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8d1f5c2a9"
+down_revision: Union[str, Sequence[str], None] = "a7c9f2d4e6b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "valuation_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("valuation_key", sa.String(length=255), nullable=False),
+        sa.Column("bucket_date", sa.Date(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("recent_prices_json", sa.JSON(), nullable=False),
+        sa.Column("condition_counts_json", sa.JSON(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("valuation_key", "bucket_date", name="uq_valuation_rollups_key_bucket"),
+    )
+    op.create_index("ix_valuation_rollups_valuation_key", "valuation_rollups", ["valuation_key"], unique=False)
+    op.create_index("ix_valuation_rollups_bucket_date", "valuation_rollups", ["bucket_date"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_valuation_rollups_bucket_date", table_name="valuation_rollups")
+    op.drop_index("ix_valuation_rollups_valuation_key", table_name="valuation_rollups")
+    op.drop_table("valuation_rollups")
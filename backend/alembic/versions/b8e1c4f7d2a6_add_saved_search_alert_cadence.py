@@ -0,0 +1,51 @@
+"""add saved search alert cadence
+
+Revision ID: b8e1c4f7d2a6
+Revises: a3d6f8b2c5e7
+Create Date: 2026-05-20 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e1c4f7d2a6"
+down_revision: Union[str, Sequence[str], None] = "a3d6f8b2c5e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "saved_searches",
+        sa.Column("next_alert_check_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "saved_searches",
+        sa.Column("alert_check_interval_seconds", sa.Integer(), nullable=True),
+    )
+    op.create_index(
+        "ix_saved_searches_next_alert_check_at",
+        "saved_searches",
+        ["next_alert_check_at"],
+        unique=False,
+        postgresql_where=sa.text("alerts_enabled"),
+        sqlite_where=sa.text("alerts_enabled"),
+    )
+    # Keep existing searches on the old fixed 8 hour schedule until their next check; rows left
+    # null are simply due on the next scheduler tick.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "UPDATE saved_searches "
+            "SET next_alert_check_at = last_alert_checked_at + interval '8 hours' "
+            "WHERE last_alert_checked_at IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_saved_searches_next_alert_check_at", table_name="saved_searches")
+    op.drop_column("saved_searches", "alert_check_interval_seconds")
+    op.drop_column("saved_searches", "next_alert_check_at")
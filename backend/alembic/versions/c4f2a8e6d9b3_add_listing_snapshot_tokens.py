@@ -0,0 +1,47 @@
+"""add listing snapshot tokens
+
+Revision ID: c4f2a8e6d9b3
+Revises: b3e8d1f5c2a9
+Create Date: 2026-05-06 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f2a8e6d9b3"
+down_revision: Union[str, Sequence[str], None] = "b3e8d1f5c2a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listing_snapshot_tokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("snapshot_id", sa.Integer(), nullable=False),
+        sa.Column("token", sa.String(length=64), nullable=False),
+        sa.Column("observed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_listing_snapshot_tokens_snapshot_id",
+        "listing_snapshot_tokens",
+        ["snapshot_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_listing_snapshot_tokens_token_observed",
+        "listing_snapshot_tokens",
+        ["token", "observed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listing_snapshot_tokens_token_observed", table_name="listing_snapshot_tokens")
+    op.drop_index("ix_listing_snapshot_tokens_snapshot_id", table_name="listing_snapshot_tokens")
+    op.drop_table("listing_snapshot_tokens")
@@ -0,0 +1,41 @@
+"""add listing snapshot valuation features
+
+Revision ID: d7a1c5e9f3b2
+Revises: c4f2a8e6d9b3
+Create Date: 2026-05-10 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a1c5e9f3b2"
+down_revision: Union[str, Sequence[str], None] = "c4f2a8e6d9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FEATURE_COLUMNS = (
+    ("features_version", sa.Integer()),
+    ("normalized_condition", sa.String(length=32)),
+    ("query_tokens_json", sa.JSON()),
+    ("text_tokens_json", sa.JSON()),
+    ("profile_model_year", sa.String(length=8)),
+    ("profile_variant", sa.String(length=32)),
+    ("profile_storage", sa.String(length=16)),
+    ("profile_lock_state", sa.String(length=32)),
+    ("profile_condition_bucket", sa.String(length=32)),
+)
+
+
+def upgrade() -> None:
+    for name, column_type in FEATURE_COLUMNS:
+        op.add_column("listing_snapshots", sa.Column(name, column_type, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(FEATURE_COLUMNS):
+        op.drop_column("listing_snapshots", name)
@@ -0,0 +1,41 @@
+"""add listing snapshot observation dedupe columns
+
+Revision ID: e2b9d4f7a1c6
+Revises: d7a1c5e9f3b2
+Create Date: 2026-05-12 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b9d4f7a1c6"
+down_revision: Union[str, Sequence[str], None] = "d7a1c5e9f3b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("listing_snapshots", sa.Column("observation_key", sa.String(length=64), nullable=True))
+    op.add_column(
+        "listing_snapshots",
+        sa.Column("observation_count", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column("listing_snapshots", sa.Column("last_observed_at", sa.DateTime(timezone=True), nullable=True))
+    # Older rows keep a NULL key, which unique indexes do not compare.
+    op.create_index(
+        "ux_listing_snapshots_observation_key",
+        "listing_snapshots",
+        ["observation_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_listing_snapshots_observation_key", table_name="listing_snapshots")
+    op.drop_column("listing_snapshots", "last_observed_at")
+    op.drop_column("listing_snapshots", "observation_count")
+    op.drop_column("listing_snapshots", "observation_key")
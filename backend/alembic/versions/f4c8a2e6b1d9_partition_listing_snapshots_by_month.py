@@ -0,0 +1,125 @@
+"""partition listing snapshots by observed month
+
+Revision ID: f4c8a2e6b1d9
+Revises: e2b9d4f7a1c6
+Create Date: 2026-05-14 00:00:00.000000
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c8a2e6b1d9"
+down_revision: Union[str, Sequence[str], None] = "e2b9d4f7a1c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SNAPSHOT_INDEXES = (
+    ("ix_listing_snapshots_user_id", ["user_id"]),
+    ("ix_listing_snapshots_saved_search_id", ["saved_search_id"]),
+    ("ix_listing_snapshots_source", ["source"]),
+    ("ix_listing_snapshots_listing_fingerprint", ["listing_fingerprint"]),
+    ("ix_listing_snapshots_query", ["query"]),
+    ("ix_listing_snapshots_valuation_key", ["valuation_key"]),
+    ("ix_listing_snapshots_observed_at", ["observed_at"]),
+    (
+        "ix_listing_snapshots_saved_search_listing_observed",
+        ["saved_search_id", "listing_fingerprint", "observed_at"],
+    ),
+    ("ix_listing_snapshots_valuation_key_observed", ["valuation_key", "observed_at"]),
+)
+MONTHS_AHEAD = 3
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _create_partition(month: date) -> None:
+    name = f"listing_snapshots_p{month.year:04d}_{month.month:02d}"
+    lower = datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+    upper = datetime.combine(_add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+    op.execute(
+        f"CREATE TABLE {name} PARTITION OF listing_snapshots "
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+    # Unique indexes on a partitioned table must include observed_at. observation_key already
+    # pins the day, so one unique index per partition keeps keys globally unique.
+    op.execute(f"CREATE UNIQUE INDEX ux_{name}_observation_key ON {name} (observation_key)")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # Partitioning is Postgres-only; other databases keep the plain table and the retention
+        # job deletes expired rows instead of dropping partitions.
+        return
+
+    op.execute("ALTER TABLE listing_snapshots RENAME TO listing_snapshots_unpartitioned")
+    op.execute(
+        "ALTER TABLE listing_snapshots_unpartitioned "
+        "RENAME CONSTRAINT listing_snapshots_pkey TO listing_snapshots_unpartitioned_pkey"
+    )
+    op.drop_index("ux_listing_snapshots_observation_key", table_name="listing_snapshots_unpartitioned")
+    for name, _ in SNAPSHOT_INDEXES:
+        op.drop_index(name, table_name="listing_snapshots_unpartitioned")
+
+    op.execute(
+        "CREATE TABLE listing_snapshots (LIKE listing_snapshots_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (observed_at)"
+    )
+    op.execute("ALTER TABLE listing_snapshots ADD PRIMARY KEY (id, observed_at)")
+    op.execute("ALTER SEQUENCE listing_snapshots_id_seq OWNED BY listing_snapshots.id")
+    for name, columns in SNAPSHOT_INDEXES:
+        op.create_index(name, "listing_snapshots", columns, unique=False)
+
+    oldest = bind.execute(sa.text("SELECT min(observed_at) FROM listing_snapshots_unpartitioned")).scalar()
+    current_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = oldest.astimezone(timezone.utc).date().replace(day=1) if oldest is not None else current_month
+    last_month = _add_months(current_month, MONTHS_AHEAD)
+    while month <= last_month:
+        _create_partition(month)
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE listing_snapshots_default PARTITION OF listing_snapshots DEFAULT")
+    op.execute(
+        "CREATE UNIQUE INDEX ux_listing_snapshots_default_observation_key "
+        "ON listing_snapshots_default (observation_key)"
+    )
+
+    op.execute("INSERT INTO listing_snapshots SELECT * FROM listing_snapshots_unpartitioned")
+    op.execute("DROP TABLE listing_snapshots_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE listing_snapshots RENAME TO listing_snapshots_partitioned")
+    op.execute(
+        "ALTER TABLE listing_snapshots_partitioned "
+        "RENAME CONSTRAINT listing_snapshots_pkey TO listing_snapshots_partitioned_pkey"
+    )
+    for name, _ in SNAPSHOT_INDEXES:
+        op.drop_index(name, table_name="listing_snapshots_partitioned")
+
+    op.execute("CREATE TABLE listing_snapshots (LIKE listing_snapshots_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE listing_snapshots ADD PRIMARY KEY (id)")
+    op.execute("ALTER SEQUENCE listing_snapshots_id_seq OWNED BY listing_snapshots.id")
+    for name, columns in SNAPSHOT_INDEXES:
+        op.create_index(name, "listing_snapshots", columns, unique=False)
+    op.create_index(
+        "ux_listing_snapshots_observation_key",
+        "listing_snapshots",
+        ["observation_key"],
+        unique=True,
+    )
+
+    op.execute("INSERT INTO listing_snapshots SELECT * FROM listing_snapshots_partitioned")
+    op.execute("DROP TABLE listing_snapshots_partitioned CASCADE")
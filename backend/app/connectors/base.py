@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Any
+
 from app.models.listing import Listing, SearchSort
 
 
@@ -14,3 +16,24 @@ class MarketplaceConnector(ABC):
         sort: SearchSort = "relevance",
     ) -> list[Listing]:
         raise NotImplementedError
+
+    async def search_page(
+        self,
+        query: str,
+        limit: int = 20,
+        *,
+        sort: SearchSort = "relevance",
+        cursor: Any = None,
+        **kwargs,
+    ) -> tuple[list[Listing], Any | None]:
+        # Connectors without native paging treat the cursor as an offset, refetch up to
+        # it and slice. Returns the page plus the cursor for the next one (None when done).
+        offset = max(0, int(cursor or 0))
+        window = offset + max(1, int(limit))
+        listings = await self.search(query=query, limit=window, sort=sort, **kwargs)
+        next_cursor = window if len(listings) >= window else None
+        return listings[offset:window], next_cursor
+
+    def resume_cursor(self, window_limit: int, returned: int) -> Any | None:
+        # Cursor for continuing after a plain search(limit=window_limit) call.
+        return window_limit if returned >= window_limit else None
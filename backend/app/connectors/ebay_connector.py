@@ -1,10 +1,10 @@
 import base64
 import logging
 import time
-
-import httpx
+from typing import Any
 
 from app.connectors.base import MarketplaceConnector
+from app.core.http_client import get_http_client
 from app.core.time_utils import normalize_timestamp_to_utc_iso
 from app.core.config import settings
 from app.models.listing import Listing, Money, SearchSort
@@ -54,10 +54,9 @@ class EbayConnector(MarketplaceConnector):
             "scope": self.scope,
         }
 
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(token_url, headers=headers, data=data)
-            resp.raise_for_status()
-            payload = resp.json()
+        resp = await get_http_client("ebay").post(token_url, headers=headers, data=data, timeout=20)
+        resp.raise_for_status()
+        payload = resp.json()
 
         token = payload.get("access_token")
         expires_in = int(payload.get("expires_in", 0))
@@ -139,13 +138,16 @@ class EbayConnector(MarketplaceConnector):
         limit: int,
         *,
         sort: SearchSort,
-    ) -> list[Listing]:
+        offset: int = 0,
+    ) -> tuple[list[Listing], bool]:
         token = await self._get_access_token()
         url = f"{self._api_base()}/buy/browse/v1/item_summary/search"
         params = {
             "q": query,
             "limit": str(max(1, min(limit, 200))),
         }
+        if offset > 0:
+            params["offset"] = str(offset)
         if sort == "newest":
             params["sort"] = "newlyListed"
         headers = {
@@ -154,10 +156,9 @@ class EbayConnector(MarketplaceConnector):
             "Accept-Language": self.accept_language,
         }
 
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.get(url, params=params, headers=headers)
-            resp.raise_for_status()
-            payload = resp.json()
+        resp = await get_http_client("ebay").get(url, params=params, headers=headers, timeout=20)
+        resp.raise_for_status()
+        payload = resp.json()
 
         items = payload.get("itemSummaries") or []
         results: list[Listing] = []
@@ -165,7 +166,7 @@ class EbayConnector(MarketplaceConnector):
             listing = self._to_listing(item)
             if listing is not None:
                 results.append(listing)
-        return results[:limit]
+        return results[:limit], bool(payload.get("next"))
 
     async def search(
         self,
@@ -179,7 +180,36 @@ class EbayConnector(MarketplaceConnector):
             return []
 
         try:
-            return await self._search_api(query=query, limit=limit, sort=sort)
+            results, _ = await self._search_api(query=query, limit=limit, sort=sort)
+            return results
         except Exception as exc:
             logger.warning("eBay API search failed, returning no eBay results: %s", exc)
             return []
+
+    async def search_page(
+        self,
+        query: str,
+        limit: int = 20,
+        *,
+        sort: SearchSort = "relevance",
+        cursor: Any = None,
+        **kwargs,
+    ) -> tuple[list[Listing], Any | None]:
+        if not self.client_id or not self.client_secret:
+            logger.warning("eBay credentials missing, returning no eBay results")
+            return [], None
+
+        # The Browse API pages natively, so the cursor is the item offset.
+        offset = max(0, int(cursor or 0))
+        page_limit = max(1, min(int(limit), 200))
+        try:
+            results, has_more = await self._search_api(
+                query=query,
+                limit=page_limit,
+                sort=sort,
+                offset=offset,
+            )
+        except Exception as exc:
+            logger.warning("eBay API search failed, returning no eBay results: %s", exc)
+            return [], None
+        return results, (offset + page_limit if has_more else None)
@@ -15,6 +15,7 @@ from app.connectors.vehicle_metadata import (
     extract_vehicle_mileage_km,
     looks_like_automotive_listing,
 )
+from app.connectors.facebook_marketplace.context_pool import BrowserContextPool
 from app.connectors.facebook_marketplace.errors import (
     FacebookConnectorError,
     FacebookConnectorErrorCode,
@@ -361,6 +362,11 @@ class FacebookMarketplaceConnector:
         self._playwright_driver: Any | None = None
         self._browser: Any | None = None
         self._browser_lock = asyncio.Lock()
+        self._context_pool = BrowserContextPool(
+            max_contexts=int(settings.MARKETLY_FACEBOOK_CONTEXT_POOL_MAX_CONTEXTS),
+            idle_seconds=float(settings.MARKETLY_FACEBOOK_CONTEXT_POOL_IDLE_SECONDS),
+            max_uses=int(settings.MARKETLY_FACEBOOK_CONTEXT_POOL_MAX_USES),
+        )
 
     async def _get_browser(self):
         async with self._browser_lock:
@@ -374,6 +380,7 @@ class FacebookMarketplaceConnector:
             return self._browser
 
     async def _close_browser_locked(self) -> None:
+        await self._context_pool.clear()
         if self._browser is not None:
             try:
                 await self._browser.close()
@@ -518,22 +525,30 @@ class FacebookMarketplaceConnector:
         )
 
         browser = await self._get_browser()
-        context = await browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/122.0.0.0 Safari/537.36"
-            ),
-            locale="en-CA",
-        )
-        context.set_default_timeout(self.timeout_ms)
+        pool_key = self._context_pool_key(request)
+        pooled = None
+        context = None
+        page = None
+        succeeded = False
 
         try:
-            if request.auth_mode == "cookie":
-                if request.cookie_payload is not None:
-                    await self._load_cookie_payload(context, request.cookie_payload)
-                else:
-                    await self._load_cookies(context, request.cookie_path)
+            if pool_key is not None:
+                pooled, reused = await self._context_pool.acquire(
+                    pool_key,
+                    browser=browser,
+                    factory=lambda: self._new_authenticated_context(browser, request),
+                )
+                context = pooled.context
+                self._log(
+                    "facebook_context_acquired",
+                    reused=reused,
+                    uses=pooled.uses,
+                    idle_contexts=self._context_pool.idle_count(),
+                )
+            else:
+                context = await self._new_context(browser)
+                if request.auth_mode == "cookie":
+                    await self._load_request_cookies(context, request)
 
             page = await context.new_page()
             await self._load_search_results_page(
@@ -592,6 +607,7 @@ class FacebookMarketplaceConnector:
                 load_strategy=load_strategy,
                 elapsed_ms=int((time.perf_counter() - started_at) * 1000),
             )
+            succeeded = True
             return normalized
         except Exception as exc:
             self._log(
@@ -609,10 +625,58 @@ class FacebookMarketplaceConnector:
                 await self._invalidate_browser()
             raise
         finally:
+            if pooled is not None:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                # Only clean runs go back to the pool; a challenged or broken session
+                # should start from a fresh context next time.
+                await self._context_pool.release(pooled, reusable=succeeded)
+            elif context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+    async def _new_context(self, browser):
+        context = await browser.new_context(
+            user_agent=(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/122.0.0.0 Safari/537.36"
+            ),
+            locale="en-CA",
+        )
+        context.set_default_timeout(self.timeout_ms)
+        return context
+
+    async def _new_authenticated_context(self, browser, request: FacebookSearchRequest):
+        context = await self._new_context(browser)
+        try:
+            await self._load_request_cookies(context, request)
+        except Exception:
             try:
                 await context.close()
             except Exception:
                 pass
+            raise
+        return context
+
+    async def _load_request_cookies(self, context, request: FacebookSearchRequest) -> None:
+        if request.cookie_payload is not None:
+            await self._load_cookie_payload(context, request.cookie_payload)
+        else:
+            await self._load_cookies(context, request.cookie_path)
+
+    def _context_pool_key(self, request: FacebookSearchRequest) -> str | None:
+        if not self._context_pool.enabled:
+            return None
+        if request.auth_mode != "cookie" or request.cookie_payload is None:
+            return None
+        fingerprint = (request.credential_fingerprint_sha256 or "").strip()
+        return fingerprint or None
 
     def _build_search_url(self, request: FacebookSearchRequest) -> str:
         params: dict[str, Any] = {
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class PooledBrowserContext:
+    key: str
+    context: Any
+    browser: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+class BrowserContextPool:
+    def __init__(self, *, max_contexts: int, idle_seconds: float, max_uses: int) -> None:
+        self.max_contexts = max(0, int(max_contexts))
+        self.idle_seconds = max(1.0, float(idle_seconds))
+        self.max_uses = max(1, int(max_uses))
+        self._idle: dict[str, list[PooledBrowserContext]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_contexts > 0
+
+    def idle_count(self) -> int:
+        return sum(len(entries) for entries in self._idle.values())
+
+    async def acquire(
+        self,
+        key: str,
+        *,
+        browser: Any,
+        factory: Callable[[], Awaitable[Any]],
+    ) -> tuple[PooledBrowserContext, bool]:
+        stale: list[PooledBrowserContext] = []
+        reused: PooledBrowserContext | None = None
+        async with self._lock:
+            stale.extend(self._pop_expired_locked(time.monotonic()))
+            entries = self._idle.get(key, [])
+            while entries:
+                entry = entries.pop()
+                if entry.browser is browser and _browser_connected(browser):
+                    reused = entry
+                    break
+                stale.append(entry)
+            if not entries:
+                self._idle.pop(key, None)
+        await _close_entries(stale)
+
+        if reused is not None:
+            return reused, True
+        context = await factory()
+        return PooledBrowserContext(key=key, context=context, browser=browser), False
+
+    async def release(self, entry: PooledBrowserContext, *, reusable: bool) -> None:
+        entry.uses += 1
+        entry.last_used_at = time.monotonic()
+        to_close: list[PooledBrowserContext] = []
+        async with self._lock:
+            to_close.extend(self._pop_expired_locked(entry.last_used_at))
+            keep = (
+                reusable
+                and self.enabled
+                and entry.uses < self.max_uses
+                and _browser_connected(entry.browser)
+            )
+            if keep:
+                self._idle.setdefault(entry.key, []).append(entry)
+                # Chromium contexts are the dominant memory cost, so cap how many stay warm
+                # and drop the least recently used ones first.
+                while self.idle_count() > self.max_contexts:
+                    to_close.append(self._pop_least_recently_used_locked())
+            else:
+                to_close.append(entry)
+        await _close_entries(to_close)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            entries = [entry for bucket in self._idle.values() for entry in bucket]
+            self._idle.clear()
+        await _close_entries(entries)
+
+    def _pop_expired_locked(self, now: float) -> list[PooledBrowserContext]:
+        expired: list[PooledBrowserContext] = []
+        for key in list(self._idle):
+            kept = []
+            for entry in self._idle[key]:
+                if now - entry.last_used_at > self.idle_seconds:
+                    expired.append(entry)
+                else:
+                    kept.append(entry)
+            if kept:
+                self._idle[key] = kept
+            else:
+                self._idle.pop(key, None)
+        return expired
+
+    def _pop_least_recently_used_locked(self) -> PooledBrowserContext:
+        oldest_key = min(
+            self._idle,
+            key=lambda key: min(entry.last_used_at for entry in self._idle[key]),
+        )
+        bucket = self._idle[oldest_key]
+        oldest = min(bucket, key=lambda entry: entry.last_used_at)
+        bucket.remove(oldest)
+        if not bucket:
+            self._idle.pop(oldest_key, None)
+        return oldest
+
+
+def _browser_connected(browser: Any) -> bool:
+    try:
+        return bool(browser.is_connected())
+    except Exception:
+        return False
+
+
+async def _close_entries(entries: list[PooledBrowserContext]) -> None:
+    for entry in entries:
+        try:
+            await entry.context.close()
+        except Exception:
+            pass
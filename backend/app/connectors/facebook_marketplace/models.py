@@ -24,6 +24,7 @@ class FacebookSearchRequest(BaseModel):
     auth_mode: AuthMode = "guest"
     cookie_path: str = "secrets/fb_cookies.json"
     cookie_payload: Any | None = None
+    credential_fingerprint_sha256: str | None = Field(default=None, max_length=128)
     multi_source: bool = False
     ingest: bool = False
 
@@ -257,6 +257,7 @@ class FacebookUnifiedConnector(MarketplaceConnector):
         sort: SearchSort = "relevance",
         auth_mode: str | None = None,
         cookie_payload: object | None = None,
+        credential_fingerprint_sha256: str | None = None,
         latitude: float | None = None,
         longitude: float | None = None,
         radius_km: int | None = None,
@@ -327,6 +328,7 @@ class FacebookUnifiedConnector(MarketplaceConnector):
             auth_mode=effective_auth_mode,
             cookie_path=cookie_path,
             cookie_payload=cookie_payload,
+            credential_fingerprint_sha256=credential_fingerprint_sha256,
             multi_source=multi_source,
             latitude=latitude,
             longitude=longitude,
@@ -1,12 +1,17 @@
+import asyncio
+import functools
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Any, Iterable
 from urllib.parse import quote_plus, urljoin
 
-import httpx
 from bs4 import BeautifulSoup
 
 from app.connectors.base import MarketplaceConnector
 from app.connectors.vehicle_metadata import extract_vehicle_mileage_km
+from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.core.time_utils import parse_absolute_date_to_utc_iso, parse_relative_age_to_utc_iso
 from app.models.listing import Listing, Money, SearchSort
 
@@ -31,6 +36,194 @@ CANADA_PROVINCE_RE = re.compile(
     r"(?P<province>AB|BC|MB|NB|NL|NS|NT|NU|ON|PE|QC|SK|YT)\b"
 )
 
+# (score, listing_url, title, blob, image_urls)
+KijijiCandidate = tuple[int, str, str, str, list[str]]
+
+_parse_process_pool: ProcessPoolExecutor | None = None
+
+
+def _abs_url(href: str) -> str:
+    return urljoin(BASE, href)
+
+
+def _token_score(query: str, title: str) -> int:
+    q_tokens = [t.lower() for t in query.split() if len(t) >= 2]
+    t = (title or "").lower()
+    return sum(1 for tok in q_tokens if tok in t)
+
+
+def _listing_url_from_href(href: str) -> str | None:
+    if not href:
+        return None
+    if href.startswith("http"):
+        if "kijiji.ca" not in href:
+            return None
+        path = href.replace(BASE, "")
+        full_url = href
+    else:
+        path = href
+        full_url = _abs_url(href)
+    if not LISTING_HREF_RE.match(path):
+        return None
+    return full_url
+
+
+def _extract_candidates_bs4(html: str, *, query: str, seen_urls: set[str]) -> list[KijijiCandidate]:
+    soup = BeautifulSoup(html, "lxml")
+    candidates: list[KijijiCandidate] = []
+
+    for anchor in soup.find_all("a", href=True):
+        full_url = _listing_url_from_href(anchor.get("href", ""))
+        if full_url is None or full_url in seen_urls:
+            continue
+
+        container = anchor
+        for _ in range(6):
+            if container.parent:
+                container = container.parent
+            else:
+                break
+
+        blob = container.get_text(" ", strip=True)
+        title = anchor.get_text(" ", strip=True) or ""
+        if not title or len(title) < 4:
+            heading = container.find(["h3", "h2"])
+            if heading:
+                title = heading.get_text(" ", strip=True) or title
+
+        title = (title or "").strip()
+        if not title:
+            continue
+
+        image_urls: list[str] = []
+        img = container.find("img")
+        if img:
+            src = img.get("src") or img.get("data-src")
+            if src:
+                image_urls = [src]
+
+        candidates.append((_token_score(query, title), full_url, title, blob, image_urls))
+        seen_urls.add(full_url)
+
+    return candidates
+
+
+def _lexbor_text(node) -> str:
+    # Mirrors BeautifulSoup's get_text(" ", strip=True): every text node is stripped on
+    # its own and empty ones are dropped before joining.
+    parts = []
+    for child in node.traverse(include_text=True):
+        if child.tag == "-text":
+            text = (child.text_content or "").strip()
+            if text:
+                parts.append(text)
+    return " ".join(parts)
+
+
+def _extract_candidates_selectolax(
+    html: str,
+    *,
+    query: str,
+    seen_urls: set[str],
+) -> list[KijijiCandidate]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    # BeautifulSoup leaves script/style strings out of get_text.
+    tree.strip_tags(["script", "style"])
+    candidates: list[KijijiCandidate] = []
+
+    for anchor in tree.css("a[href]"):
+        full_url = _listing_url_from_href(anchor.attributes.get("href") or "")
+        if full_url is None or full_url in seen_urls:
+            continue
+
+        container = anchor
+        for _ in range(6):
+            if container.parent is not None:
+                container = container.parent
+            else:
+                break
+
+        blob = _lexbor_text(container)
+        title = _lexbor_text(anchor)
+        if not title or len(title) < 4:
+            # css() also matches the node itself; find() in bs4 only looks at descendants.
+            headings = [
+                heading
+                for heading in container.css("h3, h2")
+                if heading.mem_id != container.mem_id
+            ]
+            if headings:
+                title = _lexbor_text(headings[0]) or title
+
+        title = (title or "").strip()
+        if not title:
+            continue
+
+        image_urls: list[str] = []
+        img = container.css_first("img")
+        if img is not None:
+            src = img.attributes.get("src") or img.attributes.get("data-src")
+            if src:
+                image_urls = [src]
+
+        candidates.append((_token_score(query, title), full_url, title, blob, image_urls))
+        seen_urls.add(full_url)
+
+    return candidates
+
+
+def extract_kijiji_candidates(
+    html: str,
+    *,
+    query: str,
+    seen_urls: Iterable[str] = (),
+    parser: str = "bs4",
+) -> list[KijijiCandidate]:
+    # Module-level and free of connector state so it can run in a worker process.
+    seen = set(seen_urls)
+    if parser == "selectolax":
+        return _extract_candidates_selectolax(html, query=query, seen_urls=seen)
+    return _extract_candidates_bs4(html, query=query, seen_urls=seen)
+
+
+def _get_parse_process_pool() -> ProcessPoolExecutor:
+    global _parse_process_pool
+    if _parse_process_pool is None:
+        workers = max(1, int(settings.MARKETLY_KIJIJI_PARSE_PROCESS_WORKERS))
+        _parse_process_pool = ProcessPoolExecutor(max_workers=workers)
+    return _parse_process_pool
+
+
+def shutdown_kijiji_parse_pool() -> None:
+    global _parse_process_pool
+    pool = _parse_process_pool
+    _parse_process_pool = None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def parse_kijiji_candidates(
+    html: str,
+    *,
+    query: str,
+    seen_urls: Iterable[str] = (),
+) -> list[KijijiCandidate]:
+    parse = functools.partial(
+        extract_kijiji_candidates,
+        html,
+        query=query,
+        seen_urls=frozenset(seen_urls),
+        parser=(settings.MARKETLY_KIJIJI_HTML_PARSER or "bs4").strip().lower(),
+    )
+    executor = (settings.MARKETLY_KIJIJI_PARSE_EXECUTOR or "thread").strip().lower()
+    if executor == "inline":
+        return parse()
+    if executor == "process":
+        return await asyncio.get_running_loop().run_in_executor(_get_parse_process_pool(), parse)
+    return await asyncio.to_thread(parse)
+
 
 class KijijiScrapeConnector(MarketplaceConnector):
     source_name = "kijiji"
@@ -58,9 +251,6 @@ class KijijiScrapeConnector(MarketplaceConnector):
             return f"{BASE}/b-canada/{q}/k0l0?dc=true&view=list{sort_fragment}"
         return f"{BASE}/b-canada/{q}/page-{page}/k0l0?dc=true&view=list{sort_fragment}"
 
-    def _abs_url(self, href: str) -> str:
-        return urljoin(BASE, href)
-
     def _extract_listing_id(self, listing_url: str) -> str:
         match = LISTING_ID_RE.search((listing_url or "").strip())
         if match:
@@ -86,11 +276,6 @@ class KijijiScrapeConnector(MarketplaceConnector):
         except ValueError:
             return None
 
-    def _token_score(self, query: str, title: str) -> int:
-        q_tokens = [t.lower() for t in query.split() if len(t) >= 2]
-        t = (title or "").lower()
-        return sum(1 for tok in q_tokens if tok in t)
-
     def _clean_snippet(self, title: str, blob: str) -> str | None:
         text = " ".join((blob or "").split())
         if not text:
@@ -145,65 +330,21 @@ class KijijiScrapeConnector(MarketplaceConnector):
     def _extract_vehicle_mileage_km(self, title: str, blob: str, listing_url: str) -> float | None:
         return extract_vehicle_mileage_km(title, blob, listing_url)
 
-    def _extract_candidates(
+    async def _fetch_page_html(
         self,
-        *,
         query: str,
-        soup: BeautifulSoup,
-        seen_urls: set[str],
-    ) -> list[tuple[int, str, str, str, list[str]]]:
-        anchors = soup.find_all("a", href=True)
-        candidates: list[tuple[int, str, str, str, list[str]]] = []
-
-        for anchor in anchors:
-            href = anchor.get("href", "")
-            if not href:
-                continue
-
-            if href.startswith("http"):
-                if "kijiji.ca" not in href:
-                    continue
-                path = href.replace(BASE, "")
-                full_url = href
-            else:
-                path = href
-                full_url = self._abs_url(href)
-
-            if not LISTING_HREF_RE.match(path):
-                continue
-            if full_url in seen_urls:
-                continue
-
-            container = anchor
-            for _ in range(6):
-                if container.parent:
-                    container = container.parent
-                else:
-                    break
-
-            blob = container.get_text(" ", strip=True)
-            title = anchor.get_text(" ", strip=True) or ""
-            if not title or len(title) < 4:
-                heading = container.find(["h3", "h2"])
-                if heading:
-                    title = heading.get_text(" ", strip=True) or title
-
-            title = (title or "").strip()
-            if not title:
-                continue
-
-            image_urls: list[str] = []
-            img = container.find("img")
-            if img:
-                src = img.get("src") or img.get("data-src")
-                if src:
-                    image_urls = [src]
-
-            score = self._token_score(query, title)
-            candidates.append((score, full_url, title, blob, image_urls))
-            seen_urls.add(full_url)
-
-        return candidates
+        page: int,
+        *,
+        sort: SearchSort,
+    ) -> str:
+        response = await get_http_client("kijiji").get(
+            self._build_search_url(query, page=page, sort=sort),
+            headers=self._headers,
+            follow_redirects=True,
+            timeout=20,
+        )
+        response.raise_for_status()
+        return response.text
 
     async def search(
         self,
@@ -214,43 +355,112 @@ class KijijiScrapeConnector(MarketplaceConnector):
     ) -> list[Listing]:
         safe_limit = max(1, int(limit))
         max_pages = max(1, min(10, (safe_limit // 24) + 2))
-        all_candidates: list[tuple[int, str, str, str, list[str]]] = []
+        all_candidates: list[KijijiCandidate] = []
         seen_urls: set[str] = set()
 
-        async with httpx.AsyncClient(
-            timeout=20,
-            headers=self._headers,
-            follow_redirects=True,
-        ) as client:
-            for page in range(1, max_pages + 1):
-                url = self._build_search_url(query, page=page, sort=sort)
-                try:
-                    response = await client.get(url)
-                    response.raise_for_status()
-                except Exception:
-                    if page == 1:
-                        raise
-                    break
-
-                soup = BeautifulSoup(response.text, "lxml")
-                page_candidates = self._extract_candidates(
-                    query=query,
-                    soup=soup,
-                    seen_urls=seen_urls,
-                )
-                if not page_candidates:
-                    break
-                all_candidates.extend(page_candidates)
+        first_html = await self._fetch_page_html(query, 1, sort=sort)
+        page_candidates = await parse_kijiji_candidates(first_html, query=query, seen_urls=seen_urls)
+        seen_urls.update(candidate[1] for candidate in page_candidates)
+        all_candidates.extend(page_candidates)
+
+        if page_candidates and len(all_candidates) < safe_limit * 2 and max_pages > 1:
+            # Later pages are fetched in a bounded window but consumed in page order, so
+            # seen_urls dedupe and candidate order match the sequential crawl.
+            window = max(1, int(settings.MARKETLY_KIJIJI_PAGE_FETCH_CONCURRENCY))
+            pending: dict[int, asyncio.Task[str]] = {}
+            next_page = 2
+            try:
+                for page in range(2, max_pages + 1):
+                    while next_page <= max_pages and len(pending) < window:
+                        pending[next_page] = asyncio.create_task(
+                            self._fetch_page_html(query, next_page, sort=sort)
+                        )
+                        next_page += 1
+
+                    try:
+                        html = await pending.pop(page)
+                    except Exception:
+                        break
+
+                    page_candidates = await parse_kijiji_candidates(
+                        html,
+                        query=query,
+                        seen_urls=seen_urls,
+                    )
+                    seen_urls.update(candidate[1] for candidate in page_candidates)
+                    if not page_candidates:
+                        break
+                    all_candidates.extend(page_candidates)
+
+                    if len(all_candidates) >= safe_limit * 2:
+                        break
+            finally:
+                for task in pending.values():
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending.values(), return_exceptions=True)
+
+        return self._build_listings(query, all_candidates, sort=sort, limit=safe_limit)
+
+    async def search_page(
+        self,
+        query: str,
+        limit: int = 20,
+        *,
+        sort: SearchSort = "relevance",
+        cursor: Any = None,
+        **kwargs,
+    ) -> tuple[list[Listing], Any | None]:
+        # The cursor is the next result page. Every match on the pages read is returned,
+        # even past limit, so nothing ranked below the cut is lost between slices.
+        start_page = max(1, int(cursor or 1))
+        safe_limit = max(1, int(limit))
+        max_pages = max(1, min(10, (safe_limit // 24) + 2))
+        candidates: list[KijijiCandidate] = []
+        seen_urls: set[str] = set()
+        next_page: int | None = None
+
+        for page in range(start_page, start_page + max_pages):
+            try:
+                html = await self._fetch_page_html(query, page, sort=sort)
+            except Exception:
+                if page == start_page:
+                    raise
+                next_page = page
+                break
 
-                if len(all_candidates) >= safe_limit * 2:
-                    break
+            page_candidates = await parse_kijiji_candidates(html, query=query, seen_urls=seen_urls)
+            seen_urls.update(candidate[1] for candidate in page_candidates)
+            if not page_candidates:
+                next_page = None
+                break
+            candidates.extend(page_candidates)
+            next_page = page + 1
 
+            if len(candidates) >= safe_limit:
+                break
+
+        return self._build_listings(query, candidates, sort=sort), next_page
+
+    def resume_cursor(self, window_limit: int, returned: int) -> Any | None:
+        # search() may have read several pages and kept only the best matches, so the
+        # first slice restarts at page 1; the caller dedupes the overlap.
+        return 1 if returned >= window_limit else None
+
+    def _build_listings(
+        self,
+        query: str,
+        candidates: list[KijijiCandidate],
+        *,
+        sort: SearchSort,
+        limit: int | None = None,
+    ) -> list[Listing]:
         if sort == "relevance":
-            all_candidates.sort(key=lambda item: item[0], reverse=True)
+            candidates = sorted(candidates, key=lambda item: item[0], reverse=True)
 
         results: list[Listing] = []
-        for score, listing_url, title, blob, image_urls in all_candidates:
-            if len(results) >= safe_limit:
+        for score, listing_url, title, blob, image_urls in candidates:
+            if limit is not None and len(results) >= limit:
                 break
             if query.strip() and score == 0:
                 continue
@@ -1,49 +1,236 @@
+import heapq
+import logging
 import time
 from collections import OrderedDict
 from threading import Lock
-from typing import Any
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
 
 
 class TTLCache:
-    def __init__(self, *, max_items: int | None = None):
-        self._store: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+    # LRU order lives in the OrderedDict; expiry order lives in a min-heap of
+    # (expires_at, version, key) so sweeps only touch entries that actually expired.
+    # Overwritten or deleted entries leave stale heap records that are skipped lazily.
+    def __init__(
+        self,
+        *,
+        max_items: int | None = None,
+        max_bytes: int | None = None,
+        size_of: Callable[[Any], int] | None = None,
+    ):
+        self._store: OrderedDict[str, tuple[float, Any, int, int]] = OrderedDict()
+        self._expiry_heap: list[tuple[float, int, str]] = []
         self._max_items = None if max_items is None else max(1, int(max_items))
+        self._max_bytes = None if max_bytes is None else max(1, int(max_bytes))
+        # sys.getsizeof is shallow and reports a few dozen bytes for any tuple or dict, so a
+        # byte cap is only meaningful with a caller-supplied measure of the payload.
+        if self._max_bytes is not None and size_of is None:
+            raise ValueError("TTLCache max_bytes requires size_of")
+        self._size_of = size_of
+        self._bytes = 0
+        self._version = 0
         self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _remove(self, key: str) -> None:
+        item = self._store.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
 
     def _purge_expired(self, now: float) -> None:
-        expired_keys = [key for key, (expires_at, _) in self._store.items() if now > expires_at]
-        for key in expired_keys:
-            self._store.pop(key, None)
+        heap = self._expiry_heap
+        while heap and now > heap[0][0]:
+            _, version, key = heapq.heappop(heap)
+            item = self._store.get(key)
+            if item is not None and item[3] == version:
+                self._remove(key)
+                self.expirations += 1
+
+        # Keep stale records from overwrites and deletes bounded.
+        if len(heap) > 2 * len(self._store) + 64:
+            self._expiry_heap = [
+                (expires_at, version, key)
+                for key, (expires_at, _, _, version) in self._store.items()
+            ]
+            heapq.heapify(self._expiry_heap)
 
     def get(self, key: str) -> Any | None:
         now = time.time()
         with self._lock:
             item = self._store.get(key)
             if not item:
+                self.misses += 1
                 return None
 
-            expires_at, value = item
+            expires_at, value, _, _ = item
             if now > expires_at:
-                self._store.pop(key, None)
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
                 return None
 
             # Touch key to keep least-recently-used eviction behavior.
             self._store.move_to_end(key)
+            self.hits += 1
             return value
 
-    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
-        ttl = max(1, int(ttl_seconds))
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int | None = None,
+        *,
+        expires_at: float | None = None,
+    ) -> None:
         now = time.time()
+        if expires_at is None:
+            expires_at = now + max(1, int(ttl_seconds or 0))
+        size = self._size_of(value) if self._max_bytes is not None else 0
 
         with self._lock:
             self._purge_expired(now)
-            self._store[key] = (now + ttl, value)
-            self._store.move_to_end(key)
+            self._remove(key)
+            self._version += 1
+            self._store[key] = (expires_at, value, size, self._version)
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, self._version, key))
 
-            if self._max_items is not None:
-                while len(self._store) > self._max_items:
-                    self._store.popitem(last=False)
+            while self._store and (
+                (self._max_items is not None and len(self._store) > self._max_items)
+                or (self._max_bytes is not None and self._bytes > self._max_bytes)
+            ):
+                oldest_key = next(iter(self._store))
+                self._remove(oldest_key)
+                self.evictions += 1
 
     def delete(self, key: str) -> None:
         with self._lock:
-            self._store.pop(key, None)
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "items": len(self._store),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Same get/set/delete surface as TTLCache, but entries live in Redis so every worker
+# sees them. Falls back to the local cache while Redis is unavailable; with local_first
+# the local cache is also a read-through first tier.
+class SharedTTLCache:
+    def __init__(
+        self,
+        prefix: str,
+        *,
+        local: TTLCache,
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any | None],
+        local_first: bool = False,
+    ):
+        self._prefix = prefix
+        self._local = local
+        self._encode = encode
+        self._decode = decode
+        self._local_first = local_first
+
+    def _redis(self):
+        from app.core.redis_client import get_redis_client
+
+        return get_redis_client()
+
+    def get(self, key: str) -> Any | None:
+        if self._local_first:
+            value = self._local.get(key)
+            if value is not None:
+                return value
+
+        redis_client = self._redis()
+        if redis_client is None:
+            return None if self._local_first else self._local.get(key)
+
+        try:
+            raw = redis_client.get(f"{self._prefix}{key}")
+        except Exception as exc:
+            logger.warning("shared cache read failed key=%s error=%s", key, exc)
+            return None if self._local_first else self._local.get(key)
+        if not raw:
+            return None
+
+        value = self._decode(raw)
+        if value is not None and self._local_first:
+            ttl = _remaining_ttl(redis_client, f"{self._prefix}{key}")
+            if ttl is not None:
+                self._local.set(key, value, ttl_seconds=ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        ttl = max(1, int(ttl_seconds))
+        redis_client = self._redis()
+        stored = False
+        if redis_client is not None:
+            try:
+                redis_client.setex(f"{self._prefix}{key}", ttl, self._encode(value))
+                stored = True
+            except Exception as exc:
+                logger.warning("shared cache write failed key=%s error=%s", key, exc)
+        if self._local_first or not stored:
+            self._local.set(key, value, ttl_seconds=ttl)
+
+    def delete(self, key: str) -> None:
+        self._local.delete(key)
+        redis_client = self._redis()
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(f"{self._prefix}{key}")
+        except Exception as exc:
+            logger.warning("shared cache delete failed key=%s error=%s", key, exc)
+
+
+def _remaining_ttl(redis_client, key: str) -> int | None:
+    try:
+        ttl = int(redis_client.ttl(key))
+    except Exception:
+        return None
+    return ttl if ttl > 0 else None
+
+
+def build_cache(
+    backend: str,
+    *,
+    prefix: str,
+    max_items: int | None,
+    encode: Callable[[Any], str],
+    decode: Callable[[str], Any | None],
+    max_bytes: int | None = None,
+) -> TTLCache | SharedTTLCache:
+    # A byte cap counts the encoded payload, the same bytes a Redis entry would hold.
+    local = TTLCache(
+        max_items=max_items,
+        max_bytes=max_bytes or None,
+        size_of=(lambda value: len(encode(value).encode("utf-8"))) if max_bytes else None,
+    )
+    normalized = (backend or "local").strip().lower()
+    if normalized == "redis":
+        return SharedTTLCache(prefix, local=local, encode=encode, decode=decode)
+    if normalized == "tiered":
+        return SharedTTLCache(prefix, local=local, encode=encode, decode=decode, local_first=True)
+    return local
@@ -27,6 +27,9 @@ class Settings(BaseSettings):
     MARKETLY_FACEBOOK_MAX_SCROLLS: int = 12
     MARKETLY_FACEBOOK_MAX_SCROLLS_SINGLE_SOURCE: int = 40
     MARKETLY_FACEBOOK_MAX_CONCURRENCY: int = 1
+    MARKETLY_FACEBOOK_CONTEXT_POOL_MAX_CONTEXTS: int = 2  # warm per-credential browser contexts kept between searches; 0 disables
+    MARKETLY_FACEBOOK_CONTEXT_POOL_IDLE_SECONDS: float = 300.0
+    MARKETLY_FACEBOOK_CONTEXT_POOL_MAX_USES: int = 20
     MARKETLY_FACEBOOK_BOOTSTRAP_HOME: bool = False
     MARKETLY_FACEBOOK_JITTER_MIN_SECONDS: float = 0.08
     MARKETLY_FACEBOOK_JITTER_MAX_SECONDS: float = 0.25
@@ -40,6 +43,8 @@ class Settings(BaseSettings):
     MARKETLY_FACEBOOK_VERIFY_MAX_AGE_SECONDS: int = 21600
     MARKETLY_RESPONSE_CACHE_ENABLED: bool = True
     MARKETLY_RESPONSE_CACHE_TTL_SECONDS: int = 45
+    MARKETLY_RESPONSE_CACHE_STALE_TTL_SECONDS: int = 120  # serve expired /search payloads this long while revalidating
+    MARKETLY_RESPONSE_CACHE_REFRESH_LOCK_SECONDS: int = 60
     MARKETLY_SAVED_SEARCH_RUN_CACHE_TTL_SECONDS: int = 300
     MARKETLY_RESPONSE_CACHE_LOCAL_FALLBACK_ENABLED: bool = True
     MARKETLY_RESPONSE_CACHE_LOCAL_MAX_ITEMS: int = 24
@@ -55,14 +60,58 @@ class Settings(BaseSettings):
     MARKETLY_RATE_LIMIT_FB_VERIFY_PER_HOUR: int = 12
     MARKETLY_RATE_LIMIT_FB_DELETE_PER_HOUR: int = 20
     MARKETLY_SEARCH_FETCH_CACHE_MAX_ITEMS: int = 32
+    MARKETLY_SEARCH_FETCH_CACHE_MAX_BYTES: int = 0  # 0 disables; counts each entry's encoded JSON size
     MARKETLY_SEARCH_PAGINATION_CACHE_MAX_ITEMS: int = 8
+    MARKETLY_SEARCH_CACHE_BACKEND: str = "local"  # "local", "redis", or "tiered" for the fetch and pagination caches
+    MARKETLY_SEARCH_SINGLE_FLIGHT_ENABLED: bool = True
+    MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_ENABLED: bool = False  # coalesce identical fetches across workers via a Redis lock
+    MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_LOCK_SECONDS: float = 45.0
+    MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_WAIT_SECONDS: float = 40.0
     MARKETLY_ALERTS_SEARCH_LIMIT: int = 20
-    MARKETLY_ALERTS_STALE_AFTER_SECONDS: int = 28800
+    MARKETLY_ALERTS_STALE_AFTER_SECONDS: int = 28800  # starting check interval; the adaptive cadence moves it between the bounds below
+    MARKETLY_ALERTS_ADAPTIVE_CADENCE_ENABLED: bool = True  # halve the interval after checks with new listings, double it after quiet ones
+    MARKETLY_ALERTS_MIN_CHECK_INTERVAL_SECONDS: int = 1800  # also the retry delay after a failed check
+    MARKETLY_ALERTS_MAX_CHECK_INTERVAL_SECONDS: int = 86400
     MARKETLY_ALERTS_AUTO_REFRESH_WINDOW_SECONDS: int = 300
+    MARKETLY_NOTIFICATIONS_POLL_MAX_SECONDS: int = 30  # longest /me/notifications/poll wait
+    MARKETLY_NOTIFICATIONS_POLL_INTERVAL_SECONDS: float = 1.0
     MARKETLY_ALERTS_PARTIAL_SOURCE_SUCCESS_ENABLED: bool = False
+    MARKETLY_ALERTS_JOB_CONCURRENCY: int = 4  # saved searches checked at once by the alert job; 1 keeps checks sequential
+    MARKETLY_ALERTS_QUERY_FAN_IN_ENABLED: bool = True  # one fetch per (query, sources, location) group of non-Facebook saved searches
+    MARKETLY_ALERTS_FACEBOOK_CONCURRENCY: int = 1  # per-source caps within the alert job's concurrency
+    MARKETLY_ALERTS_KIJIJI_CONCURRENCY: int = 8
+    MARKETLY_ALERTS_EBAY_CONCURRENCY: int = 16
+    MARKETLY_ALERTS_QUEUE_BATCH_SIZE: int = 20  # saved-search checks one queue worker leases at a time
+    MARKETLY_ALERTS_QUEUE_LEASE_SECONDS: int = 600  # a leased check returns to the queue if its worker has not finished by then
+    MARKETLY_ALERTS_QUEUE_MAX_ATTEMPTS: int = 4  # failed checks are dead-lettered after this many attempts
+    MARKETLY_ALERTS_QUEUE_RETRY_BASE_SECONDS: int = 60  # doubled after each failed attempt
+    MARKETLY_ALERTS_QUEUE_RETRY_MAX_SECONDS: int = 3600
+    MARKETLY_ALERTS_QUEUE_POLL_SECONDS: float = 5.0
+    MARKETLY_ALERTS_QUEUE_DONE_RETENTION_HOURS: int = 24
     MARKETLY_VALUATION_LOOKBACK_DAYS: int = 120
+    MARKETLY_VALUATION_TOKEN_INDEX_FALLBACK: bool = True  # ILIKE-scan snapshots when the token index finds no family rows
+    MARKETLY_VALUATION_VECTORIZED_STATS: bool = True  # only takes effect when the optional numpy package is installed
+    MARKETLY_VALUATION_MEMO_TTL_SECONDS: int = 120  # reuse a listing's valuation across pages and saved-search runs; 0 disables
+    MARKETLY_VALUATION_MEMO_MAX_ITEMS: int = 4096
+    MARKETLY_SNAPSHOT_COPY_ENABLED: bool = True  # Postgres COPY for snapshot batches; other databases use executemany
+    MARKETLY_SNAPSHOT_DEDUPE_ENABLED: bool = True  # repeat sightings on the same day bump observation_count instead of inserting
+    MARKETLY_SNAPSHOT_RETENTION_DAYS: int = 150  # whole months older than this are archived and dropped; never below the valuation lookback
+    MARKETLY_SNAPSHOT_ARCHIVE_DIR: str = "archives/listing_snapshots"
+    MARKETLY_SNAPSHOT_PARTITION_MONTHS_AHEAD: int = 3  # monthly Postgres partitions created ahead of time
+    MARKETLY_SNAPSHOT_BUFFER_ENABLED: bool = True  # write-behind snapshot queue; off writes one background task per request
+    MARKETLY_SNAPSHOT_BUFFER_MAX_ROWS: int = 5000  # rows held before new snapshots are dropped
+    MARKETLY_SNAPSHOT_BUFFER_BATCH_ROWS: int = 500
+    MARKETLY_SNAPSHOT_BUFFER_FLUSH_SECONDS: float = 2.0
     MARKETLY_GEMINI_MODEL: str = "gemini-2.5-flash-lite"
     MARKETLY_GEMINI_TIMEOUT_SECONDS: float = 25.0
+    MARKETLY_HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    MARKETLY_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    MARKETLY_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    MARKETLY_HTTP2_ENABLED: bool = True  # only takes effect with the optional "http2" extra (h2) installed
+    MARKETLY_KIJIJI_PAGE_FETCH_CONCURRENCY: int = 4  # result pages in flight after page 1; 1 restores sequential paging
+    MARKETLY_KIJIJI_HTML_PARSER: str = "bs4"  # "bs4" or "selectolax"
+    MARKETLY_KIJIJI_PARSE_EXECUTOR: str = "thread"  # "thread", "process", or "inline"
+    MARKETLY_KIJIJI_PARSE_PROCESS_WORKERS: int = 2
     MARKETLY_EBAY_SEED_ENABLED: bool = False  # opportunistic snapshot seeding from eBay on cold-start queries
     MARKETLY_EBAY_SEED_MIN_SNAPSHOT_COUNT: int = 8  # seed only when fewer than N valuation-key snapshots exist
     MARKETLY_EBAY_SEED_FETCH_LIMIT: int = 20  # how many eBay results to pull per seeding pass
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _http2_available() -> bool:
+    if not settings.MARKETLY_HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=max(1, int(settings.MARKETLY_HTTP_MAX_CONNECTIONS_PER_HOST)),
+        max_keepalive_connections=max(0, int(settings.MARKETLY_HTTP_MAX_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=max(0.0, float(settings.MARKETLY_HTTP_KEEPALIVE_EXPIRY_SECONDS)),
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=_http2_available(),
+        timeout=httpx.Timeout(20.0),
+    )
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    # One pooled client per upstream host. Clients are bound to the event loop that
+    # created them, so scripts that call asyncio.run() repeatedly get a fresh one.
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(name)
+    if entry is not None:
+        client_loop, client = entry
+        if client_loop is loop and not client.is_closed:
+            return client
+
+    client = _build_client()
+    _clients[name] = (loop, client)
+    return client
+
+
+async def close_http_clients() -> None:
+    loop = asyncio.get_running_loop()
+    for name, (client_loop, client) in list(_clients.items()):
+        _clients.pop(name, None)
+        if client_loop is not loop or client.is_closed:
+            continue
+        try:
+            await client.aclose()
+        except Exception as exc:
+            logger.warning("http client close failed name=%s error=%s", name, exc)
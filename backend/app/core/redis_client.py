@@ -38,3 +38,16 @@ def get_redis_client():
         _redis_client = None
 
     return _redis_client
+
+
+# Compare-and-delete in one step, so a lock that expired and was taken by another worker is kept.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def release_redis_lock(client, key: str, token: str) -> bool:
+    return bool(client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token))
@@ -1,9 +1,14 @@
+import asyncio
+import json
 import logging
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
+from typing import Literal
 
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -17,7 +22,9 @@ from app.connectors.facebook_marketplace import (
     FacebookSearchRequest,
     FacebookSearchResponse,
 )
+from app.connectors.kijiji_scrape import shutdown_kijiji_parse_pool
 from app.core.config import settings
+from app.core.http_client import close_http_clients
 from app.core.logging import setup_logging
 from app.db import get_db
 from app.models.listing import SearchResponse, SearchSort, Source, SourceError
@@ -60,20 +67,30 @@ from app.services.rate_limit import check_rate_limit, get_client_ip
 from app.services.response_cache import (
     build_search_response_cache_key,
     get_cached_search_response,
+    get_stale_search_response,
     is_search_response_cache_active,
+    release_search_response_refresh,
     set_cached_search_response,
+    try_acquire_search_response_refresh,
 )
 from app.services.alerts import (
+    alert_refresh_in_progress,
+    begin_alert_refresh,
+    commit_stale_notification_purge,
     delete_notifications_for_saved_search,
+    end_alert_refresh,
     execute_saved_search_alert_check,
     list_notifications,
+    list_notifications_since,
     mark_notification_read,
     refresh_saved_search_alerts_for_user,
+    saved_search_alerts_refresh_due,
 )
 from app.services.gemini_client import generate_copilot_response
 from app.services.ebay_seeder import seed_ebay_snapshots_if_below_threshold
 from app.services.listing_insights import apply_cold_start_price_estimate, enrich_listings_with_insights
 from app.services.listing_snapshots import persist_listing_snapshots
+from app.services.snapshot_buffer import enqueue_listing_snapshots, snapshot_buffer
 from app.services.location import (
     delete_user_location_preference,
     get_user_location_preference,
@@ -83,13 +100,24 @@ from app.services.location import (
     upsert_user_location_preference,
 )
 from app.services.saved_searches import get_saved_search_max_per_user, ordered_saved_search_query
-from app.services.search_service import FacebookRuntimeContext, unified_search
+from app.services.search_service import FacebookRuntimeContext, stream_search, unified_search
 from app.services.supabase_ingestion import upsert_facebook_records
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Marketly API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if settings.MARKETLY_SNAPSHOT_BUFFER_ENABLED:
+        snapshot_buffer.start()
+    yield
+    await snapshot_buffer.stop()
+    await close_http_clients()
+    shutdown_kijiji_parse_pool()
+
+
+app = FastAPI(title="Marketly API", version="0.1.0", lifespan=lifespan)
 print("LOADED MAIN.PY", __file__)
 
 default_cors_origins = {
@@ -134,6 +162,9 @@ def _saved_search_next_due_at(row: SavedSearch) -> datetime | None:
     last_checked_at = _as_utc_dt(getattr(row, "last_alert_checked_at", None))
     if last_checked_at is None:
         return None
+    next_check_at = _as_utc_dt(getattr(row, "next_alert_check_at", None))
+    if next_check_at is not None:
+        return next_check_at
     stale_after_seconds = max(1, int(settings.MARKETLY_ALERTS_STALE_AFTER_SECONDS))
     return last_checked_at + timedelta(seconds=stale_after_seconds)
 
@@ -146,6 +177,8 @@ def _reset_saved_search_alert_baseline(row: SavedSearch) -> None:
     row.last_alert_notified_at = None
     row.last_alert_error_code = None
     row.last_alert_error_message = None
+    row.next_alert_check_at = None
+    row.alert_check_interval_seconds = None
 
 
 def _saved_search_has_alert_state(row: SavedSearch) -> bool:
@@ -487,35 +520,21 @@ def delete_my_location(
     return {"deleted": deleted}
 
 
-@app.get("/search", response_model=SearchResponse)
-async def search(
+async def _search_request_context(
     request: Request,
-    response: Response,
-    background_tasks: BackgroundTasks,
-    q: str = Query(min_length=1, description="Search query"),
-    sources: list[str] | None = Query(
-        default=None,
-        description="Sources (comma-separated or repeated query param)",
-    ),
-    limit: int = Query(default=20, ge=1, le=50),
-    offset: int = Query(default=0, ge=0),
-    sort: SearchSort = Query(default="relevance"),
-    include_facebook: bool = Query(
-        default=False,
-        description="Include facebook source in addition to selected sources",
-    ),
-    latitude: float | None = Query(default=None, ge=-90, le=90),
-    longitude: float | None = Query(default=None, ge=-180, le=180),
-    radius_km: int | None = Query(default=None, ge=1, le=500),
-    authorization: str | None = Header(default=None),
-    db: Session = Depends(get_db),
-):
-    source_list = parse_sources(sources, include_facebook=include_facebook)
-
-    for source_name in source_list:
-        if source_name not in CONNECTORS:
-            raise HTTPException(status_code=400, detail=f"Unknown source: {source_name}")
-
+    db: Session,
+    *,
+    source_list: list[str],
+    authorization: str | None,
+    latitude: float | None,
+    longitude: float | None,
+    radius_km: int | None,
+) -> tuple[
+    JSONResponse | None,
+    str | None,
+    ResolvedLocation | None,
+    FacebookRuntimeContext | None,
+]:
     optional_user_id = try_get_current_user_id_from_authorization(authorization)
     search_location_context, effective_latitude, effective_longitude = _effective_search_location(
         db=db,
@@ -531,7 +550,7 @@ async def search(
         window_seconds=60,
     )
     if limited is not None:
-        return limited
+        return limited, optional_user_id, None, None
     if optional_user_id:
         limited = _apply_rate_limit(
             bucket="search_user",
@@ -540,7 +559,7 @@ async def search(
             window_seconds=60,
         )
         if limited is not None:
-            return limited
+            return limited, optional_user_id, None, None
 
     facebook_runtime_context = None
     if "facebook" in source_list:
@@ -552,31 +571,24 @@ async def search(
             radius_km=radius_km,
         )
 
-    cache_key = build_search_response_cache_key(
-        query=q,
-        sources=source_list,
-        limit=limit,
-        offset=offset,
-        sort=sort,
-        facebook_runtime_context=facebook_runtime_context,
-        search_location_context=search_location_context,
-    )
-    cache_active = is_search_response_cache_active()
-    cached_payload = get_cached_search_response(cache_key) if cache_active else None
-    if cached_payload is not None:
-        response.headers["X-Cache"] = "HIT"
-        cached_response = SearchResponse.model_validate(cached_payload)
-        background_tasks.add_task(
-            persist_listing_snapshots,
-            query=q,
-            listings=cached_response.results,
-            user_id=optional_user_id,
-        )
-        return cached_response
+    return None, optional_user_id, search_location_context, facebook_runtime_context
 
+
+async def _build_search_payload(
+    db: Session,
+    *,
+    query: str,
+    source_list: list[str],
+    limit: int,
+    offset: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None,
+    search_location_context: ResolvedLocation | None,
+    enrich_in_thread: bool = False,
+) -> SearchResponse:
     if facebook_runtime_context is None:
         results, total, next_offset, source_errors = await unified_search(
-            query=q,
+            query=query,
             sources=source_list,
             limit=limit,
             offset=offset,
@@ -585,7 +597,7 @@ async def search(
         )
     else:
         results, total, next_offset, source_errors = await unified_search(
-            query=q,
+            query=query,
             sources=source_list,
             limit=limit,
             offset=offset,
@@ -594,15 +606,18 @@ async def search(
             search_location_context=search_location_context,
         )
 
-    _enrich_results(db, query=q, results=results)
+    if enrich_in_thread:
+        await asyncio.to_thread(_enrich_results, db, query=query, results=results)
+    else:
+        _enrich_results(db, query=query, results=results)
     try:
-        await apply_cold_start_price_estimate(q, results)
+        await apply_cold_start_price_estimate(query, results)
     except Exception as exc:
-        logger.warning("cold-start price estimate failed query=%s error=%s", q, exc)
+        logger.warning("cold-start price estimate failed query=%s error=%s", query, exc)
     typed_sources: list[Source] = [source_name for source_name in source_list]
 
-    payload = SearchResponse(
-        query=q,
+    return SearchResponse(
+        query=query,
         sources=typed_sources,
         count=len(results),
         results=results,
@@ -610,10 +625,176 @@ async def search(
         total=total,
         source_errors=source_errors,
     )
+
+
+def _schedule_listing_snapshots(
+    background_tasks: BackgroundTasks,
+    *,
+    query: str,
+    listings: list,
+    user_id: str | None,
+    saved_search_id: int | None = None,
+) -> None:
+    snapshot_kwargs = {"query": query, "listings": listings, "user_id": user_id}
+    if saved_search_id is not None:
+        snapshot_kwargs["saved_search_id"] = saved_search_id
+    if enqueue_listing_snapshots(**snapshot_kwargs):
+        return
+    background_tasks.add_task(persist_listing_snapshots, **snapshot_kwargs)
+
+
+async def _revalidate_search_response(
+    *,
+    session_factory,
+    cache_key: str,
+    refresh_token: str,
+    user_id: str | None,
+    query: str,
+    source_list: list[str],
+    limit: int,
+    offset: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None,
+    search_location_context: ResolvedLocation | None,
+) -> None:
+    refresh_db = session_factory()
+    try:
+        payload = await _build_search_payload(
+            refresh_db,
+            query=query,
+            source_list=source_list,
+            limit=limit,
+            offset=offset,
+            sort=sort,
+            facebook_runtime_context=facebook_runtime_context,
+            search_location_context=search_location_context,
+            enrich_in_thread=True,
+        )
+        set_cached_search_response(cache_key, payload.model_dump(mode="json"))
+        if not enqueue_listing_snapshots(query=query, listings=payload.results, user_id=user_id):
+            # Revalidation runs on the event loop, so the blocking bulk write goes to a thread
+            # the same way the snapshot buffer flushes.
+            await asyncio.to_thread(
+                persist_listing_snapshots,
+                query=query,
+                listings=payload.results,
+                user_id=user_id,
+            )
+    except Exception as exc:
+        logger.warning("search response revalidation failed key=%s error=%s", cache_key, exc)
+    finally:
+        refresh_db.close()
+        release_search_response_refresh(cache_key, refresh_token)
+
+
+@app.get("/search", response_model=SearchResponse)
+async def search(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    q: str = Query(min_length=1, description="Search query"),
+    sources: list[str] | None = Query(
+        default=None,
+        description="Sources (comma-separated or repeated query param)",
+    ),
+    limit: int = Query(default=20, ge=1, le=50),
+    offset: int = Query(default=0, ge=0),
+    sort: SearchSort = Query(default="relevance"),
+    include_facebook: bool = Query(
+        default=False,
+        description="Include facebook source in addition to selected sources",
+    ),
+    latitude: float | None = Query(default=None, ge=-90, le=90),
+    longitude: float | None = Query(default=None, ge=-180, le=180),
+    radius_km: int | None = Query(default=None, ge=1, le=500),
+    authorization: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    source_list = parse_sources(sources, include_facebook=include_facebook)
+
+    for source_name in source_list:
+        if source_name not in CONNECTORS:
+            raise HTTPException(status_code=400, detail=f"Unknown source: {source_name}")
+
+    limited, optional_user_id, search_location_context, facebook_runtime_context = (
+        await _search_request_context(
+            request,
+            db,
+            source_list=source_list,
+            authorization=authorization,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+        )
+    )
+    if limited is not None:
+        return limited
+
+    cache_key = build_search_response_cache_key(
+        query=q,
+        sources=source_list,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        facebook_runtime_context=facebook_runtime_context,
+        search_location_context=search_location_context,
+    )
+    cache_active = is_search_response_cache_active()
+    cached_payload = get_cached_search_response(cache_key) if cache_active else None
+    if cached_payload is not None:
+        response.headers["X-Cache"] = "HIT"
+        cached_response = SearchResponse.model_validate(cached_payload)
+        _schedule_listing_snapshots(
+            background_tasks,
+            query=q,
+            listings=cached_response.results,
+            user_id=optional_user_id,
+        )
+        return cached_response
+
+    stale_payload = get_stale_search_response(cache_key) if cache_active else None
+    if stale_payload is not None:
+        response.headers["X-Cache"] = "STALE"
+        stale_response = SearchResponse.model_validate(stale_payload)
+        _schedule_listing_snapshots(
+            background_tasks,
+            query=q,
+            listings=stale_response.results,
+            user_id=optional_user_id,
+        )
+        refresh_token = try_acquire_search_response_refresh(cache_key)
+        if refresh_token is not None:
+            background_tasks.add_task(
+                _revalidate_search_response,
+                session_factory=sessionmaker(bind=db.get_bind()),
+                cache_key=cache_key,
+                refresh_token=refresh_token,
+                user_id=optional_user_id,
+                query=q,
+                source_list=source_list,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                facebook_runtime_context=facebook_runtime_context,
+                search_location_context=search_location_context,
+            )
+        return stale_response
+
+    payload = await _build_search_payload(
+        db,
+        query=q,
+        source_list=source_list,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        facebook_runtime_context=facebook_runtime_context,
+        search_location_context=search_location_context,
+    )
+    results = payload.results
     if cache_active:
         set_cached_search_response(cache_key, payload.model_dump(mode="json"))
-    background_tasks.add_task(
-        persist_listing_snapshots,
+    _schedule_listing_snapshots(
+        background_tasks,
         query=q,
         listings=results,
         user_id=optional_user_id,
@@ -624,6 +805,146 @@ async def search(
     return payload
 
 
+def _encode_search_stream_frame(event: str, body: dict, stream_format: str) -> str:
+    data = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return json.dumps({"event": event, **body}, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+@app.get("/search/stream")
+async def search_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    q: str = Query(min_length=1, description="Search query"),
+    sources: list[str] | None = Query(
+        default=None,
+        description="Sources (comma-separated or repeated query param)",
+    ),
+    limit: int = Query(default=20, ge=1, le=50),
+    offset: int = Query(default=0, ge=0),
+    sort: SearchSort = Query(default="relevance"),
+    include_facebook: bool = Query(
+        default=False,
+        description="Include facebook source in addition to selected sources",
+    ),
+    latitude: float | None = Query(default=None, ge=-90, le=90),
+    longitude: float | None = Query(default=None, ge=-180, le=180),
+    radius_km: int | None = Query(default=None, ge=1, le=500),
+    stream_format: Literal["ndjson", "sse"] = Query(default="ndjson", alias="format"),
+    authorization: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    source_list = parse_sources(sources, include_facebook=include_facebook)
+
+    for source_name in source_list:
+        if source_name not in CONNECTORS:
+            raise HTTPException(status_code=400, detail=f"Unknown source: {source_name}")
+
+    limited, optional_user_id, search_location_context, facebook_runtime_context = (
+        await _search_request_context(
+            request,
+            db,
+            source_list=source_list,
+            authorization=authorization,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+        )
+    )
+    if limited is not None:
+        return limited
+
+    # The request-scoped session may be released before the stream finishes.
+    session_factory = sessionmaker(bind=db.get_bind())
+    typed_sources: list[Source] = [source_name for source_name in source_list]
+
+    async def frames():
+        if facebook_runtime_context is None:
+            stream = stream_search(
+                query=q,
+                sources=source_list,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                search_location_context=search_location_context,
+            )
+        else:
+            stream = stream_search(
+                query=q,
+                sources=source_list,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                facebook_runtime_context=facebook_runtime_context,
+                search_location_context=search_location_context,
+            )
+
+        async for frame in stream:
+            if frame.event == "source":
+                yield _encode_search_stream_frame(
+                    "source",
+                    {
+                        "source": frame.source,
+                        "count": len(frame.results or []),
+                        "results": [item.model_dump(mode="json") for item in frame.results or []],
+                        "source_error": frame.source_error.model_dump(mode="json")
+                        if frame.source_error is not None
+                        else None,
+                    },
+                    stream_format,
+                )
+                continue
+
+            results = frame.results or []
+            stream_db = session_factory()
+            try:
+                _enrich_results(stream_db, query=q, results=results)
+            finally:
+                stream_db.close()
+            try:
+                await apply_cold_start_price_estimate(q, results)
+            except Exception as exc:
+                logger.warning("cold-start price estimate failed query=%s error=%s", q, exc)
+
+            payload = SearchResponse(
+                query=q,
+                sources=typed_sources,
+                count=len(results),
+                results=results,
+                next_offset=frame.next_offset,
+                total=frame.total,
+                source_errors=frame.source_errors or {},
+            )
+            if is_search_response_cache_active():
+                set_cached_search_response(
+                    build_search_response_cache_key(
+                        query=q,
+                        sources=source_list,
+                        limit=limit,
+                        offset=offset,
+                        sort=sort,
+                        facebook_runtime_context=facebook_runtime_context,
+                        search_location_context=search_location_context,
+                    ),
+                    payload.model_dump(mode="json"),
+                )
+            _schedule_listing_snapshots(
+                background_tasks,
+                query=q,
+                listings=results,
+                user_id=optional_user_id,
+            )
+            yield _encode_search_stream_frame("complete", payload.model_dump(mode="json"), stream_format)
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        frames(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/connectors/facebook/ingest", response_model=FacebookIngestResponse)
 def facebook_ingest(
     payload: FacebookIngestRequest,
@@ -1193,8 +1514,8 @@ async def run_saved_search(
     if cached_payload is not None:
         response.headers["X-Cache"] = "HIT"
         cached_response = SearchResponse.model_validate(cached_payload)
-        background_tasks.add_task(
-            persist_listing_snapshots,
+        _schedule_listing_snapshots(
+            background_tasks,
             query=row.query,
             listings=cached_response.results,
             user_id=user_id,
@@ -1225,8 +1546,8 @@ async def run_saved_search(
     _enrich_results(db, query=row.query, results=results)
     typed_sources: list[Source] = [source_name for source_name in source_list]
 
-    background_tasks.add_task(
-        persist_listing_snapshots,
+    _schedule_listing_snapshots(
+        background_tasks,
         query=row.query,
         listings=results,
         user_id=user_id,
@@ -1251,14 +1572,8 @@ async def run_saved_search(
     return payload
 
 
-@app.get("/me/notifications", response_model=list[SavedSearchNotificationOut])
-async def get_notifications(
-    limit: int = Query(default=25, ge=1, le=100),
-    db: Session = Depends(get_db),
-    user_id: str = Depends(get_current_user_id),
-):
-    refresh_session_factory = sessionmaker(bind=db.get_bind(), autoflush=False, autocommit=False)
-    refresh_db = refresh_session_factory()
+async def _refresh_alerts_in_background(session_factory, *, user_id: str) -> None:
+    refresh_db = session_factory()
     try:
         await refresh_saved_search_alerts_for_user(refresh_db, user_id=user_id)
     except Exception as exc:
@@ -1266,9 +1581,75 @@ async def get_notifications(
         logger.warning("saved search alert refresh request failed for user %s: %s", user_id, exc)
     finally:
         refresh_db.close()
+        end_alert_refresh(user_id)
+
+
+def _schedule_alert_refresh(background_tasks: BackgroundTasks, db: Session, *, user_id: str) -> str:
+    if alert_refresh_in_progress(user_id):
+        return "running"
+    try:
+        due = saved_search_alerts_refresh_due(db, user_id=user_id)
+    except Exception as exc:
+        db.rollback()
+        logger.warning("saved search alert refresh check failed for user %s: %s", user_id, exc)
+        return "idle"
+    if not due:
+        return "idle"
+    if not begin_alert_refresh(user_id):
+        return "running"
+    refresh_session_factory = sessionmaker(bind=db.get_bind(), autoflush=False, autocommit=False)
+    background_tasks.add_task(_refresh_alerts_in_background, refresh_session_factory, user_id=user_id)
+    return "started"
+
+
+@app.get("/me/notifications", response_model=list[SavedSearchNotificationOut])
+async def get_notifications(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(default=25, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    # Alert checks run full marketplace searches, so they happen after the response is sent.
+    response.headers["X-Alerts-Refresh"] = _schedule_alert_refresh(background_tasks, db, user_id=user_id)
     return list_notifications(db, user_id=user_id, limit=limit)
 
 
+@app.get("/me/notifications/poll", response_model=list[SavedSearchNotificationOut])
+async def poll_notifications(
+    response: Response,
+    after_id: int = Query(default=0, ge=0),
+    timeout: float = Query(default=25.0, ge=0, le=60),
+    limit: int = Query(default=25, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id),
+):
+    deadline = time.monotonic() + min(timeout, float(settings.MARKETLY_NOTIFICATIONS_POLL_MAX_SECONDS))
+    poll_interval = max(0.1, float(settings.MARKETLY_NOTIFICATIONS_POLL_INTERVAL_SECONDS))
+    saw_refresh = False
+    # The purge scans every notification the user has, so it runs once per poll, not per read.
+    # Database work runs in a thread so a waiting poll never blocks the event loop.
+    await asyncio.to_thread(commit_stale_notification_purge, db, user_id=user_id)
+    while True:
+        notifications = await asyncio.to_thread(
+            list_notifications_since,
+            db,
+            user_id=user_id,
+            after_id=after_id,
+            limit=limit,
+        )
+        # Release the connection between reads; a long poll should not pin one.
+        db.close()
+        refreshing = alert_refresh_in_progress(user_id)
+        saw_refresh = saw_refresh or refreshing
+        remaining = deadline - time.monotonic()
+        # A finished refresh ends the wait too, so the client can re-read the full list.
+        if notifications or remaining <= 0 or (saw_refresh and not refreshing):
+            response.headers["X-Alerts-Refresh"] = "running" if refreshing else "idle"
+            return notifications
+        await asyncio.sleep(min(poll_interval, remaining))
+
+
 @app.post("/me/notifications/{notification_id}/read", response_model=SavedSearchNotificationOut)
 def mark_notification_as_read(
     notification_id: int,
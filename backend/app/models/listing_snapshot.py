@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text, func
+from sqlalchemy import JSON, Column, DateTime, Float, Index, Integer, String, Text, func
 
 from app.db import Base
 
@@ -23,6 +23,21 @@ class ListingSnapshot(Base):
     url = Column(Text, nullable=False)
     valuation_key = Column(String(length=255), nullable=False, index=True)
     observed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    # Repeat sightings of the same listing, price and query on the same UTC day bump the first
+    # row instead of inserting another; NULL on rows written before deduplication.
+    observation_key = Column(String(length=64), nullable=True)
+    observation_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_observed_at = Column(DateTime(timezone=True), nullable=True)
+    # Valuation features derived at write time; NULL or an older version means recompute from text.
+    features_version = Column(Integer, nullable=True)
+    normalized_condition = Column(String(length=32), nullable=True)
+    query_tokens_json = Column(JSON, nullable=True)
+    text_tokens_json = Column(JSON, nullable=True)
+    profile_model_year = Column(String(length=8), nullable=True)
+    profile_variant = Column(String(length=32), nullable=True)
+    profile_storage = Column(String(length=16), nullable=True)
+    profile_lock_state = Column(String(length=32), nullable=True)
+    profile_condition_bucket = Column(String(length=32), nullable=True)
 
     __table_args__ = (
         Index(
@@ -36,4 +51,6 @@ class ListingSnapshot(Base):
             "valuation_key",
             "observed_at",
         ),
+        # On partitioned Postgres this is one unique index per monthly partition instead.
+        Index("ux_listing_snapshots_observation_key", "observation_key", unique=True),
     )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from app.db import Base
+
+
+class ListingSnapshotToken(Base):
+    __tablename__ = "listing_snapshot_tokens"
+
+    id = Column(Integer, primary_key=True)
+    snapshot_id = Column(Integer, nullable=False, index=True)
+    token = Column(String(length=64), nullable=False)
+    observed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_listing_snapshot_tokens_token_observed",
+            "token",
+            "observed_at",
+        ),
+    )
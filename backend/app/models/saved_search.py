@@ -20,11 +20,19 @@ class SavedSearch(Base):
     last_alert_error_code = Column(String, nullable=True)
     last_alert_error_message = Column(Text, nullable=True)
     last_alert_source_errors_json = Column(JSON, nullable=True)
+    next_alert_check_at = Column(DateTime(timezone=True), nullable=True)  # null means due now
+    alert_check_interval_seconds = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # OPTIONAL but recommended: prevent exact duplicates per user
     __table_args__ = (
         Index("ix_saved_searches_user_query_sources", "user_id", "query", "sources", unique=True),
+        Index(
+            "ix_saved_searches_next_alert_check_at",
+            "next_alert_check_at",
+            postgresql_where=text("alerts_enabled"),
+            sqlite_where=text("alerts_enabled"),
+        ),
     )
 
     @validates("user_id")
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func, text
+
+from app.db import Base
+
+
+class SavedSearchAlertJob(Base):
+    __tablename__ = "saved_search_alert_jobs"
+
+    id = Column(Integer, primary_key=True)
+    saved_search_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="pending")  # pending, leased, done or dead
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    leased_by = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_error_code = Column(String, nullable=True)
+    last_error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_saved_search_alert_jobs_status_available_at", "status", "available_at"),
+        # At most one open job per saved search, however many schedulers enqueue.
+        Index(
+            "ux_saved_search_alert_jobs_open",
+            "saved_search_id",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'leased')"),
+            sqlite_where=text("status IN ('pending', 'leased')"),
+        ),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Date, DateTime, Integer, JSON, String, UniqueConstraint, func
+
+from app.db import Base
+
+
+class ValuationRollup(Base):
+    __tablename__ = "valuation_rollups"
+
+    id = Column(Integer, primary_key=True)
+    valuation_key = Column(String(length=255), nullable=False, index=True)
+    bucket_date = Column(Date, nullable=False, index=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    recent_prices_json = Column(JSON, nullable=False)  # newest last, capped per bucket
+    condition_counts_json = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("valuation_key", "bucket_date", name="uq_valuation_rollups_key_bucket"),
+    )
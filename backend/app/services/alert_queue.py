@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.saved_search import SavedSearch
+from app.models.saved_search_alert_job import SavedSearchAlertJob
+from app.services.alerts import (
+    _ALERT_ERROR_CODE_CHECK_FAILED,
+    SavedSearchAlertCheckOutcome,
+    run_saved_search_alert_checks,
+    select_alert_saved_searches,
+)
+from app.services.saved_searches import ordered_saved_search_query
+
+logger = logging.getLogger(__name__)
+
+ALERT_JOB_PENDING = "pending"
+ALERT_JOB_LEASED = "leased"
+ALERT_JOB_DONE = "done"
+ALERT_JOB_DEAD = "dead"
+_OPEN_ALERT_JOB_STATUSES = (ALERT_JOB_PENDING, ALERT_JOB_LEASED)
+
+
+@dataclass(frozen=True)
+class LeasedAlertJob:
+    id: int
+    saved_search_id: int
+    attempts: int
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def alert_job_retry_delay(attempts: int) -> int:
+    base = max(1, int(settings.MARKETLY_ALERTS_QUEUE_RETRY_BASE_SECONDS))
+    ceiling = max(base, int(settings.MARKETLY_ALERTS_QUEUE_RETRY_MAX_SECONDS))
+    return min(ceiling, base * 2 ** max(0, attempts - 1))
+
+
+def enqueue_alert_checks(
+    db: Session,
+    *,
+    user_id: str | None = None,
+    saved_search_id: int | None = None,
+    due_only: bool = True,
+    now: datetime | None = None,
+) -> int:
+    now = now or _utc_now()
+    saved_searches = select_alert_saved_searches(
+        db,
+        user_id=user_id,
+        saved_search_id=saved_search_id,
+        due_only=due_only,
+        now=now,
+    )
+    saved_search_ids = [saved_search.id for saved_search in saved_searches]
+
+    open_ids: set[int] = set()
+    if saved_search_ids:
+        open_ids = {
+            row[0]
+            for row in db.query(SavedSearchAlertJob.saved_search_id)
+            .filter(SavedSearchAlertJob.saved_search_id.in_(saved_search_ids))
+            .filter(SavedSearchAlertJob.status.in_(_OPEN_ALERT_JOB_STATUSES))
+            .all()
+        }
+
+    created = 0
+    for pending_id in saved_search_ids:
+        if pending_id in open_ids:
+            continue
+        try:
+            with db.begin_nested():
+                db.add(
+                    SavedSearchAlertJob(
+                        saved_search_id=pending_id,
+                        status=ALERT_JOB_PENDING,
+                        attempts=0,
+                        available_at=now,
+                    )
+                )
+        except IntegrityError:
+            # Another scheduler enqueued this saved search first.
+            continue
+        created += 1
+
+    retention_hours = max(0, int(settings.MARKETLY_ALERTS_QUEUE_DONE_RETENTION_HOURS))
+    db.query(SavedSearchAlertJob).filter(SavedSearchAlertJob.status == ALERT_JOB_DONE).filter(
+        SavedSearchAlertJob.finished_at < now - timedelta(hours=retention_hours)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return created
+
+
+def lease_alert_jobs(
+    db: Session,
+    *,
+    worker_id: str,
+    limit: int,
+    lease_seconds: int | None = None,
+    now: datetime | None = None,
+) -> list[LeasedAlertJob]:
+    now = now or _utc_now()
+    lease_for = max(
+        1,
+        int(settings.MARKETLY_ALERTS_QUEUE_LEASE_SECONDS if lease_seconds is None else lease_seconds),
+    )
+    max_attempts = max(1, int(settings.MARKETLY_ALERTS_QUEUE_MAX_ATTEMPTS))
+
+    # SKIP LOCKED lets several workers lease from the same queue without waiting on each other.
+    # Expired leases belong to workers that died or stalled, so they are taken over.
+    rows = (
+        db.query(SavedSearchAlertJob)
+        .filter(
+            or_(
+                and_(
+                    SavedSearchAlertJob.status == ALERT_JOB_PENDING,
+                    SavedSearchAlertJob.available_at <= now,
+                ),
+                and_(
+                    SavedSearchAlertJob.status == ALERT_JOB_LEASED,
+                    SavedSearchAlertJob.lease_expires_at <= now,
+                ),
+            )
+        )
+        .order_by(SavedSearchAlertJob.available_at.asc(), SavedSearchAlertJob.id.asc())
+        .limit(max(1, int(limit)))
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    leased: list[LeasedAlertJob] = []
+    for job in rows:
+        if int(job.attempts or 0) >= max_attempts:
+            logger.warning(
+                "saved search alert job dead-lettered id=%s saved_search_id=%s reason=lease expired",
+                job.id,
+                job.saved_search_id,
+            )
+            job.status = ALERT_JOB_DEAD
+            job.leased_by = None
+            job.lease_expires_at = None
+            job.last_error_code = "LEASE_EXPIRED"
+            job.last_error_message = "The worker holding this check did not finish before its lease expired."
+            job.finished_at = now
+            continue
+        job.status = ALERT_JOB_LEASED
+        job.leased_by = worker_id
+        job.lease_expires_at = now + timedelta(seconds=lease_for)
+        job.attempts = int(job.attempts or 0) + 1
+        leased.append(LeasedAlertJob(id=job.id, saved_search_id=job.saved_search_id, attempts=job.attempts))
+    db.commit()
+    return leased
+
+
+def finish_alert_jobs(
+    db: Session,
+    results: list[tuple[int, SavedSearchAlertCheckOutcome | None]],
+    *,
+    worker_id: str,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    now = now or _utc_now()
+    max_attempts = max(1, int(settings.MARKETLY_ALERTS_QUEUE_MAX_ATTEMPTS))
+    counts = {"done": 0, "retried": 0, "dead": 0, "lost": 0}
+    if not results:
+        return counts
+
+    jobs = {
+        job.id: job
+        for job in db.query(SavedSearchAlertJob)
+        .filter(SavedSearchAlertJob.id.in_([job_id for job_id, _ in results]))
+        .with_for_update()
+        .all()
+    }
+    for job_id, outcome in results:
+        job = jobs.get(job_id)
+        if job is None or job.status != ALERT_JOB_LEASED or job.leased_by != worker_id:
+            # The lease expired and another worker took the check over; its result wins.
+            counts["lost"] += 1
+            continue
+        job.leased_by = None
+        job.lease_expires_at = None
+        # No outcome means the saved search was deleted or muted after it was enqueued.
+        if outcome is None or outcome.error_code is None:
+            job.status = ALERT_JOB_DONE
+            job.finished_at = now
+            counts["done"] += 1
+            continue
+
+        job.last_error_code = outcome.error_code
+        job.last_error_message = outcome.error_message
+        if int(job.attempts or 0) >= max_attempts:
+            logger.warning(
+                "saved search alert job dead-lettered id=%s saved_search_id=%s attempts=%s code=%s",
+                job.id,
+                job.saved_search_id,
+                job.attempts,
+                outcome.error_code,
+            )
+            job.status = ALERT_JOB_DEAD
+            job.finished_at = now
+            counts["dead"] += 1
+            continue
+        job.status = ALERT_JOB_PENDING
+        job.available_at = now + timedelta(seconds=alert_job_retry_delay(int(job.attempts or 0)))
+        counts["retried"] += 1
+    db.commit()
+    return counts
+
+
+def alert_queue_counts(db: Session) -> dict[str, int]:
+    counts = {status: 0 for status in (ALERT_JOB_PENDING, ALERT_JOB_LEASED, ALERT_JOB_DONE, ALERT_JOB_DEAD)}
+    rows = (
+        db.query(SavedSearchAlertJob.status, func.count(SavedSearchAlertJob.id))
+        .group_by(SavedSearchAlertJob.status)
+        .all()
+    )
+    for status, count in rows:
+        counts[str(status)] = int(count)
+    return counts
+
+
+async def run_alert_queue_batch(
+    session_factory: Callable[[], Session],
+    *,
+    worker_id: str,
+    limit_per_search: int,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+) -> dict[str, int]:
+    db = session_factory()
+    try:
+        jobs = lease_alert_jobs(
+            db,
+            worker_id=worker_id,
+            limit=int(settings.MARKETLY_ALERTS_QUEUE_BATCH_SIZE if batch_size is None else batch_size),
+        )
+        if not jobs:
+            return {"leased": 0, "done": 0, "retried": 0, "dead": 0, "lost": 0, "shared_fetches": 0}
+
+        saved_searches = (
+            ordered_saved_search_query(
+                db.query(SavedSearch)
+                .filter(SavedSearch.id.in_({job.saved_search_id for job in jobs}))
+                .filter(SavedSearch.alerts_enabled.is_(True))
+            ).all()
+        )
+        shared_fetches = 0
+        try:
+            batch = await run_saved_search_alert_checks(
+                db,
+                saved_searches,
+                limit_per_search=limit_per_search,
+                concurrency=concurrency,
+                session_factory=session_factory,
+            )
+            outcomes = batch.outcomes
+            shared_fetches = batch.shared_fetches
+        except Exception as exc:
+            db.rollback()
+            logger.warning("saved search alert queue batch failed worker=%s error=%s", worker_id, exc)
+            failure = SavedSearchAlertCheckOutcome(
+                successful_check=False,
+                error_code=_ALERT_ERROR_CODE_CHECK_FAILED,
+                error_message=str(exc),
+            )
+            outcomes = {saved_search.id: failure for saved_search in saved_searches}
+
+        counts = finish_alert_jobs(
+            db,
+            [(job.id, outcomes.get(job.saved_search_id)) for job in jobs],
+            worker_id=worker_id,
+        )
+        return {"leased": len(jobs), **counts, "shared_fetches": shared_fetches}
+    finally:
+        db.close()
+
+
+async def run_alert_queue_worker(
+    session_factory: Callable[[], Session],
+    *,
+    worker_id: str,
+    limit_per_search: int,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    drain: bool = False,
+    poll_seconds: float | None = None,
+) -> dict[str, int]:
+    totals = {"batches": 0, "leased": 0, "done": 0, "retried": 0, "dead": 0, "lost": 0, "shared_fetches": 0}
+    idle_sleep = max(0.1, float(settings.MARKETLY_ALERTS_QUEUE_POLL_SECONDS if poll_seconds is None else poll_seconds))
+    while True:
+        result = await run_alert_queue_batch(
+            session_factory,
+            worker_id=worker_id,
+            limit_per_search=limit_per_search,
+            batch_size=batch_size,
+            concurrency=concurrency,
+        )
+        if result["leased"]:
+            totals["batches"] += 1
+            for key, value in result.items():
+                totals[key] += value
+            logger.info("saved search alert queue batch finished worker=%s result=%s", worker_id, result)
+            continue
+        if drain:
+            return totals
+        await asyncio.sleep(idle_sleep)
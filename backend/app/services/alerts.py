@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, replace
 import logging
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.connectors import CONNECTORS
 from app.core.cache import TTLCache
@@ -12,6 +18,7 @@ from app.core.config import settings
 from app.models.listing import Listing, SourceError
 from app.models.saved_search import SavedSearch
 from app.models.saved_search_notification import SavedSearchNotification
+from app.models.user_location_preference import UserLocationPreference
 from app.schemas.location import ResolvedLocation
 from app.schemas.notifications import SavedSearchNotificationOut
 from app.services.facebook_credentials import get_user_facebook_credential
@@ -24,7 +31,11 @@ from app.services.listing_snapshots import (
     persist_listing_snapshots,
     previously_seen_fingerprints,
 )
-from app.services.search_service import FacebookRuntimeContext, unified_search
+from app.services.search_service import (
+    FacebookRuntimeContext,
+    location_cache_fragment,
+    unified_search,
+)
 from app.services.user_ids import normalize_user_id
 
 logger = logging.getLogger(__name__)
@@ -33,6 +44,8 @@ ALERT_CONFIDENCE_THRESHOLD = 0.65
 ALERT_BASELINE_VERSION = 2
 READ_NOTIFICATION_RETENTION_SECONDS = 12 * 60 * 60
 _alerts_refresh_limiter = TTLCache(max_items=2048)
+_alert_refreshes_in_flight: set[str] = set()
+_alert_refreshes_lock = threading.Lock()
 _ALERT_ERROR_CODE_CHECK_FAILED = "CHECK_FAILED"
 _ALERT_ERROR_CODE_NO_SOURCES = "NO_SOURCES"
 _ALERT_ERROR_CODE_SOURCE_ERRORS = "SOURCE_ERRORS"
@@ -109,6 +122,10 @@ def _search_location_context(db: Session, user_id: object | None) -> ResolvedLoc
     row = get_user_location_preference(db, normalized_user_id)
     if row is None:
         return None
+    return _resolved_location_from_preference(row)
+
+
+def _resolved_location_from_preference(row: UserLocationPreference) -> ResolvedLocation:
     return ResolvedLocation(
         display_name=row.display_name,
         city=row.city,
@@ -268,6 +285,14 @@ class SavedSearchAlertCheckOutcome:
     error_message: str | None = None
 
 
+@dataclass
+class PrefetchedAlertSearch:
+    # One unified_search result shared by saved searches with the same query, sources and
+    # location; each check diffs its own copy against its own snapshots.
+    results: list[Listing]
+    source_errors: dict[str, SourceError]
+
+
 def _clean_error_message(message: object, *, max_length: int = 500) -> str | None:
     cleaned = " ".join(str(message or "").split()).strip()
     if not cleaned:
@@ -365,6 +390,7 @@ def record_saved_search_alert_failure(
     source_order: list[str] | None = None,
 ) -> None:
     saved_search.last_alert_attempted_at = attempted_at
+    saved_search.next_alert_check_at = attempted_at + timedelta(seconds=_min_alert_check_interval_seconds())
     saved_search.last_alert_error_code = (str(error_code).strip()[:100] if error_code else None) or None
     saved_search.last_alert_error_message = _clean_error_message(error_message)
     _set_saved_search_source_errors(
@@ -374,17 +400,39 @@ def record_saved_search_alert_failure(
     )
 
 
+def _min_alert_check_interval_seconds() -> int:
+    base = max(1, int(settings.MARKETLY_ALERTS_STALE_AFTER_SECONDS))
+    return max(1, min(base, int(settings.MARKETLY_ALERTS_MIN_CHECK_INTERVAL_SECONDS)))
+
+
+def next_alert_check_interval(saved_search: SavedSearch, *, new_listing_count: int | None) -> int:
+    base = max(1, int(settings.MARKETLY_ALERTS_STALE_AFTER_SECONDS))
+    if not settings.MARKETLY_ALERTS_ADAPTIVE_CADENCE_ENABLED:
+        return base
+    floor = _min_alert_check_interval_seconds()
+    ceiling = max(base, int(settings.MARKETLY_ALERTS_MAX_CHECK_INTERVAL_SECONDS))
+    interval = _coerce_non_negative_int(getattr(saved_search, "alert_check_interval_seconds", None)) or base
+    # Busy queries are checked more often and quiet ones back off; a baseline rebuild keeps the pace.
+    if new_listing_count is not None:
+        interval = interval // 2 if new_listing_count > 0 else interval * 2
+    return min(ceiling, max(floor, interval))
+
+
 def _mark_saved_search_alert_success(
     saved_search: SavedSearch,
     *,
     attempted_at: datetime,
     checked_at: datetime,
     result_count: int,
+    new_listing_count: int | None = None,
     source_errors: dict[str, object] | None = None,
     source_order: list[str] | None = None,
 ) -> dict[str, dict[str, object]]:
+    interval = next_alert_check_interval(saved_search, new_listing_count=new_listing_count)
     saved_search.last_alert_attempted_at = attempted_at
     saved_search.last_alert_checked_at = checked_at
+    saved_search.alert_check_interval_seconds = interval
+    saved_search.next_alert_check_at = checked_at + timedelta(seconds=interval)
     saved_search.last_alert_baseline_version = ALERT_BASELINE_VERSION
     saved_search.last_alert_result_count = max(0, int(result_count))
     return clear_saved_search_alert_error(
@@ -514,6 +562,10 @@ def _rebuild_saved_search_alert_baseline(
 
 
 def _saved_search_is_stale(saved_search: SavedSearch, *, now: datetime) -> bool:
+    next_check_at = _as_utc(getattr(saved_search, "next_alert_check_at", None))
+    if next_check_at is not None:
+        return next_check_at <= now
+
     last_checked_at = _as_utc(getattr(saved_search, "last_alert_checked_at", None))
     if last_checked_at is None:
         return True
@@ -522,11 +574,7 @@ def _saved_search_is_stale(saved_search: SavedSearch, *, now: datetime) -> bool:
     return last_checked_at <= now - timedelta(seconds=stale_after_seconds)
 
 
-async def refresh_saved_search_alerts_for_user(
-    db: Session,
-    *,
-    user_id: str,
-) -> bool:
+def saved_search_alerts_refresh_due(db: Session, *, user_id: str) -> bool:
     saved_searches = ordered_saved_search_query(
         db.query(SavedSearch)
         .filter(
@@ -546,13 +594,44 @@ async def refresh_saved_search_alerts_for_user(
         getattr(row, "last_alert_checked_at", None) is None for row in active_saved_searches
     )
     refresh_window_seconds = max(0, int(settings.MARKETLY_ALERTS_AUTO_REFRESH_WINDOW_SECONDS))
-    cache_key = f"saved-search-alert-refresh:{user_id}"
     if (
         refresh_window_seconds > 0
         and not bypass_refresh_window
-        and _alerts_refresh_limiter.get(cache_key) is not None
+        and _alerts_refresh_limiter.get(f"saved-search-alert-refresh:{user_id}") is not None
     ):
         return False
+    return True
+
+
+def alert_refresh_in_progress(user_id: str) -> bool:
+    with _alert_refreshes_lock:
+        return user_id in _alert_refreshes_in_flight
+
+
+def begin_alert_refresh(user_id: str) -> bool:
+    # One background refresh per user per process; later requests see it as running.
+    with _alert_refreshes_lock:
+        if user_id in _alert_refreshes_in_flight:
+            return False
+        _alert_refreshes_in_flight.add(user_id)
+        return True
+
+
+def end_alert_refresh(user_id: str) -> None:
+    with _alert_refreshes_lock:
+        _alert_refreshes_in_flight.discard(user_id)
+
+
+async def refresh_saved_search_alerts_for_user(
+    db: Session,
+    *,
+    user_id: str,
+) -> bool:
+    if not saved_search_alerts_refresh_due(db, user_id=user_id):
+        return False
+
+    refresh_window_seconds = max(0, int(settings.MARKETLY_ALERTS_AUTO_REFRESH_WINDOW_SECONDS))
+    cache_key = f"saved-search-alert-refresh:{user_id}"
     if refresh_window_seconds > 0:
         _alerts_refresh_limiter.set(cache_key, True, ttl_seconds=refresh_window_seconds)
 
@@ -561,6 +640,7 @@ async def refresh_saved_search_alerts_for_user(
             db,
             limit_per_search=max(1, int(settings.MARKETLY_ALERTS_SEARCH_LIMIT)),
             user_id=user_id,
+            due_only=True,
         )
     except Exception as exc:
         db.rollback()
@@ -577,6 +657,7 @@ async def run_saved_search_alert_check(
     *,
     saved_search: SavedSearch,
     limit_per_search: int,
+    prefetched_search: PrefetchedAlertSearch | None = None,
 ) -> SavedSearchAlertCheckOutcome:
     source_list = _split_sources(saved_search.sources)
     attempted_at = _utc_now()
@@ -634,17 +715,22 @@ async def run_saved_search_alert_check(
             error_message=error_message,
         )
 
-    results, _, _, source_errors = await unified_search(
-        query=saved_search.query,
-        sources=effective_source_list,
-        limit=limit_per_search,
-        offset=0,
-        sort="newest",
-        facebook_runtime_context=(
-            facebook_runtime_context if "facebook" in effective_source_list else None
-        ),
-        search_location_context=search_location_context,
-    )
+    if prefetched_search is not None and "facebook" not in effective_source_list:
+        # Enrichment and the diff mutate listings, so every saved search works on its own copy.
+        results = [item.model_copy(deep=True) for item in prefetched_search.results]
+        source_errors = dict(prefetched_search.source_errors)
+    else:
+        results, _, _, source_errors = await unified_search(
+            query=saved_search.query,
+            sources=effective_source_list,
+            limit=limit_per_search,
+            offset=0,
+            sort="newest",
+            facebook_runtime_context=(
+                facebook_runtime_context if "facebook" in effective_source_list else None
+            ),
+            search_location_context=search_location_context,
+        )
     combined_source_errors: dict[str, object] = {
         **preflight_source_errors,
         **(source_errors or {}),
@@ -732,6 +818,7 @@ async def run_saved_search_alert_check(
         attempted_at=attempted_at,
         checked_at=checked_at,
         result_count=len(results),
+        new_listing_count=sum(1 for fingerprint in fingerprints if fingerprint not in seen_fingerprints),
         source_errors=combined_source_errors,
         source_order=source_list,
     )
@@ -765,6 +852,7 @@ async def execute_saved_search_alert_check(
     *,
     saved_search_id: int,
     limit_per_search: int,
+    prefetched_search: PrefetchedAlertSearch | None = None,
 ) -> SavedSearchAlertCheckOutcome:
     saved_search = db.query(SavedSearch).filter(SavedSearch.id == saved_search_id).first()
     if saved_search is None:
@@ -779,6 +867,7 @@ async def execute_saved_search_alert_check(
             db,
             saved_search=saved_search,
             limit_per_search=limit_per_search,
+            prefetched_search=prefetched_search,
         )
         db.commit()
         return outcome
@@ -803,42 +892,287 @@ async def execute_saved_search_alert_check(
         )
 
 
-async def run_saved_search_alert_job(
+@dataclass(frozen=True)
+class _AlertJobTarget:
+    saved_search_id: int
+    user_id: str | None
+    query: str
+    sources: tuple[str, ...]
+    location: ResolvedLocation | None = None
+    fan_in_key: tuple[str, ...] | None = None
+
+
+def _alert_source_concurrency_limits() -> dict[str, int]:
+    return {
+        "facebook": max(1, int(settings.MARKETLY_ALERTS_FACEBOOK_CONCURRENCY)),
+        "kijiji": max(1, int(settings.MARKETLY_ALERTS_KIJIJI_CONCURRENCY)),
+        "ebay": max(1, int(settings.MARKETLY_ALERTS_EBAY_CONCURRENCY)),
+    }
+
+
+def _alert_job_targets(db: Session, saved_searches: list[SavedSearch]) -> list[_AlertJobTarget]:
+    fan_in_enabled = bool(settings.MARKETLY_ALERTS_QUERY_FAN_IN_ENABLED)
+    locations: dict[str, ResolvedLocation] = {}
+    if fan_in_enabled:
+        user_ids = {
+            normalized
+            for normalized in (normalize_user_id(saved_search.user_id) for saved_search in saved_searches)
+            if normalized
+        }
+        if user_ids:
+            rows = db.query(UserLocationPreference).filter(UserLocationPreference.user_id.in_(user_ids)).all()
+            locations = {row.user_id: _resolved_location_from_preference(row) for row in rows}
+
+    targets: list[_AlertJobTarget] = []
+    for saved_search in saved_searches:
+        sources = tuple(_split_sources(saved_search.sources))
+        location = locations.get(normalize_user_id(saved_search.user_id) or "")
+        fan_in_key = None
+        # Facebook results depend on each user's cookies, so those searches always fetch alone.
+        if fan_in_enabled and sources and "facebook" not in sources:
+            fan_in_key = (
+                " ".join(str(saved_search.query or "").lower().split()),
+                ",".join(sorted(sources)),
+                location_cache_fragment(location),
+            )
+        targets.append(
+            _AlertJobTarget(
+                saved_search_id=saved_search.id,
+                user_id=saved_search.user_id,
+                query=saved_search.query,
+                sources=sources,
+                location=location,
+                fan_in_key=fan_in_key,
+            )
+        )
+
+    # Only keys shared by more than one saved search are worth a shared fetch.
+    key_counts: dict[tuple[str, ...], int] = {}
+    for target in targets:
+        if target.fan_in_key is not None:
+            key_counts[target.fan_in_key] = key_counts.get(target.fan_in_key, 0) + 1
+    return [
+        target
+        if target.fan_in_key is None or key_counts[target.fan_in_key] > 1
+        else replace(target, fan_in_key=None)
+        for target in targets
+    ]
+
+
+class _AlertSearchFanIn:
+    # The first check of a group starts the fetch; the rest await the same task.
+    def __init__(self, *, limit_per_search: int) -> None:
+        self._limit_per_search = limit_per_search
+        self._fetches: dict[tuple[str, ...], asyncio.Task] = {}
+        self.shared_fetches = 0
+
+    async def prefetch(self, target: _AlertJobTarget) -> PrefetchedAlertSearch | None:
+        if target.fan_in_key is None:
+            return None
+        fetch = self._fetches.get(target.fan_in_key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch(target))
+            self._fetches[target.fan_in_key] = fetch
+        else:
+            self.shared_fetches += 1
+        try:
+            return await asyncio.shield(fetch)
+        except Exception as exc:
+            # The check falls back to its own search and records any failure itself.
+            logger.warning("saved search alert shared fetch failed query=%s error=%s", target.query, exc)
+            return None
+
+    async def check_kwargs(self, target: _AlertJobTarget) -> dict[str, PrefetchedAlertSearch]:
+        prefetched_search = await self.prefetch(target)
+        return {} if prefetched_search is None else {"prefetched_search": prefetched_search}
+
+    async def _fetch(self, target: _AlertJobTarget) -> PrefetchedAlertSearch:
+        results, _, _, source_errors = await unified_search(
+            query=target.query,
+            sources=list(target.sources),
+            limit=self._limit_per_search,
+            offset=0,
+            sort="newest",
+            facebook_runtime_context=None,
+            search_location_context=target.location,
+        )
+        return PrefetchedAlertSearch(results=results, source_errors=dict(source_errors or {}))
+
+
+async def _run_alert_checks_concurrently(
+    targets: list[_AlertJobTarget],
+    *,
+    session_factory: Callable[[], Session],
+    fan_in: _AlertSearchFanIn,
+    limit_per_search: int,
+    concurrency: int,
+) -> list[SavedSearchAlertCheckOutcome]:
+    global_slots = asyncio.Semaphore(concurrency)
+    source_slots = {
+        source: asyncio.Semaphore(limit)
+        for source, limit in _alert_source_concurrency_limits().items()
+    }
+
+    async def _check(target: _AlertJobTarget) -> SavedSearchAlertCheckOutcome:
+        async with AsyncExitStack() as slots:
+            # Source slots first, in a fixed order, so a check waiting on a busy source does not
+            # hold a global slot that checks for other sources could use.
+            for source in sorted(set(target.sources)):
+                source_slot = source_slots.get(source)
+                if source_slot is not None:
+                    await slots.enter_async_context(source_slot)
+            await slots.enter_async_context(global_slots)
+
+            check_kwargs = await fan_in.check_kwargs(target)
+            # Each check commits or rolls back on its own, so each gets its own session.
+            check_db = session_factory()
+            try:
+                return await execute_saved_search_alert_check(
+                    check_db,
+                    saved_search_id=target.saved_search_id,
+                    limit_per_search=limit_per_search,
+                    **check_kwargs,
+                )
+            finally:
+                check_db.close()
+
+    return list(await asyncio.gather(*(_check(target) for target in targets)))
+
+
+@dataclass
+class AlertCheckBatchResult:
+    outcomes: dict[int, SavedSearchAlertCheckOutcome]
+    shared_fetches: int
+    concurrency: int
+
+
+async def run_saved_search_alert_checks(
     db: Session,
+    saved_searches: list[SavedSearch],
     *,
     limit_per_search: int,
+    concurrency: int | None = None,
+    session_factory: Callable[[], Session] | None = None,
+) -> AlertCheckBatchResult:
+    targets = _alert_job_targets(db, saved_searches)
+    job_concurrency = max(
+        1,
+        int(settings.MARKETLY_ALERTS_JOB_CONCURRENCY if concurrency is None else concurrency),
+    )
+    fan_in = _AlertSearchFanIn(limit_per_search=limit_per_search)
+
+    if job_concurrency == 1 or len(targets) <= 1:
+        outcomes: list[SavedSearchAlertCheckOutcome] = []
+        for target in targets:
+            outcomes.append(
+                await execute_saved_search_alert_check(
+                    db,
+                    saved_search_id=target.saved_search_id,
+                    limit_per_search=limit_per_search,
+                    **(await fan_in.check_kwargs(target)),
+                )
+            )
+    else:
+        outcomes = await _run_alert_checks_concurrently(
+            targets,
+            session_factory=session_factory or sessionmaker(bind=db.get_bind(), autoflush=False, autocommit=False),
+            fan_in=fan_in,
+            limit_per_search=limit_per_search,
+            concurrency=job_concurrency,
+        )
+
+    return AlertCheckBatchResult(
+        outcomes={target.saved_search_id: outcome for target, outcome in zip(targets, outcomes)},
+        shared_fetches=fan_in.shared_fetches,
+        concurrency=job_concurrency,
+    )
+
+
+def select_alert_saved_searches(
+    db: Session,
+    *,
     user_id: str | None = None,
     saved_search_id: int | None = None,
-) -> dict[str, int]:
+    due_only: bool = False,
+    now: datetime | None = None,
+) -> list[SavedSearch]:
     query = db.query(SavedSearch).filter(SavedSearch.alerts_enabled.is_(True))
     if user_id:
         query = query.filter(SavedSearch.user_id == user_id)
+    # An explicit saved search is checked even when it is not due or is beyond the per-user cap.
     if saved_search_id is not None:
-        query = query.filter(SavedSearch.id == saved_search_id)
-    saved_searches = ordered_saved_search_query(query).all()
-    if saved_search_id is None:
-        saved_searches = select_active_saved_searches(saved_searches)
+        return ordered_saved_search_query(query.filter(SavedSearch.id == saved_search_id)).all()
+    if not due_only:
+        return select_active_saved_searches(ordered_saved_search_query(query).all())
+
+    now = now or _utc_now()
+    due_rows = ordered_saved_search_query(
+        query.filter(
+            or_(
+                SavedSearch.next_alert_check_at.is_(None),
+                SavedSearch.next_alert_check_at <= now,
+            )
+        )
+    ).all()
+    if not due_rows:
+        return []
+
+    # The per-user cap counts every alert-enabled search, not just the due ones, so it is
+    # checked against the owners' full lists (ids only).
+    owner_ids = {row.user_id for row in due_rows if row.user_id is not None}
+    owner_filter = SavedSearch.user_id.in_(owner_ids)
+    if any(row.user_id is None for row in due_rows):
+        owner_filter = or_(owner_filter, SavedSearch.user_id.is_(None))
+    owner_rows = ordered_saved_search_query(
+        db.query(SavedSearch.id, SavedSearch.user_id)
+        .filter(SavedSearch.alerts_enabled.is_(True))
+        .filter(owner_filter)
+    ).all()
+    active_ids = {row.id for row in select_active_saved_searches(owner_rows)}
+    return [row for row in due_rows if row.id in active_ids]
+
+
+async def run_saved_search_alert_job(
+    db: Session,
+    *,
+    limit_per_search: int,
+    user_id: str | None = None,
+    saved_search_id: int | None = None,
+    concurrency: int | None = None,
+    session_factory: Callable[[], Session] | None = None,
+    due_only: bool = False,
+) -> dict[str, int | float]:
+    saved_searches = select_alert_saved_searches(
+        db,
+        user_id=user_id,
+        saved_search_id=saved_search_id,
+        due_only=due_only,
+    )
+    # Capture these before the checks commit and expire the loaded rows.
+    labels = [(saved_search.id, saved_search.user_id, saved_search.query) for saved_search in saved_searches]
+
+    started_at = time.perf_counter()
+    batch = await run_saved_search_alert_checks(
+        db,
+        saved_searches,
+        limit_per_search=limit_per_search,
+        concurrency=concurrency,
+        session_factory=session_factory,
+    )
 
     checked = 0
+    failed = 0
     notifications_created = 0
-
-    for saved_search in saved_searches:
+    for labeled_id, labeled_user_id, labeled_query in labels:
+        outcome = batch.outcomes[labeled_id]
         checked += 1
-        saved_search_id_value = saved_search.id
-        saved_search_user_id = saved_search.user_id
-        saved_search_query = saved_search.query
-
-        outcome = await execute_saved_search_alert_check(
-            db,
-            saved_search_id=saved_search_id_value,
-            limit_per_search=limit_per_search,
-        )
         if outcome.error_code is not None:
+            failed += 1
             logger.warning(
                 "saved search alert run incomplete id=%s user_id=%s query=%s code=%s error=%s",
-                saved_search_id_value,
-                saved_search_user_id,
-                saved_search_query,
+                labeled_id,
+                labeled_user_id,
+                labeled_query,
                 outcome.error_code,
                 outcome.error_message,
             )
@@ -846,9 +1180,28 @@ async def run_saved_search_alert_job(
         if outcome.notification_created:
             notifications_created += 1
 
+    elapsed_seconds = time.perf_counter() - started_at
+    checks_per_minute = round(checked * 60 / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0
+    if checked:
+        logger.info(
+            "saved search alert job finished checked=%s failed=%s notifications=%s concurrency=%s "
+            "shared_fetches=%s elapsed=%.1fs rate=%.1f/min",
+            checked,
+            failed,
+            notifications_created,
+            batch.concurrency,
+            batch.shared_fetches,
+            elapsed_seconds,
+            checks_per_minute,
+        )
     return {
         "checked": checked,
+        "failed": failed,
         "notifications_created": notifications_created,
+        "shared_fetches": batch.shared_fetches,
+        "concurrency": batch.concurrency,
+        "elapsed_seconds": round(elapsed_seconds, 3),
+        "checks_per_minute": checks_per_minute,
     }
 
 
@@ -858,9 +1211,7 @@ def list_notifications(
     user_id: str,
     limit: int = 25,
 ) -> list[SavedSearchNotificationOut]:
-    stale_count = purge_stale_notifications(db, user_id=user_id)
-    if stale_count > 0:
-        db.commit()
+    commit_stale_notification_purge(db, user_id=user_id)
 
     rows = (
         db.query(SavedSearchNotification)
@@ -872,6 +1223,26 @@ def list_notifications(
     return [serialize_notification(row) for row in rows]
 
 
+def list_notifications_since(
+    db: Session,
+    *,
+    user_id: str,
+    after_id: int,
+    limit: int = 25,
+) -> list[SavedSearchNotificationOut]:
+    # Only the cheap cursor read; the long poll purges stale rows once per request instead.
+    # Oldest first, so a client that advances after_id to the last id never skips unseen rows.
+    rows = (
+        db.query(SavedSearchNotification)
+        .filter(SavedSearchNotification.user_id == user_id)
+        .filter(SavedSearchNotification.id > after_id)
+        .order_by(SavedSearchNotification.id.asc())
+        .limit(max(1, min(limit, 100)))
+        .all()
+    )
+    return [serialize_notification(row) for row in rows]
+
+
 def delete_notifications_for_saved_search(
     db: Session,
     *,
@@ -889,6 +1260,17 @@ def delete_notifications_for_saved_search(
     return int(deleted or 0)
 
 
+def commit_stale_notification_purge(
+    db: Session,
+    *,
+    user_id: str,
+) -> int:
+    stale_count = purge_stale_notifications(db, user_id=user_id)
+    if stale_count > 0:
+        db.commit()
+    return stale_count
+
+
 def purge_stale_notifications(
     db: Session,
     *,
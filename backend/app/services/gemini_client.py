@@ -4,9 +4,8 @@ import json
 import logging
 import re
 
-import httpx
-
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.schemas.copilot import CopilotQueryResponse
 from app.services.scoring import tokenize
 
@@ -139,8 +138,12 @@ async def request_gemini_structured_json(
         "Content-Type": "application/json",
     }
 
-    async with httpx.AsyncClient(timeout=settings.MARKETLY_GEMINI_TIMEOUT_SECONDS) as client:
-        response = await client.post(_generate_content_url(), headers=headers, json=payload)
+    response = await get_http_client("gemini").post(
+        _generate_content_url(),
+        headers=headers,
+        json=payload,
+        timeout=settings.MARKETLY_GEMINI_TIMEOUT_SECONDS,
+    )
     response.raise_for_status()
     data = response.json()
 
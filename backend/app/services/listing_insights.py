@@ -1,19 +1,30 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import math
 import re
-from collections import defaultdict
-from dataclasses import dataclass, replace
-from datetime import datetime, timedelta, timezone
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
 from statistics import median
 
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.models.listing import Listing, ListingRisk, ListingValuation
 from app.models.listing_snapshot import ListingSnapshot
+from app.models.listing_snapshot_token import ListingSnapshotToken
+from app.models.valuation_rollup import ValuationRollup
 from app.services.scoring import tokenize
+from app.services.valuation_memo import (
+    dependency_versions,
+    get_memoized_valuation,
+    memoize_valuation,
+    valuation_memo_enabled,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +71,9 @@ DEFAULT_VALUATION_QUERY_TOKEN_LIMIT = 4
 DEFAULT_VALUATION_TEXT_TOKEN_LIMIT = 12
 DEFAULT_VALUATION_DB_QUERY_TOKEN_LIMIT = 2
 DEFAULT_RELAXED_SHARED_TOKEN_MIN = 2
+SNAPSHOT_TOKEN_MAX_LENGTH = 64
+# Bump when tokenization or profile extraction changes so stored snapshot features get recomputed.
+SNAPSHOT_FEATURES_VERSION = 1
 DEFAULT_LIVE_COHORT_VERDICT_MIN_SAMPLES = 5
 DEFAULT_LIVE_COHORT_VERDICT_MIN_CONFIDENCE = 0.70
 DEFAULT_LIVE_COHORT_UNDERPRICED_MULTIPLIER = 0.90
@@ -129,6 +143,28 @@ class SnapshotSample:
     comparable_profile: ComparableProfile
 
 
+@dataclass
+class SampleTokenIndex:
+    samples: list[SnapshotSample]
+    postings: dict[str, list[int]]
+
+
+@dataclass
+class LiveCohortIndex:
+    keys: list[str]
+    prices: list[float | None]
+    postings: dict[str, list[int]]
+    group_by_position: dict[int, tuple[str | None, ...]]
+    group_profiles: dict[tuple[str | None, ...], ComparableProfile]
+
+
+@dataclass
+class CandidateSamples:
+    prices: list[float]
+    hard_match_counts: list[int] = field(default_factory=list)
+    condition_matches: int = 0
+
+
 @dataclass
 class ValuationCandidate:
     stats: ValuationStats
@@ -170,6 +206,10 @@ def _query_family_tokens(query: str) -> frozenset[str]:
     return frozenset(_valuation_tokens(query, limit=DEFAULT_VALUATION_QUERY_TOKEN_LIMIT))
 
 
+def snapshot_query_tokens(query: str) -> list[str]:
+    return [token for token in _valuation_tokens(query) if len(token) <= SNAPSHOT_TOKEN_MAX_LENGTH]
+
+
 def _listing_similarity_tokens(item: Listing) -> frozenset[str]:
     return frozenset(
         _valuation_tokens(
@@ -326,28 +366,19 @@ def _quantile(sorted_values: list[float], q: float) -> float:
     return float(lower + (upper - lower) * weight)
 
 
-def _compute_valuation_stats(
-    prices: list[float],
-    *,
-    min_samples: int = DEFAULT_VALUATION_MIN_SAMPLES,
-) -> ValuationStats | None:
-    clean_prices = sorted(float(price) for price in prices if price is not None and price > 0)
-    if len(clean_prices) < min_samples:
-        return None
-
-    med = float(median(clean_prices))
-    if med <= 0:
-        return None
-
-    q1 = _quantile(clean_prices, 0.25)
-    q3 = _quantile(clean_prices, 0.75)
+def _valuation_stats_from_quartiles(
+    sample_count: int,
+    med: float,
+    q1: float,
+    q3: float,
+) -> ValuationStats:
     if q3 < q1:
         q1, q3 = q3, q1
     iqr = max(0.0, q3 - q1)
     spread_ratio = iqr / med if med else 1.0
     if spread_ratio > DEFAULT_VALUATION_MAX_NOISE_RATIO:
         return ValuationStats(
-            sample_count=len(clean_prices),
+            sample_count=sample_count,
             median_price=med,
             q1=q1,
             q3=q3,
@@ -356,11 +387,11 @@ def _compute_valuation_stats(
             insufficient_reason="Market prices vary too widely for a confident estimate.",
         )
 
-    sample_factor = min(1.0, len(clean_prices) / 14.0)
+    sample_factor = min(1.0, sample_count / 14.0)
     spread_factor = max(0.0, 1.0 - (spread_ratio / DEFAULT_VALUATION_MAX_NOISE_RATIO))
     confidence = round(min(0.97, 0.35 + (sample_factor * 0.4) + (spread_factor * 0.25)), 2)
     return ValuationStats(
-        sample_count=len(clean_prices),
+        sample_count=sample_count,
         median_price=med,
         q1=q1,
         q3=q3,
@@ -369,7 +400,107 @@ def _compute_valuation_stats(
     )
 
 
-def _snapshot_sample_from_row(row: ListingSnapshot) -> SnapshotSample | None:
+def _compute_valuation_stats(
+    prices: list[float],
+    *,
+    min_samples: int = DEFAULT_VALUATION_MIN_SAMPLES,
+) -> ValuationStats | None:
+    clean_prices = sorted(float(price) for price in prices if price is not None and price > 0)
+    if len(clean_prices) < min_samples:
+        return None
+
+    med = float(median(clean_prices))
+    if med <= 0:
+        return None
+
+    return _valuation_stats_from_quartiles(
+        len(clean_prices),
+        med,
+        _quantile(clean_prices, 0.25),
+        _quantile(clean_prices, 0.75),
+    )
+
+
+def _numpy_available() -> bool:
+    if not settings.MARKETLY_VALUATION_VECTORIZED_STATS:
+        return False
+    try:
+        import numpy  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _vectorized_quantiles(np, values, offsets, counts, q: float):
+    # Same interpolation as _quantile, evaluated for every group at once.
+    positions = (counts - 1) * q
+    lower_index = np.floor(positions).astype(np.int64)
+    upper_index = np.ceil(positions).astype(np.int64)
+    lower = values[offsets + lower_index]
+    upper = values[offsets + upper_index]
+    return np.where(lower_index == upper_index, lower, lower + (upper - lower) * (positions - lower_index))
+
+
+def compute_valuation_stats_batch(
+    price_groups: list[list[float]],
+    *,
+    min_samples: int = DEFAULT_VALUATION_MIN_SAMPLES,
+) -> list[ValuationStats | None]:
+    if not price_groups:
+        return []
+    if not _numpy_available():
+        return [_compute_valuation_stats(prices, min_samples=min_samples) for prices in price_groups]
+
+    import numpy as np
+
+    lengths = np.array([len(prices) for prices in price_groups], dtype=np.int64)
+    group_ids = np.repeat(np.arange(len(price_groups), dtype=np.int64), lengths)
+    flat_prices = list(chain.from_iterable(price_groups))
+    try:
+        values = np.array(flat_prices, dtype=np.float64)
+    except TypeError:
+        values = np.array([0.0 if price is None else price for price in flat_prices], dtype=np.float64)
+    keep = values > 0
+    values = values[keep]
+    group_ids = group_ids[keep]
+
+    # Groups stay contiguous after filtering, so each one is sorted in place inside the packed array.
+    counts = np.bincount(group_ids, minlength=len(price_groups))
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    for start, stop in zip(offsets.tolist(), (offsets + counts).tolist()):
+        if stop - start > 1:
+            values[start:stop].sort()
+
+    eligible = np.flatnonzero(counts >= max(1, min_samples))
+    results: list[ValuationStats | None] = [None] * len(price_groups)
+    if eligible.size == 0:
+        return results
+
+    group_counts = counts[eligible]
+    group_offsets = offsets[eligible]
+    middle = group_offsets + group_counts // 2
+    medians = np.where(
+        group_counts % 2 == 1,
+        values[middle],
+        (values[np.maximum(middle - 1, group_offsets)] + values[middle]) / 2,
+    )
+    q1_values = _vectorized_quantiles(np, values, group_offsets, group_counts, 0.25)
+    q3_values = _vectorized_quantiles(np, values, group_offsets, group_counts, 0.75)
+
+    for group, sample_count, med, q1, q3 in zip(
+        eligible.tolist(),
+        group_counts.tolist(),
+        medians.tolist(),
+        q1_values.tolist(),
+        q3_values.tolist(),
+    ):
+        if med <= 0:
+            continue
+        results[group] = _valuation_stats_from_quartiles(sample_count, med, q1, q3)
+    return results
+
+
+def _snapshot_sample_from_row(row) -> SnapshotSample | None:
     if row.price_amount is None or float(row.price_amount) <= 0:
         return None
     return SnapshotSample(
@@ -393,52 +524,258 @@ def _snapshot_sample_from_row(row: ListingSnapshot) -> SnapshotSample | None:
     )
 
 
+def snapshot_feature_columns(
+    *,
+    query: str | None,
+    title: str | None,
+    snippet: str | None,
+    condition: str | None,
+) -> dict[str, object]:
+    profile = comparable_profile_for_text(query=query, title=title, snippet=snippet, condition=condition)
+    return {
+        "features_version": SNAPSHOT_FEATURES_VERSION,
+        "normalized_condition": _normalized_condition(condition),
+        "query_tokens_json": sorted(_query_family_tokens(query or "")),
+        "text_tokens_json": sorted(_valuation_tokens(title, snippet, limit=DEFAULT_VALUATION_TEXT_TOKEN_LIMIT)),
+        "profile_model_year": profile.model_year,
+        "profile_variant": profile.variant,
+        "profile_storage": profile.storage,
+        "profile_lock_state": profile.lock_state,
+        "profile_condition_bucket": profile.condition_bucket,
+    }
+
+
+def _snapshot_sample_from_features(row) -> SnapshotSample:
+    return SnapshotSample(
+        valuation_key=row.valuation_key,
+        price=float(row.price_amount),
+        query_tokens=frozenset(row.query_tokens_json or ()),
+        text_tokens=frozenset(row.text_tokens_json or ()),
+        normalized_condition=row.normalized_condition,
+        comparable_profile=ComparableProfile(
+            model_year=row.profile_model_year,
+            variant=row.profile_variant,
+            storage=row.profile_storage,
+            lock_state=row.profile_lock_state,
+            condition_bucket=row.profile_condition_bucket,
+        ),
+    )
+
+
+_FAMILY_FEATURE_COLUMNS = (
+    ListingSnapshot.id,
+    ListingSnapshot.valuation_key,
+    ListingSnapshot.price_amount,
+    ListingSnapshot.features_version,
+    ListingSnapshot.normalized_condition,
+    ListingSnapshot.query_tokens_json,
+    ListingSnapshot.text_tokens_json,
+    ListingSnapshot.profile_model_year,
+    ListingSnapshot.profile_variant,
+    ListingSnapshot.profile_storage,
+    ListingSnapshot.profile_lock_state,
+    ListingSnapshot.profile_condition_bucket,
+)
+
+
+def _family_samples_from_rows(db: Session, rows: list, *, cutoff: datetime) -> list[SnapshotSample]:
+    samples: list[SnapshotSample | None] = []
+    stale_positions: dict[int, int] = {}
+    for row in rows:
+        if row.price_amount is None or float(row.price_amount) <= 0:
+            continue
+        if row.features_version == SNAPSHOT_FEATURES_VERSION:
+            samples.append(_snapshot_sample_from_features(row))
+        else:
+            stale_positions[int(row.id)] = len(samples)
+            samples.append(None)
+
+    # Rows written before features were stored (or under an older version) still need the text.
+    if stale_positions:
+        stale_rows = (
+            db.query(
+                ListingSnapshot.id,
+                ListingSnapshot.valuation_key,
+                ListingSnapshot.price_amount,
+                ListingSnapshot.query,
+                ListingSnapshot.title,
+                ListingSnapshot.snippet,
+                ListingSnapshot.condition,
+            )
+            .filter(ListingSnapshot.id.in_(stale_positions))
+            .filter(ListingSnapshot.observed_at >= cutoff)
+            .all()
+        )
+        for row in stale_rows:
+            samples[stale_positions[int(row.id)]] = _snapshot_sample_from_row(row)
+
+    return [sample for sample in samples if sample is not None]
+
+
+def _load_rollup_exact_prices(
+    db: Session,
+    *,
+    valuation_keys: set[str],
+    cutoff: datetime,
+) -> tuple[dict[str, list[float]], dict[str, date]]:
+    # Rollups hold at most one row per key and day, so this read is bounded by the
+    # lookback window rather than by how many snapshots have accumulated.
+    rows = (
+        db.query(
+            ValuationRollup.valuation_key,
+            ValuationRollup.bucket_date,
+            ValuationRollup.recent_prices_json,
+        )
+        .filter(ValuationRollup.valuation_key.in_(valuation_keys))
+        .filter(ValuationRollup.bucket_date >= cutoff.astimezone(timezone.utc).date())
+        .order_by(ValuationRollup.bucket_date.desc())
+        .all()
+    )
+    exact_prices: dict[str, list[float]] = {}
+    oldest_buckets: dict[str, date] = {}
+    for valuation_key, bucket_date, recent_prices in rows:
+        oldest_buckets[valuation_key] = bucket_date
+        prices = exact_prices.setdefault(valuation_key, [])
+        remaining = DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT - len(prices)
+        if remaining <= 0:
+            continue
+        prices.extend(float(price) for price in list(reversed(recent_prices or []))[:remaining])
+    return exact_prices, oldest_buckets
+
+
+def _load_snapshot_exact_prices(
+    db: Session,
+    *,
+    valuation_keys: set[str],
+    cutoff: datetime,
+    before_buckets: dict[str, date] | None = None,
+) -> dict[str, list[float]]:
+    # Keys with a bucket in before_buckets only read the rows older than that day.
+    before_buckets = before_buckets or {}
+    unbounded_keys = {key for key in valuation_keys if key not in before_buckets}
+    key_filters = [ListingSnapshot.valuation_key.in_(unbounded_keys)] if unbounded_keys else []
+    key_filters.extend(
+        and_(
+            ListingSnapshot.valuation_key == key,
+            ListingSnapshot.observed_at < datetime.combine(bucket_date, time.min, tzinfo=timezone.utc),
+        )
+        for key, bucket_date in before_buckets.items()
+        if key in valuation_keys
+    )
+    exact_prices: dict[str, list[float]] = defaultdict(list)
+    rows = (
+        db.query(ListingSnapshot.valuation_key, ListingSnapshot.price_amount)
+        .filter(or_(*key_filters))
+        .filter(ListingSnapshot.price_amount.isnot(None))
+        .filter(ListingSnapshot.price_amount > 0)
+        .filter(ListingSnapshot.observed_at >= cutoff)
+        .order_by(ListingSnapshot.observed_at.desc())
+        .all()
+    )
+    for valuation_key, price_amount in rows:
+        prices = exact_prices[valuation_key]
+        if len(prices) < DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT:
+            prices.append(float(price_amount))
+    return exact_prices
+
+
+def _load_indexed_family_rows(
+    db: Session,
+    *,
+    tokens: list[str],
+    cutoff: datetime,
+) -> list:
+    # Snapshots whose query carries every lookup token, resolved through the token postings
+    # instead of substring scans over listing_snapshots.query.
+    matching_ids = (
+        select(ListingSnapshotToken.snapshot_id)
+        .where(ListingSnapshotToken.token.in_(tokens))
+        .where(ListingSnapshotToken.observed_at >= cutoff)
+        .group_by(ListingSnapshotToken.snapshot_id)
+        .having(func.count(func.distinct(ListingSnapshotToken.token)) == len(set(tokens)))
+    )
+    return (
+        db.query(*_FAMILY_FEATURE_COLUMNS)
+        .filter(ListingSnapshot.id.in_(matching_ids))
+        .filter(ListingSnapshot.observed_at >= cutoff)
+        .filter(ListingSnapshot.price_amount.isnot(None))
+        .filter(ListingSnapshot.price_amount > 0)
+        .order_by(ListingSnapshot.observed_at.desc())
+        .limit(DEFAULT_VALUATION_HISTORY_LIMIT)
+        .all()
+    )
+
+
+def _load_scanned_family_rows(
+    db: Session,
+    *,
+    query: str,
+    db_query_tokens: list[str],
+    cutoff: datetime,
+) -> list:
+    family_query = (
+        db.query(*_FAMILY_FEATURE_COLUMNS)
+        .filter(ListingSnapshot.price_amount.isnot(None))
+        .filter(ListingSnapshot.price_amount > 0)
+        .filter(ListingSnapshot.observed_at >= cutoff)
+        .order_by(ListingSnapshot.observed_at.desc())
+    )
+    if db_query_tokens:
+        for token in db_query_tokens:
+            family_query = family_query.filter(ListingSnapshot.query.ilike(f"%{token}%"))
+    else:
+        family_query = family_query.filter(ListingSnapshot.query == query)
+    return family_query.limit(DEFAULT_VALUATION_HISTORY_LIMIT).all()
+
+
 def _load_recent_snapshot_samples(
     db: Session,
     *,
     query: str,
     valuation_keys: list[str],
     lookback_days: int | None = None,
-) -> tuple[dict[str, list[SnapshotSample]], list[SnapshotSample]]:
+) -> tuple[dict[str, list[float]], list[SnapshotSample]] | None:
     effective_lookback_days = lookback_days if lookback_days is not None else settings.MARKETLY_VALUATION_LOOKBACK_DAYS
     cutoff = datetime.now(timezone.utc) - timedelta(days=effective_lookback_days)
-    exact_samples: dict[str, list[SnapshotSample]] = defaultdict(list)
+    exact_prices: dict[str, list[float]] = {}
     family_samples: list[SnapshotSample] = []
 
     try:
         if valuation_keys:
-            exact_rows = (
-                db.query(ListingSnapshot)
-                .filter(ListingSnapshot.valuation_key.in_(valuation_keys))
-                .filter(ListingSnapshot.price_amount.isnot(None))
-                .filter(ListingSnapshot.price_amount > 0)
-                .filter(ListingSnapshot.observed_at >= cutoff)
-                .order_by(ListingSnapshot.observed_at.desc())
-                .all()
+            unique_keys = set(valuation_keys)
+            exact_prices, oldest_buckets = _load_rollup_exact_prices(
+                db,
+                valuation_keys=unique_keys,
+                cutoff=cutoff,
             )
-            for row in exact_rows:
-                sample = _snapshot_sample_from_row(row)
-                if sample is not None:
-                    exact_samples[row.valuation_key].append(sample)
-
-        family_query = (
-            db.query(ListingSnapshot)
-            .filter(ListingSnapshot.price_amount.isnot(None))
-            .filter(ListingSnapshot.price_amount > 0)
-            .filter(ListingSnapshot.observed_at >= cutoff)
-            .order_by(ListingSnapshot.observed_at.desc())
-        )
-        db_query_tokens = _valuation_tokens(query, limit=DEFAULT_VALUATION_DB_QUERY_TOKEN_LIMIT)
-        if db_query_tokens:
-            for token in db_query_tokens:
-                family_query = family_query.filter(ListingSnapshot.query.ilike(f"%{token}%"))
-        else:
-            family_query = family_query.filter(ListingSnapshot.query == query)
+            # History from before a key's first rollup day (e.g. snapshots written before the
+            # rollups existed and not yet backfilled) is only in the raw rows, so top up from them.
+            short_keys = {
+                key
+                for key in unique_keys
+                if len(exact_prices.get(key, [])) < DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT
+            }
+            if short_keys:
+                older_prices = _load_snapshot_exact_prices(
+                    db,
+                    valuation_keys=short_keys,
+                    cutoff=cutoff,
+                    before_buckets=oldest_buckets,
+                )
+                for key, prices in older_prices.items():
+                    merged = exact_prices.setdefault(key, [])
+                    merged.extend(prices[: DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT - len(merged)])
 
-        family_rows = family_query.limit(DEFAULT_VALUATION_HISTORY_LIMIT).all()
+        family_rows: list = []
+        db_query_tokens = _valuation_tokens(query, limit=DEFAULT_VALUATION_DB_QUERY_TOKEN_LIMIT)
+        indexed_tokens = [token for token in db_query_tokens if len(token) <= SNAPSHOT_TOKEN_MAX_LENGTH]
+        if indexed_tokens:
+            family_rows = _load_indexed_family_rows(db, tokens=indexed_tokens, cutoff=cutoff)
+        if not family_rows and (settings.MARKETLY_VALUATION_TOKEN_INDEX_FALLBACK or not indexed_tokens):
+            family_rows = _load_scanned_family_rows(db, query=query, db_query_tokens=db_query_tokens, cutoff=cutoff)
         if not family_rows and query:
             family_rows = (
-                db.query(ListingSnapshot)
+                db.query(*_FAMILY_FEATURE_COLUMNS)
                 .filter(ListingSnapshot.query == query)
                 .filter(ListingSnapshot.price_amount.isnot(None))
                 .filter(ListingSnapshot.price_amount > 0)
@@ -448,21 +785,44 @@ def _load_recent_snapshot_samples(
                 .all()
             )
 
-        for row in family_rows:
-            sample = _snapshot_sample_from_row(row)
-            if sample is not None:
-                family_samples.append(sample)
+        family_samples = _family_samples_from_rows(db, family_rows, cutoff=cutoff)
     except Exception as exc:
         logger.warning("listing valuation lookup failed: %s", exc)
-        return {}, []
+        return None
 
-    return exact_samples, family_samples
+    return exact_prices, family_samples
 
 
 def _shared_token_count(left: frozenset[str], right: frozenset[str]) -> int:
     return len(left.intersection(right))
 
 
+def _build_sample_token_index(
+    query_tokens: frozenset[str],
+    family_samples: list[SnapshotSample],
+) -> SampleTokenIndex:
+    # The query-family check does not depend on the listing, so apply it once per search.
+    samples = [sample for sample in family_samples if _same_query_family(sample.query_tokens, query_tokens)]
+    postings: dict[str, list[int]] = defaultdict(list)
+    for position, sample in enumerate(samples):
+        for token in sample.text_tokens:
+            postings[token].append(position)
+    return SampleTokenIndex(samples=samples, postings=dict(postings))
+
+
+def _samples_sharing_tokens(
+    index: SampleTokenIndex,
+    tokens: frozenset[str],
+    *,
+    min_shared: int,
+) -> list[SnapshotSample]:
+    shared_counts: Counter[int] = Counter()
+    for token in tokens:
+        shared_counts.update(index.postings.get(token, ()))
+    # Sorted positions keep the original newest-first sample order.
+    return [index.samples[position] for position in sorted(shared_counts) if shared_counts[position] >= min_shared]
+
+
 def _same_query_family(snapshot_query_tokens: frozenset[str], query_tokens: frozenset[str]) -> bool:
     if not query_tokens:
         return True
@@ -486,15 +846,15 @@ def _confidence_label(confidence: float) -> str:
     return "low"
 
 
-def _historical_exact_candidate(
+def _historical_exact_samples(
     valuation_key: str,
-    exact_samples: dict[str, list[SnapshotSample]],
-) -> ValuationCandidate | None:
-    samples = exact_samples.get(valuation_key) or []
-    stats = _compute_valuation_stats(
-        [sample.price for sample in samples[:DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT]],
-        min_samples=DEFAULT_VALUATION_MIN_SAMPLES,
-    )
+    exact_prices: dict[str, list[float]],
+) -> CandidateSamples:
+    prices = exact_prices.get(valuation_key) or []
+    return CandidateSamples(prices=prices[:DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT])
+
+
+def _historical_exact_candidate(stats: ValuationStats | None) -> ValuationCandidate | None:
     if stats is None:
         return None
     return ValuationCandidate(
@@ -505,40 +865,38 @@ def _historical_exact_candidate(
     )
 
 
-def _historical_relaxed_candidate(
+def _historical_relaxed_samples(
     *,
-    query_tokens: frozenset[str],
+    family_index: SampleTokenIndex,
     listing_tokens: frozenset[str],
     comparable_profile: ComparableProfile,
     normalized_condition: str | None,
-    family_samples: list[SnapshotSample],
-) -> ValuationCandidate | None:
-    matched_samples: list[SnapshotSample] = []
-    condition_matches = 0
-    hard_match_counts: list[int] = []
+) -> CandidateSamples:
+    samples = CandidateSamples(prices=[])
 
-    for sample in family_samples:
-        if not _same_query_family(sample.query_tokens, query_tokens):
-            continue
-        if _shared_token_count(listing_tokens, sample.text_tokens) < DEFAULT_RELAXED_SHARED_TOKEN_MIN:
-            continue
+    for sample in _samples_sharing_tokens(family_index, listing_tokens, min_shared=DEFAULT_RELAXED_SHARED_TOKEN_MIN):
         if not _profiles_compatible(comparable_profile, sample.comparable_profile):
             continue
-        matched_samples.append(sample)
-        hard_match_counts.append(_hard_attribute_match_count(comparable_profile, sample.comparable_profile))
+        samples.prices.append(sample.price)
+        samples.hard_match_counts.append(_hard_attribute_match_count(comparable_profile, sample.comparable_profile))
         if normalized_condition and sample.normalized_condition == normalized_condition:
-            condition_matches += 1
+            samples.condition_matches += 1
 
-    stats = _compute_valuation_stats(
-        [sample.price for sample in matched_samples],
-        min_samples=DEFAULT_VALUATION_FALLBACK_MIN_SAMPLES,
-    )
+    return samples
+
+
+def _historical_relaxed_candidate(
+    stats: ValuationStats | None,
+    samples: CandidateSamples,
+    *,
+    normalized_condition: str | None,
+) -> ValuationCandidate | None:
     if stats is None:
         return None
 
-    stats = _apply_hard_match_bonus(stats, hard_match_counts)
-    if normalized_condition and matched_samples:
-        condition_bonus = 0.05 * (condition_matches / len(matched_samples))
+    stats = _apply_hard_match_bonus(stats, samples.hard_match_counts)
+    if normalized_condition and samples.prices:
+        condition_bonus = 0.05 * (samples.condition_matches / len(samples.prices))
         if condition_bonus > 0:
             stats = replace(stats, confidence=round(min(0.97, stats.confidence + condition_bonus), 2))
 
@@ -550,38 +908,104 @@ def _historical_relaxed_candidate(
     )
 
 
-def _live_cohort_candidate(
-    *,
-    item: Listing,
-    listing_tokens: frozenset[str],
-    comparable_profile: ComparableProfile,
+def _profile_signature(profile: ComparableProfile) -> tuple[str | None, ...]:
+    return (
+        profile.model_year,
+        profile.variant,
+        profile.storage,
+        profile.lock_state,
+        profile.condition_bucket,
+    )
+
+
+def _build_live_cohort_index(
     listings: list[Listing],
+    *,
     listing_tokens_by_key: dict[str, frozenset[str]],
     comparable_profiles_by_key: dict[str, ComparableProfile],
-) -> ValuationCandidate | None:
-    current_key = listing_key(item)
-    prices: list[float] = []
-    hard_match_counts: list[int] = []
+) -> LiveCohortIndex:
+    keys = [listing_key(item) for item in listings]
+    prices: list[float | None] = []
+    postings: dict[str, list[int]] = defaultdict(list)
+    profile_groups: dict[tuple[str | None, ...], list[int]] = defaultdict(list)
+    for position, (item, key) in enumerate(zip(listings, keys)):
+        price = float(item.price.amount) if item.price is not None else 0.0
+        if price <= 0:
+            prices.append(None)
+            continue
+        prices.append(price)
+        # Only priced listings can be peers, so only they are posted.
+        for token in listing_tokens_by_key.get(key, frozenset()):
+            postings[token].append(position)
+        profile = comparable_profiles_by_key.get(key)
+        if profile is not None:
+            profile_groups[_profile_signature(profile)].append(position)
+
+    group_by_position: dict[int, tuple[str | None, ...]] = {}
+    group_profiles: dict[tuple[str | None, ...], ComparableProfile] = {}
+    for signature, positions in profile_groups.items():
+        group_profiles[signature] = comparable_profiles_by_key[keys[positions[0]]]
+        for position in positions:
+            group_by_position[position] = signature
+
+    return LiveCohortIndex(
+        keys=keys,
+        prices=prices,
+        postings=dict(postings),
+        group_by_position=group_by_position,
+        group_profiles=group_profiles,
+    )
 
-    for peer in listings:
-        if listing_key(peer) == current_key:
+
+def _live_cohort_samples(
+    index: LiveCohortIndex,
+    position: int,
+    *,
+    listing_tokens: frozenset[str],
+    comparable_profile: ComparableProfile,
+) -> CandidateSamples:
+    current_key = index.keys[position]
+    samples = CandidateSamples(prices=[])
+
+    shared_counts: Counter[int] = Counter()
+    for token in listing_tokens:
+        shared_counts.update(index.postings.get(token, ()))
+
+    # Compatibility and hard-match counts depend only on the peer's profile, so they are
+    # evaluated once per profile group rather than once per peer.
+    group_matches: dict[tuple[str | None, ...], int | None] = {}
+    for peer_position in sorted(shared_counts):
+        if shared_counts[peer_position] < DEFAULT_RELAXED_SHARED_TOKEN_MIN:
             continue
-        if peer.price is None or float(peer.price.amount) <= 0:
+        if index.keys[peer_position] == current_key:
             continue
-        peer_tokens = listing_tokens_by_key.get(listing_key(peer), frozenset())
-        if _shared_token_count(listing_tokens, peer_tokens) < DEFAULT_RELAXED_SHARED_TOKEN_MIN:
+        signature = index.group_by_position.get(peer_position)
+        if signature is None:
             continue
-        peer_profile = comparable_profiles_by_key.get(listing_key(peer))
-        if peer_profile is None or not _profiles_compatible(comparable_profile, peer_profile):
+        if signature not in group_matches:
+            peer_profile = index.group_profiles[signature]
+            group_matches[signature] = (
+                _hard_attribute_match_count(comparable_profile, peer_profile)
+                if _profiles_compatible(comparable_profile, peer_profile)
+                else None
+            )
+        match_count = group_matches[signature]
+        if match_count is None:
             continue
-        prices.append(float(peer.price.amount))
-        hard_match_counts.append(_hard_attribute_match_count(comparable_profile, peer_profile))
+        samples.prices.append(index.prices[peer_position])
+        samples.hard_match_counts.append(match_count)
 
-    stats = _compute_valuation_stats(prices, min_samples=DEFAULT_VALUATION_FALLBACK_MIN_SAMPLES)
+    return samples
+
+
+def _live_cohort_candidate(
+    stats: ValuationStats | None,
+    samples: CandidateSamples,
+) -> ValuationCandidate | None:
     if stats is None:
         return None
 
-    stats = _apply_hard_match_bonus(stats, hard_match_counts)
+    stats = _apply_hard_match_bonus(stats, samples.hard_match_counts)
     verdict_allowed = (
         stats.insufficient_reason is None
         and stats.sample_count >= DEFAULT_LIVE_COHORT_VERDICT_MIN_SAMPLES
@@ -599,22 +1023,17 @@ def _live_cohort_candidate(
     )
 
 
-def _category_prior_candidate(
+def _category_prior_samples(
     *,
-    query_tokens: frozenset[str],
+    family_index: SampleTokenIndex,
     listing_tokens: frozenset[str],
-    family_samples: list[SnapshotSample],
-) -> ValuationCandidate | None:
-    prices: list[float] = []
+) -> CandidateSamples:
+    return CandidateSamples(
+        prices=[sample.price for sample in _samples_sharing_tokens(family_index, listing_tokens, min_shared=1)]
+    )
 
-    for sample in family_samples:
-        if not _same_query_family(sample.query_tokens, query_tokens):
-            continue
-        if _shared_token_count(listing_tokens, sample.text_tokens) < 1:
-            continue
-        prices.append(sample.price)
 
-    stats = _compute_valuation_stats(prices, min_samples=DEFAULT_VALUATION_FALLBACK_MIN_SAMPLES)
+def _category_prior_candidate(stats: ValuationStats | None) -> ValuationCandidate | None:
     if stats is None:
         return None
 
@@ -838,6 +1257,44 @@ def build_listing_risk(item: Listing) -> ListingRisk:
     )
 
 
+def snapshot_memo_dependencies(query: str, valuation_key: str) -> list[str]:
+    # What a written snapshot can change: its key's exact tier and every query family it joins.
+    return [
+        f"key:{valuation_key}",
+        f"query:{query}",
+        *(f"token:{token}" for token in snapshot_query_tokens(query)),
+    ]
+
+
+def _valuation_memo_key(
+    query: str,
+    item: Listing,
+    *,
+    valuation_key: str,
+    live_samples: CandidateSamples,
+) -> str:
+    # Everything a listing's valuation reads: its own text and price, the live peers on this
+    # page, and the versions of the snapshot history behind its exact and family tiers.
+    dependencies = [
+        f"key:{valuation_key}",
+        f"query:{query}",
+        *(f"token:{token}" for token in _valuation_tokens(query, limit=DEFAULT_VALUATION_DB_QUERY_TOKEN_LIMIT)),
+    ]
+    parts = (
+        query,
+        item.title,
+        item.snippet or "",
+        item.condition or "",
+        f"{float(item.price.amount):.2f}" if item.price is not None else "",
+        (item.price.currency if item.price is not None else "") or "",
+        str(settings.MARKETLY_VALUATION_LOOKBACK_DAYS),
+        ",".join(f"{price:.2f}" for price in live_samples.prices),
+        ",".join(str(match_count) for match_count in live_samples.hard_match_counts),
+        ",".join(str(version) for version in dependency_versions(dependencies)),
+    )
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
 def enrich_listings_with_insights(
     db: Session,
     query: str,
@@ -847,13 +1304,6 @@ def enrich_listings_with_insights(
         return listings
 
     valuation_keys = [valuation_key_for_listing(query, item) for item in listings]
-    exact_samples, family_samples = _load_recent_snapshot_samples(
-        db,
-        query=query,
-        valuation_keys=valuation_keys,
-        lookback_days=settings.MARKETLY_VALUATION_LOOKBACK_DAYS,
-    )
-    query_tokens = _query_family_tokens(query)
     listing_tokens_by_key = {
         listing_key(item): _listing_similarity_tokens(item)
         for item in listings
@@ -868,8 +1318,16 @@ def enrich_listings_with_insights(
         for item in listings
     }
 
-    for item, valuation_key in zip(listings, valuation_keys):
-        current_listing_key = listing_key(item)
+    live_index = _build_live_cohort_index(
+        listings,
+        listing_tokens_by_key=listing_tokens_by_key,
+        comparable_profiles_by_key=comparable_profiles_by_key,
+    )
+    listing_tokens: list[frozenset[str]] = []
+    comparable_profiles: list[ComparableProfile] = []
+    live_inputs: list[CandidateSamples] = []
+    for position, item in enumerate(listings):
+        current_listing_key = live_index.keys[position]
         current_listing_tokens = listing_tokens_by_key.get(current_listing_key, frozenset())
         current_comparable_profile = comparable_profiles_by_key.get(
             current_listing_key,
@@ -880,36 +1338,109 @@ def enrich_listings_with_insights(
                 condition=item.condition,
             ),
         )
-        normalized_condition = _normalized_condition(item.condition)
-        exact_candidate = _historical_exact_candidate(valuation_key, exact_samples)
-        relaxed_candidate = _historical_relaxed_candidate(
-            query_tokens=query_tokens,
-            listing_tokens=current_listing_tokens,
-            comparable_profile=current_comparable_profile,
-            normalized_condition=normalized_condition,
-            family_samples=family_samples,
+        listing_tokens.append(current_listing_tokens)
+        comparable_profiles.append(current_comparable_profile)
+        live_inputs.append(
+            _live_cohort_samples(
+                live_index,
+                position,
+                listing_tokens=current_listing_tokens,
+                comparable_profile=current_comparable_profile,
+            )
         )
-        live_candidate = _live_cohort_candidate(
-            item=item,
-            listing_tokens=current_listing_tokens,
-            comparable_profile=current_comparable_profile,
-            listings=listings,
-            listing_tokens_by_key=listing_tokens_by_key,
-            comparable_profiles_by_key=comparable_profiles_by_key,
+
+    # Listings valued recently with identical inputs reuse that result; only the rest need
+    # the snapshot history and the stats passes below.
+    memo_keys: list[str | None] = [None] * len(listings)
+    pending_positions = list(range(len(listings)))
+    if valuation_memo_enabled():
+        pending_positions = []
+        for position, item in enumerate(listings):
+            memo_key = _valuation_memo_key(
+                query,
+                item,
+                valuation_key=valuation_keys[position],
+                live_samples=live_inputs[position],
+            )
+            memo_keys[position] = memo_key
+            memoized = get_memoized_valuation(memo_key)
+            if memoized is None:
+                pending_positions.append(position)
+                continue
+            item.valuation = memoized
+            item.risk = build_listing_risk(item)
+        if not pending_positions:
+            return listings
+
+    history = _load_recent_snapshot_samples(
+        db,
+        query=query,
+        valuation_keys=[valuation_keys[position] for position in pending_positions],
+        lookback_days=settings.MARKETLY_VALUATION_LOOKBACK_DAYS,
+    )
+    if history is None:
+        # Do not memoize valuations built without the history that failed to load.
+        memo_keys = [None] * len(listings)
+        exact_prices, family_samples = {}, []
+    else:
+        exact_prices, family_samples = history
+    family_index = _build_sample_token_index(_query_family_tokens(query), family_samples)
+
+    exact_inputs: list[CandidateSamples] = []
+    relaxed_inputs: list[CandidateSamples] = []
+    category_inputs: list[CandidateSamples] = []
+    normalized_conditions: list[str | None] = []
+    for position in pending_positions:
+        item = listings[position]
+        normalized_condition = _normalized_condition(item.condition)
+        normalized_conditions.append(normalized_condition)
+        exact_inputs.append(_historical_exact_samples(valuation_keys[position], exact_prices))
+        relaxed_inputs.append(
+            _historical_relaxed_samples(
+                family_index=family_index,
+                listing_tokens=listing_tokens[position],
+                comparable_profile=comparable_profiles[position],
+                normalized_condition=normalized_condition,
+            )
         )
-        category_candidate = _category_prior_candidate(
-            query_tokens=query_tokens,
-            listing_tokens=current_listing_tokens,
-            family_samples=family_samples,
+        category_inputs.append(
+            _category_prior_samples(
+                family_index=family_index,
+                listing_tokens=listing_tokens[position],
+            )
         )
+    pending_live_inputs = [live_inputs[position] for position in pending_positions]
 
+    # Stats for every listing and tier come from two batched passes instead of one sort per candidate.
+    pending_count = len(pending_positions)
+    exact_stats = compute_valuation_stats_batch(
+        [samples.prices for samples in exact_inputs],
+        min_samples=DEFAULT_VALUATION_MIN_SAMPLES,
+    )
+    fallback_stats = compute_valuation_stats_batch(
+        [samples.prices for samples in relaxed_inputs + pending_live_inputs + category_inputs],
+        min_samples=DEFAULT_VALUATION_FALLBACK_MIN_SAMPLES,
+    )
+    relaxed_stats = fallback_stats[:pending_count]
+    live_stats = fallback_stats[pending_count : pending_count * 2]
+    category_stats = fallback_stats[pending_count * 2 :]
+
+    for index, position in enumerate(pending_positions):
+        item = listings[position]
         item.valuation = build_listing_valuation(
             item,
-            exact_candidate=exact_candidate,
-            relaxed_candidate=relaxed_candidate,
-            live_candidate=live_candidate,
-            category_candidate=category_candidate,
+            exact_candidate=_historical_exact_candidate(exact_stats[index]),
+            relaxed_candidate=_historical_relaxed_candidate(
+                relaxed_stats[index],
+                relaxed_inputs[index],
+                normalized_condition=normalized_conditions[index],
+            ),
+            live_candidate=_live_cohort_candidate(live_stats[index], pending_live_inputs[index]),
+            category_candidate=_category_prior_candidate(category_stats[index]),
         )
         item.risk = build_listing_risk(item)
+        memo_key = memo_keys[position]
+        if memo_key is not None:
+            memoize_valuation(memo_key, item.valuation)
 
     return listings
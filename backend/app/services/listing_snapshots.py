@@ -1,62 +1,359 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import logging
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import bindparam, insert, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db import SessionLocal
 from app.models.listing import Listing
 from app.models.listing_snapshot import ListingSnapshot
-from app.services.listing_insights import listing_fingerprint, valuation_key_for_listing
+from app.models.listing_snapshot_token import ListingSnapshotToken
+from app.services.listing_insights import (
+    SNAPSHOT_FEATURES_VERSION,
+    listing_fingerprint,
+    snapshot_feature_columns,
+    snapshot_memo_dependencies,
+    snapshot_query_tokens,
+    valuation_key_for_listing,
+)
+from app.services.snapshot_partitions import snapshot_retained_since, snapshots_partitioned
 from app.services.user_ids import normalize_user_id
+from app.services.valuation_memo import bump_dependency_versions_on_commit
+from app.services.valuation_rollups import SnapshotObservation, record_valuation_rollups, rollup_bucket_date
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TOKEN_BACKFILL_BATCH_SIZE = 1000
+DEFAULT_FEATURE_BACKFILL_BATCH_SIZE = 500
+OBSERVATION_KEY_LOOKUP_CHUNK_SIZE = 500
 
-def persist_listing_snapshots(
+
+def _snapshot_token_payloads(snapshots: list[tuple[int, str, datetime]]) -> list[dict[str, object]]:
+    tokens_by_query: dict[str, list[str]] = {}
+    payloads: list[dict[str, object]] = []
+    for snapshot_id, query, observed_at in snapshots:
+        if query not in tokens_by_query:
+            tokens_by_query[query] = snapshot_query_tokens(query)
+        payloads.extend(
+            {"snapshot_id": snapshot_id, "token": token, "observed_at": observed_at}
+            for token in tokens_by_query[query]
+        )
+    return payloads
+
+
+def _snapshot_payloads(
     *,
     query: str,
     listings: list[Listing],
-    user_id: object | None = None,
-    saved_search_id: int | None = None,
-    observed_at: datetime | None = None,
+    user_id: str | None,
+    saved_search_id: int | None,
+    observed_at: datetime,
+) -> list[dict[str, object]]:
+    return [
+        {
+            "user_id": user_id,
+            "saved_search_id": saved_search_id,
+            "source": item.source,
+            "source_listing_id": item.source_listing_id or item.url,
+            "listing_fingerprint": listing_fingerprint(item),
+            "query": query,
+            "title": item.title,
+            "price_amount": float(item.price.amount) if item.price is not None else None,
+            "price_currency": (item.price.currency if item.price is not None else None),
+            "location": item.location,
+            "condition": item.condition,
+            "snippet": item.snippet,
+            "image_count": len(item.image_urls or []),
+            "url": item.url,
+            "valuation_key": valuation_key_for_listing(query, item),
+            "observed_at": observed_at,
+            **snapshot_feature_columns(
+                query=query,
+                title=item.title,
+                snippet=item.snippet,
+                condition=item.condition,
+            ),
+        }
+        for item in listings
+    ]
+
+
+def snapshot_observation_key(payload: dict[str, object]) -> str:
+    # One observation per saved search, query, listing, price and UTC day; who asked is not
+    # part of it, so cache hits from other users count against the same row.
+    price_amount = payload.get("price_amount")
+    parts = (
+        str(payload.get("saved_search_id") or ""),
+        str(payload.get("query") or ""),
+        str(payload.get("listing_fingerprint") or ""),
+        "" if price_amount is None else f"{float(price_amount):.2f}",
+        str(payload.get("price_currency") or ""),
+        rollup_bucket_date(payload.get("observed_at")).isoformat(),
+    )
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _collapse_observations(payloads: list[dict[str, object]]) -> list[dict[str, object]]:
+    if not settings.MARKETLY_SNAPSHOT_DEDUPE_ENABLED:
+        return [
+            {
+                **payload,
+                "observation_key": None,
+                "observation_count": 1,
+                "last_observed_at": payload["observed_at"],
+            }
+            for payload in payloads
+        ]
+
+    collapsed: dict[str, dict[str, object]] = {}
+    for payload in payloads:
+        observation_key = snapshot_observation_key(payload)
+        existing = collapsed.get(observation_key)
+        if existing is None:
+            collapsed[observation_key] = {
+                **payload,
+                "observation_key": observation_key,
+                "observation_count": 1,
+                "last_observed_at": payload["observed_at"],
+            }
+            continue
+        existing["observation_count"] = int(existing["observation_count"]) + 1
+        existing["last_observed_at"] = max(existing["last_observed_at"], payload["observed_at"])
+    return list(collapsed.values())
+
+
+def _observation_day_bounds(observed_at: datetime) -> tuple[datetime, datetime]:
+    day_start = datetime.combine(rollup_bucket_date(observed_at), datetime.min.time(), tzinfo=timezone.utc)
+    return day_start, day_start + timedelta(days=1)
+
+
+def _known_observation_keys(session: Session, observations: list[dict[str, object]]) -> set[str]:
+    keyed = [observation for observation in observations if observation["observation_key"]]
+    if not keyed:
+        return set()
+    # A key's row was first seen on the key's own day; bounding by those days lets a
+    # partitioned table read only the current partition.
+    day_bounds = [_observation_day_bounds(observation["observed_at"]) for observation in keyed]
+    observed_from = min(lower for lower, _ in day_bounds)
+    observed_until = max(upper for _, upper in day_bounds)
+    observation_keys = [str(observation["observation_key"]) for observation in keyed]
+
+    known: set[str] = set()
+    for start in range(0, len(observation_keys), OBSERVATION_KEY_LOOKUP_CHUNK_SIZE):
+        chunk = observation_keys[start : start + OBSERVATION_KEY_LOOKUP_CHUNK_SIZE]
+        known.update(
+            session.execute(
+                select(ListingSnapshot.observation_key)
+                .where(ListingSnapshot.observation_key.in_(chunk))
+                .where(ListingSnapshot.observed_at >= observed_from)
+                .where(ListingSnapshot.observed_at < observed_until)
+            ).scalars()
+        )
+    return known
+
+
+def _bump_observations(session: Session, observations: list[dict[str, object]]) -> None:
+    if not observations:
+        return
+    params: list[dict[str, object]] = []
+    for observation in observations:
+        day_start, day_end = _observation_day_bounds(observation["observed_at"])
+        params.append(
+            {
+                "b_observation_key": observation["observation_key"],
+                "b_observation_count": observation["observation_count"],
+                "b_last_observed_at": observation["last_observed_at"],
+                "b_day_start": day_start,
+                "b_day_end": day_end,
+            }
+        )
+    table = ListingSnapshot.__table__
+    session.execute(
+        update(table)
+        .where(table.c.observation_key == bindparam("b_observation_key"))
+        .where(table.c.observed_at >= bindparam("b_day_start"))
+        .where(table.c.observed_at < bindparam("b_day_end"))
+        .values(
+            observation_count=table.c.observation_count + bindparam("b_observation_count"),
+            last_observed_at=bindparam("b_last_observed_at"),
+        ),
+        params,
+    )
+
+
+def _record_observations(
+    session: Session,
+    observations: list[dict[str, object]],
+) -> list[tuple[int, dict[str, object]]]:
+    # Returns (snapshot id, payload) for the rows actually inserted; repeats only bump a counter.
+    for attempt in range(2):
+        known = _known_observation_keys(session, observations)
+        fresh = [observation for observation in observations if observation["observation_key"] not in known]
+        repeated = [observation for observation in observations if observation["observation_key"] in known]
+        try:
+            # Another worker can insert the same key between the lookup and the insert; the
+            # savepoint lets us look again instead of losing the whole batch.
+            with session.begin_nested():
+                snapshot_ids = _insert_snapshot_rows(session, fresh) if fresh else []
+        except IntegrityError:
+            if attempt:
+                raise
+            continue
+        _bump_observations(session, repeated)
+        return list(zip(snapshot_ids, fresh))
+    return []
+
+
+def _copy_value(value: object) -> str:
+    # Unquoted empty is NULL in COPY csv, so every non-NULL value is quoted to keep "" distinct.
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        text = value.isoformat()
+    elif isinstance(value, (list, dict)):
+        text = json.dumps(value)
+    else:
+        text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def copy_csv_payload(columns: list[str], payloads: list[dict[str, object]]) -> str:
+    return "".join(",".join(_copy_value(payload.get(column)) for column in columns) + "\n" for payload in payloads)
+
+
+def _copy_available(session: Session) -> bool:
+    if not settings.MARKETLY_SNAPSHOT_COPY_ENABLED:
+        return False
+    dialect = session.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def _copy_rows(session: Session, table_name: str, payloads: list[dict[str, object]]) -> None:
+    columns = list(payloads[0])
+    dbapi_connection = session.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            io.StringIO(copy_csv_payload(columns, payloads)),
+        )
+
+
+def _insert_snapshot_rows(session: Session, payloads: list[dict[str, object]]) -> list[int]:
+    if _copy_available(session):
+        # COPY cannot return ids, so reserve them from the sequence first; the token rows need them.
+        reserved_ids = session.execute(
+            text(
+                "SELECT nextval(pg_get_serial_sequence('listing_snapshots', 'id')) "
+                "FROM generate_series(1, :count)"
+            ),
+            {"count": len(payloads)},
+        )
+        snapshot_ids = [int(value) for value in reserved_ids.scalars()]
+        _copy_rows(
+            session,
+            ListingSnapshot.__tablename__,
+            [{"id": snapshot_id, **payload} for snapshot_id, payload in zip(snapshot_ids, payloads)],
+        )
+        return snapshot_ids
+
+    result = session.execute(
+        insert(ListingSnapshot).returning(ListingSnapshot.id, sort_by_parameter_order=True),
+        payloads,
+    )
+    return [int(value) for value in result.scalars()]
+
+
+def _insert_token_rows(session: Session, payloads: list[dict[str, object]]) -> None:
+    if not payloads:
+        return
+    if _copy_available(session):
+        _copy_rows(session, ListingSnapshotToken.__tablename__, payloads)
+        return
+    session.execute(insert(ListingSnapshotToken), payloads)
+
+
+@dataclass
+class SnapshotBatch:
+    query: str
+    listings: list[Listing]
+    user_id: object | None = None
+    saved_search_id: int | None = None
+    observed_at: datetime | None = None
+
+
+def persist_snapshot_batches(
+    batches: list[SnapshotBatch],
+    *,
     db: Session | None = None,
 ) -> int:
-    if not listings:
+    batches = [batch for batch in batches if batch.listings]
+    if not batches:
         return 0
 
     owns_session = db is None
     session = db or SessionLocal()
-    normalized_user_id = normalize_user_id(user_id)
     try:
-        rows = [
-            ListingSnapshot(
-                user_id=normalized_user_id,
-                saved_search_id=saved_search_id,
-                source=item.source,
-                source_listing_id=item.source_listing_id or item.url,
-                listing_fingerprint=listing_fingerprint(item),
-                query=query,
-                title=item.title,
-                price_amount=float(item.price.amount) if item.price is not None else None,
-                price_currency=(item.price.currency if item.price is not None else None),
-                location=item.location,
-                condition=item.condition,
-                snippet=item.snippet,
-                image_count=len(item.image_urls or []),
-                url=item.url,
-                valuation_key=valuation_key_for_listing(query, item),
-                observed_at=observed_at,
+        # Core executemany (or COPY on Postgres) instead of the unit of work: no ORM objects
+        # are hydrated, and one statement covers every batch.
+        payloads: list[dict[str, object]] = []
+        for batch in batches:
+            payloads.extend(
+                _snapshot_payloads(
+                    query=batch.query,
+                    listings=batch.listings,
+                    user_id=normalize_user_id(batch.user_id),
+                    saved_search_id=batch.saved_search_id,
+                    observed_at=batch.observed_at or datetime.now(timezone.utc),
+                )
             )
-            for item in listings
-        ]
-        session.add_all(rows)
+        inserted = _record_observations(session, _collapse_observations(payloads))
+        _insert_token_rows(
+            session,
+            _snapshot_token_payloads(
+                [(snapshot_id, payload["query"], payload["observed_at"]) for snapshot_id, payload in inserted]
+            ),
+        )
+        try:
+            # A savepoint keeps a racing rollup insert from discarding the snapshots themselves.
+            # Only new observations feed the rollups, so repeat sightings do not inflate samples.
+            with session.begin_nested():
+                record_valuation_rollups(
+                    session,
+                    [
+                        SnapshotObservation(
+                            valuation_key=payload["valuation_key"],
+                            price_amount=payload["price_amount"],
+                            condition=payload["condition"],
+                            observed_at=payload["observed_at"],
+                        )
+                        for _, payload in inserted
+                    ],
+                )
+        except Exception as exc:
+            logger.warning("valuation rollup update failed: %s", exc)
+        # Repeat sightings leave the history unchanged, so only new observations invalidate
+        # memoized valuations.
+        bump_dependency_versions_on_commit(
+            session,
+            {
+                dependency
+                for _, payload in inserted
+                for dependency in snapshot_memo_dependencies(payload["query"], payload["valuation_key"])
+            },
+        )
         if owns_session:
             session.commit()
         else:
             session.flush()
-        return len(rows)
+        return len(payloads)
     except Exception as exc:
         session.rollback()
         logger.warning("listing snapshot persistence failed: %s", exc)
@@ -66,6 +363,37 @@ def persist_listing_snapshots(
             session.close()
 
 
+def persist_listing_snapshots(
+    *,
+    query: str,
+    listings: list[Listing],
+    user_id: object | None = None,
+    saved_search_id: int | None = None,
+    observed_at: datetime | None = None,
+    db: Session | None = None,
+) -> int:
+    return persist_snapshot_batches(
+        [
+            SnapshotBatch(
+                query=query,
+                listings=listings,
+                user_id=user_id,
+                saved_search_id=saved_search_id,
+                observed_at=observed_at,
+            )
+        ],
+        db=db,
+    )
+
+
+def _bound_to_retained_partitions(db: Session, query):
+    # Only the partitioned table gains from the bound (partition pruning). On a plain table every
+    # stored row still counts as seen, however old it is.
+    if snapshots_partitioned(db):
+        return query.filter(ListingSnapshot.observed_at >= snapshot_retained_since())
+    return query
+
+
 def previously_seen_fingerprints(
     db: Session,
     *,
@@ -81,6 +409,7 @@ def previously_seen_fingerprints(
         .filter(ListingSnapshot.saved_search_id == saved_search_id)
         .filter(ListingSnapshot.listing_fingerprint.in_(listing_fingerprints))
     )
+    query = _bound_to_retained_partitions(db, query)
     if seen_before is not None:
         query = query.filter(ListingSnapshot.observed_at <= seen_before)
     rows = query.distinct().all()
@@ -97,10 +426,78 @@ def has_historical_snapshot_baseline(
     if seen_before is None:
         return False
 
-    row = (
+    query = (
         db.query(ListingSnapshot.id)
         .filter(ListingSnapshot.saved_search_id == saved_search_id)
         .filter(ListingSnapshot.observed_at <= seen_before)
-        .first()
     )
-    return row is not None
+    return _bound_to_retained_partitions(db, query).first() is not None
+
+
+def backfill_listing_snapshot_tokens(
+    db: Session,
+    *,
+    batch_size: int = DEFAULT_TOKEN_BACKFILL_BATCH_SIZE,
+) -> int:
+    indexed_ids = select(ListingSnapshotToken.snapshot_id)
+    processed = 0
+    last_id = 0
+    safe_batch_size = max(1, int(batch_size))
+    while True:
+        batch = (
+            db.query(ListingSnapshot)
+            .filter(ListingSnapshot.id > last_id)
+            .filter(ListingSnapshot.id.not_in(indexed_ids))
+            .order_by(ListingSnapshot.id.asc())
+            .limit(safe_batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        _insert_token_rows(db, _snapshot_token_payloads([(row.id, row.query, row.observed_at) for row in batch]))
+        bump_dependency_versions_on_commit(
+            db,
+            {dependency for row in batch for dependency in snapshot_memo_dependencies(row.query, row.valuation_key)},
+        )
+        processed += len(batch)
+        last_id = int(batch[-1].id)
+    return processed
+
+
+def backfill_listing_snapshot_features(
+    db: Session,
+    *,
+    batch_size: int = DEFAULT_FEATURE_BACKFILL_BATCH_SIZE,
+) -> int:
+    processed = 0
+    last_id = 0
+    safe_batch_size = max(1, int(batch_size))
+    while True:
+        batch = (
+            db.query(ListingSnapshot)
+            .filter(ListingSnapshot.id > last_id)
+            .filter(
+                or_(
+                    ListingSnapshot.features_version.is_(None),
+                    ListingSnapshot.features_version != SNAPSHOT_FEATURES_VERSION,
+                )
+            )
+            .order_by(ListingSnapshot.id.asc())
+            .limit(safe_batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for row in batch:
+            features = snapshot_feature_columns(
+                query=row.query,
+                title=row.title,
+                snippet=row.snippet,
+                condition=row.condition,
+            )
+            for column, value in features.items():
+                setattr(row, column, value)
+        db.flush()
+        processed += len(batch)
+        last_id = int(batch[-1].id)
+    return processed
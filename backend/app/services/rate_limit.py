@@ -1,11 +1,11 @@
 import hashlib
 import time
-from collections import OrderedDict
 from dataclasses import dataclass
 from threading import Lock
 
 from fastapi import Request
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.redis_client import get_redis_client
 
@@ -16,7 +16,7 @@ class RateLimitDecision:
     retry_after_seconds: int | None = None
 
 
-_local_fixed_windows: OrderedDict[str, tuple[int, int]] = OrderedDict()
+_local_fixed_windows = TTLCache(max_items=max(1, int(settings.MARKETLY_RATE_LIMIT_LOCAL_MAX_KEYS)))
 _local_lock = Lock()
 
 
@@ -50,31 +50,12 @@ def _check_local_rate_limit(
     now: int,
     window_start: int,
 ) -> RateLimitDecision:
+    # Keys embed the window start, so each window is its own entry that simply
+    # expires at the window end.
+    expires_at = window_start + window_seconds
     with _local_lock:
-        expired_keys = [
-            known_key
-            for known_key, (_, expires_at) in _local_fixed_windows.items()
-            if now >= expires_at
-        ]
-        for expired_key in expired_keys:
-            _local_fixed_windows.pop(expired_key, None)
-
-        expires_at = window_start + window_seconds
-        count = 0
-        existing = _local_fixed_windows.get(key)
-        if existing is not None:
-            current_count, current_expires_at = existing
-            if now < current_expires_at:
-                count = current_count
-                expires_at = current_expires_at
-
-        count += 1
-        _local_fixed_windows[key] = (count, expires_at)
-        _local_fixed_windows.move_to_end(key)
-
-        max_keys = max(1, int(settings.MARKETLY_RATE_LIMIT_LOCAL_MAX_KEYS))
-        while len(_local_fixed_windows) > max_keys:
-            _local_fixed_windows.popitem(last=False)
+        count = int(_local_fixed_windows.get(key) or 0) + 1
+        _local_fixed_windows.set(key, count, expires_at=expires_at)
 
     ttl_seconds = max(1, expires_at - now)
     if int(count) > int(limit):
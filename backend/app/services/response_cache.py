@@ -1,14 +1,20 @@
 import hashlib
 import json
 import logging
+import time
+import uuid
+from threading import Lock
 from typing import Any
 
 from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.redis_client import get_redis_client
+from app.core.redis_client import get_redis_client, release_redis_lock
 
 logger = logging.getLogger(__name__)
 _local_response_cache = TTLCache(max_items=int(settings.MARKETLY_RESPONSE_CACHE_LOCAL_MAX_ITEMS))
+_local_refresh_locks = TTLCache(max_items=int(settings.MARKETLY_RESPONSE_CACHE_LOCAL_MAX_ITEMS))
+_local_refresh_lock = Lock()
+_REFRESH_LOCK_PREFIX = "marketly:search_response_refresh:"
 
 
 def _response_cache_ttl_seconds(ttl_override_seconds: int | None = None) -> int:
@@ -20,18 +26,33 @@ def _response_cache_ttl_seconds(ttl_override_seconds: int | None = None) -> int:
     return max(1, int(ttl_seconds))
 
 
+def _response_cache_stale_seconds() -> int:
+    return max(0, int(settings.MARKETLY_RESPONSE_CACHE_STALE_TTL_SECONDS))
+
+
 def _local_fallback_enabled() -> bool:
     return bool(settings.MARKETLY_RESPONSE_CACHE_LOCAL_FALLBACK_ENABLED)
 
 
-def _read_payload(raw_payload: str) -> dict[str, Any] | None:
+def _encode_entry(payload: dict[str, Any], *, ttl_seconds: int) -> str:
+    # Entries outlive their soft TTL by the stale window so an expired payload can
+    # still be served while one worker refreshes it in the background.
+    envelope = {"fresh_until": time.time() + ttl_seconds, "payload": payload}
+    return json.dumps(envelope, separators=(",", ":"), ensure_ascii=False)
+
+
+def _read_entry(raw_payload: str) -> tuple[dict[str, Any], bool] | None:
     parsed = json.loads(raw_payload)
-    if isinstance(parsed, dict):
-        return parsed
-    return None
+    if not isinstance(parsed, dict):
+        return None
+    if "fresh_until" in parsed and isinstance(parsed.get("payload"), dict):
+        fresh_until = float(parsed["fresh_until"])
+        return parsed["payload"], time.time() > fresh_until
+    # Entries written before the soft-TTL envelope only live for their hard TTL.
+    return parsed, False
 
 
-def _get_local_cached_search_response(cache_key: str) -> dict[str, Any] | None:
+def _get_local_cached_entry(cache_key: str) -> tuple[dict[str, Any], bool] | None:
     payload = _local_response_cache.get(cache_key)
     if not payload:
         return None
@@ -40,7 +61,7 @@ def _get_local_cached_search_response(cache_key: str) -> dict[str, Any] | None:
         return None
 
     try:
-        return _read_payload(payload)
+        return _read_entry(payload)
     except Exception as exc:
         logger.warning("search response local cache read failed key=%s error=%s", cache_key, exc)
         return None
@@ -53,10 +74,11 @@ def _set_local_cached_search_response(
     ttl_seconds: int | None = None,
 ) -> None:
     try:
+        ttl = _response_cache_ttl_seconds(ttl_seconds)
         _local_response_cache.set(
             cache_key,
-            json.dumps(payload, separators=(",", ":"), ensure_ascii=False),
-            ttl_seconds=_response_cache_ttl_seconds(ttl_seconds),
+            _encode_entry(payload, ttl_seconds=ttl),
+            ttl_seconds=ttl + _response_cache_stale_seconds(),
         )
     except Exception as exc:
         logger.warning("search response local cache write failed key=%s error=%s", cache_key, exc)
@@ -131,7 +153,7 @@ def is_search_response_cache_active() -> bool:
     return _local_fallback_enabled()
 
 
-def get_cached_search_response(cache_key: str) -> dict[str, Any] | None:
+def _get_cached_entry(cache_key: str) -> tuple[dict[str, Any], bool] | None:
     if not settings.MARKETLY_RESPONSE_CACHE_ENABLED:
         return None
 
@@ -140,16 +162,68 @@ def get_cached_search_response(cache_key: str) -> dict[str, Any] | None:
         try:
             payload = client.get(cache_key)
             if payload:
-                return _read_payload(payload)
+                return _read_entry(payload)
             return None
         except Exception as exc:
             logger.warning("search response cache read failed key=%s error=%s", cache_key, exc)
 
     if _local_fallback_enabled():
-        return _get_local_cached_search_response(cache_key)
+        return _get_local_cached_entry(cache_key)
     return None
 
 
+def get_cached_search_response(cache_key: str) -> dict[str, Any] | None:
+    entry = _get_cached_entry(cache_key)
+    if entry is None:
+        return None
+    payload, is_stale = entry
+    return None if is_stale else payload
+
+
+def get_stale_search_response(cache_key: str) -> dict[str, Any] | None:
+    if _response_cache_stale_seconds() <= 0:
+        return None
+    entry = _get_cached_entry(cache_key)
+    if entry is None:
+        return None
+    payload, is_stale = entry
+    return payload if is_stale else None
+
+
+def try_acquire_search_response_refresh(cache_key: str) -> str | None:
+    lock_key = f"{_REFRESH_LOCK_PREFIX}{cache_key}"
+    token = uuid.uuid4().hex
+    lock_seconds = max(1, int(settings.MARKETLY_RESPONSE_CACHE_REFRESH_LOCK_SECONDS))
+
+    client = get_redis_client()
+    if client is not None:
+        try:
+            return token if client.set(lock_key, token, nx=True, ex=lock_seconds) else None
+        except Exception as exc:
+            logger.warning("search response refresh lock failed key=%s error=%s", cache_key, exc)
+
+    with _local_refresh_lock:
+        if _local_refresh_locks.get(lock_key) is not None:
+            return None
+        _local_refresh_locks.set(lock_key, token, ttl_seconds=lock_seconds)
+    return token
+
+
+def release_search_response_refresh(cache_key: str, token: str) -> None:
+    lock_key = f"{_REFRESH_LOCK_PREFIX}{cache_key}"
+    client = get_redis_client()
+    if client is not None:
+        try:
+            release_redis_lock(client, lock_key, token)
+            return
+        except Exception as exc:
+            logger.warning("search response refresh unlock failed key=%s error=%s", cache_key, exc)
+
+    with _local_refresh_lock:
+        if _local_refresh_locks.get(lock_key) == token:
+            _local_refresh_locks.delete(lock_key)
+
+
 def set_cached_search_response(
     cache_key: str,
     payload: dict[str, Any],
@@ -162,10 +236,11 @@ def set_cached_search_response(
     client = get_redis_client()
     if client is not None:
         try:
+            ttl = _response_cache_ttl_seconds(ttl_seconds)
             client.setex(
                 cache_key,
-                _response_cache_ttl_seconds(ttl_seconds),
-                json.dumps(payload, separators=(",", ":"), ensure_ascii=False),
+                ttl + _response_cache_stale_seconds(),
+                _encode_entry(payload, ttl_seconds=ttl),
             )
             return
         except Exception as exc:
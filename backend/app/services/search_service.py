@@ -1,20 +1,116 @@
 import asyncio
 import hashlib
+import json
 import logging
+import uuid
 from dataclasses import dataclass
+from typing import Any
 
 from app.connectors import CONNECTORS
 from app.connectors.facebook_marketplace import FacebookConnectorError, FacebookConnectorErrorCode
-from app.core.cache import TTLCache
+from app.core.cache import build_cache
 from app.core.config import settings
+from app.core.redis_client import get_redis_client, release_redis_lock
 from app.core.time_utils import parse_iso_datetime
 from app.models.listing import Listing, SearchSort, SourceError
 from app.schemas.location import ResolvedLocation
 from app.services.location import haversine_km, interpret_listing_location
 from app.services.scoring import score_listing
 
-_cache = TTLCache(max_items=int(settings.MARKETLY_SEARCH_FETCH_CACHE_MAX_ITEMS))
-_pagination_cache = TTLCache(max_items=int(settings.MARKETLY_SEARCH_PAGINATION_CACHE_MAX_ITEMS))
+
+def _encode_listings(items: list[Listing]) -> list[dict]:
+    # Defaults are dropped to keep shared cache entries small; model_validate restores them.
+    return [item.model_dump(mode="json", exclude_defaults=True) for item in items]
+
+
+def _decode_listings(raw_items: list[dict]) -> list[Listing]:
+    return [Listing.model_validate(item) for item in raw_items]
+
+
+def _encode_fetch_payload(
+    payload: tuple[list[Listing], dict[str, SourceError], dict[str, int]],
+) -> str:
+    scored, source_errors, source_counts = payload
+    return json.dumps(
+        {
+            "scored": _encode_listings(scored),
+            "source_errors": {
+                src: error.model_dump(mode="json") for src, error in source_errors.items()
+            },
+            "source_counts": source_counts,
+        },
+        separators=(",", ":"),
+    )
+
+
+def _decode_fetch_payload(
+    raw: str,
+) -> tuple[list[Listing], dict[str, SourceError], dict[str, int]] | None:
+    try:
+        decoded = json.loads(raw)
+        scored = _decode_listings(decoded.get("scored", []))
+        source_errors = {
+            src: SourceError.model_validate(error)
+            for src, error in (decoded.get("source_errors") or {}).items()
+        }
+        source_counts = {
+            src: int(count) for src, count in (decoded.get("source_counts") or {}).items()
+        }
+    except Exception:
+        return None
+    return scored, source_errors, source_counts
+
+
+def _encode_pagination_state(state: dict) -> str:
+    return json.dumps(
+        {
+            "ordered": _encode_listings(state.get("ordered", [])),
+            "source_errors": {
+                src: error.model_dump(mode="json")
+                for src, error in (state.get("source_errors") or {}).items()
+            },
+            "cursors": state.get("cursors") or {},
+            "can_expand": bool(state.get("can_expand", False)),
+        },
+        separators=(",", ":"),
+    )
+
+
+def _decode_pagination_state(raw: str) -> dict | None:
+    try:
+        decoded = json.loads(raw)
+        return {
+            "ordered": _decode_listings(decoded.get("ordered", [])),
+            "source_errors": {
+                src: SourceError.model_validate(error)
+                for src, error in (decoded.get("source_errors") or {}).items()
+            },
+            "cursors": dict(decoded.get("cursors") or {}),
+            "can_expand": bool(decoded.get("can_expand", False)),
+        }
+    except Exception:
+        return None
+
+
+_cache = build_cache(
+    settings.MARKETLY_SEARCH_CACHE_BACKEND,
+    prefix="marketly:search_fetch:",
+    max_items=int(settings.MARKETLY_SEARCH_FETCH_CACHE_MAX_ITEMS),
+    encode=_encode_fetch_payload,
+    decode=_decode_fetch_payload,
+    max_bytes=int(settings.MARKETLY_SEARCH_FETCH_CACHE_MAX_BYTES),
+)
+_pagination_cache = build_cache(
+    settings.MARKETLY_SEARCH_CACHE_BACKEND,
+    prefix="marketly:search_pagination:",
+    max_items=int(settings.MARKETLY_SEARCH_PAGINATION_CACHE_MAX_ITEMS),
+    encode=_encode_pagination_state,
+    decode=_decode_pagination_state,
+)
+_inflight_fetches: dict[str, asyncio.Task] = {}
+_SINGLE_FLIGHT_LOCK_PREFIX = "marketly:search_fetch_lock:"
+_SINGLE_FLIGHT_RESULT_PREFIX = "marketly:search_fetch_result:"
+_SINGLE_FLIGHT_POLL_SECONDS = 0.1
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +125,7 @@ class FacebookRuntimeContext:
     radius_km: int | None = None
 
 
-def _location_cache_fragment(search_location_context: ResolvedLocation | None) -> str:
+def location_cache_fragment(search_location_context: ResolvedLocation | None) -> str:
     if search_location_context is None:
         return "|loc=|loc_mode="
     return (
@@ -76,7 +172,7 @@ def _cache_key(
         f"v6|{query}|{','.join(sorted(sources))}|{fetch_limit}|sort={sort}|"
         f"facebook_enabled={settings.MARKETLY_ENABLE_FACEBOOK}"
         f"{_facebook_cache_fragment(sources, facebook_runtime_context)}"
-        f"{_location_cache_fragment(search_location_context)}"
+        f"{location_cache_fragment(search_location_context)}"
     )
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
@@ -93,7 +189,7 @@ def _pagination_key(
         f"v6|{query}|{','.join(sorted(sources))}|sort={sort}|limit={limit}|"
         f"facebook_enabled={settings.MARKETLY_ENABLE_FACEBOOK}"
         f"{_facebook_cache_fragment(sources, facebook_runtime_context)}"
-        f"{_location_cache_fragment(search_location_context)}"
+        f"{location_cache_fragment(search_location_context)}"
     )
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
@@ -360,24 +456,15 @@ def _map_facebook_error(exc: FacebookConnectorError) -> SourceError:
     return SourceError(code="UNAVAILABLE", message=detailed_message, retryable=exc.retryable)
 
 
-async def _fetch_source(
-    *,
+def _source_preflight_error(
     src: str,
-    query: str,
-    fetch_limit: int,
-    sort: SearchSort,
-    facebook_runtime_context: FacebookRuntimeContext | None = None,
-    is_multi_source: bool = False,
-) -> tuple[str, list[Listing], SourceError | None]:
+    facebook_runtime_context: FacebookRuntimeContext | None,
+) -> SourceError | None:
     if src == "facebook" and not settings.MARKETLY_ENABLE_FACEBOOK:
-        return (
-            src,
-            [],
-            SourceError(
-                code="DISABLED",
-                message="Facebook source is disabled by server configuration.",
-                retryable=False,
-            ),
+        return SourceError(
+            code="DISABLED",
+            message="Facebook source is disabled by server configuration.",
+            retryable=False,
         )
     if src == "facebook":
         user_id = getattr(facebook_runtime_context, "user_id", None) if facebook_runtime_context else None
@@ -392,76 +479,120 @@ async def _fetch_source(
             else None
         )
         if facebook_runtime_context is None or not user_id:
-            return (
-                src,
-                [],
-                SourceError(
-                    code="AUTH_REQUIRED",
-                    message="Log in and configure Facebook cookies to use the Facebook source.",
-                    retryable=False,
-                ),
+            return SourceError(
+                code="AUTH_REQUIRED",
+                message="Log in and configure Facebook cookies to use the Facebook source.",
+                retryable=False,
             )
         if preflight_error is not None:
-            return (
-                src,
-                [],
-                preflight_error,
-            )
+            return preflight_error
         if cookie_payload is None:
-            return (
-                src,
-                [],
-                SourceError(
-                    code="BYOC_REQUIRED",
-                    message="Upload your Facebook cookies in Facebook Setup to use the Facebook source.",
-                    retryable=False,
-                ),
+            return SourceError(
+                code="BYOC_REQUIRED",
+                message="Upload your Facebook cookies in Facebook Setup to use the Facebook source.",
+                retryable=False,
             )
 
-    connector = CONNECTORS.get(src)
-    if not connector:
-        return (
-            src,
-            [],
-            SourceError(
-                code="UNKNOWN_SOURCE",
-                message=f"Unknown source: {src}",
-                retryable=False,
-            ),
+    if not CONNECTORS.get(src):
+        return SourceError(
+            code="UNKNOWN_SOURCE",
+            message=f"Unknown source: {src}",
+            retryable=False,
+        )
+    return None
+
+
+def _facebook_fetch_cap(*, is_multi_source: bool) -> int | None:
+    if not is_multi_source:
+        return None
+    # Keep multi-source Facebook fetches bounded for low-memory hosts,
+    # but allow deeper pagination than the first-page soft cap.
+    hard_multi_source_cap = max(
+        int(settings.MARKETLY_FACEBOOK_MAX_FETCH_LIMIT),
+        int(settings.MARKETLY_FACEBOOK_MAX_SCRAPE_LIMIT),
+    )
+    return max(1, hard_multi_source_cap)
+
+
+def _facebook_search_kwargs(
+    facebook_runtime_context: FacebookRuntimeContext | None,
+    *,
+    is_multi_source: bool,
+) -> dict:
+    return {
+        "auth_mode": "cookie",
+        "cookie_payload": getattr(facebook_runtime_context, "cookie_payload", None)
+        if facebook_runtime_context
+        else None,
+        "credential_fingerprint_sha256": getattr(
+            facebook_runtime_context, "credential_fingerprint_sha256", None
+        ),
+        "latitude": getattr(facebook_runtime_context, "latitude", None)
+        if facebook_runtime_context
+        else None,
+        "longitude": getattr(facebook_runtime_context, "longitude", None)
+        if facebook_runtime_context
+        else None,
+        "radius_km": getattr(facebook_runtime_context, "radius_km", None)
+        if facebook_runtime_context
+        else None,
+        "multi_source": is_multi_source,
+    }
+
+
+def _source_failure_error(src: str, exc: Exception) -> SourceError:
+    if isinstance(exc, asyncio.TimeoutError):
+        return SourceError(
+            code="TIMEOUT",
+            message=f"{src} source timed out.",
+            retryable=True,
         )
+    if isinstance(exc, FacebookConnectorError):
+        logger.warning(
+            "facebook search failed code=%s message=%s details=%s",
+            exc.code.value,
+            exc.message,
+            exc.details,
+        )
+        return _map_facebook_error(exc)
+    logger.warning("search failed for %s: %s", src, exc)
+    return SourceError(
+        code="UNAVAILABLE",
+        message=f"{src} source unavailable.",
+        retryable=True,
+    )
+
 
+async def _fetch_source(
+    *,
+    src: str,
+    query: str,
+    fetch_limit: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None = None,
+    is_multi_source: bool = False,
+) -> tuple[str, list[Listing], SourceError | None]:
+    preflight_error = _source_preflight_error(src, facebook_runtime_context)
+    if preflight_error is not None:
+        return src, [], preflight_error
+
+    connector = CONNECTORS[src]
     try:
         timeout_seconds = _source_timeout_seconds(src, is_multi_source=is_multi_source)
         if src == "facebook":
             facebook_fetch_limit = max(1, int(fetch_limit))
-            if is_multi_source:
-                # Keep multi-source Facebook fetches bounded for low-memory hosts,
-                # but allow deeper pagination than the first-page soft cap.
-                hard_multi_source_cap = max(
-                    int(settings.MARKETLY_FACEBOOK_MAX_FETCH_LIMIT),
-                    int(settings.MARKETLY_FACEBOOK_MAX_SCRAPE_LIMIT),
-                )
-                facebook_fetch_limit = min(
-                    facebook_fetch_limit,
-                    max(1, hard_multi_source_cap),
-                )
+            cap = _facebook_fetch_cap(is_multi_source=is_multi_source)
+            if cap is not None:
+                facebook_fetch_limit = min(facebook_fetch_limit, cap)
             listings = await _run_with_timeout(
                 connector.search(
                     query=query,
                     limit=facebook_fetch_limit,
                     sort=sort,
-                    auth_mode="cookie",
-                    cookie_payload=cookie_payload,
-                    latitude=getattr(facebook_runtime_context, "latitude", None)
-                    if facebook_runtime_context
-                    else None,
-                    longitude=getattr(facebook_runtime_context, "longitude", None)
-                    if facebook_runtime_context
-                    else None,
-                    radius_km=getattr(facebook_runtime_context, "radius_km", None)
-                    if facebook_runtime_context
-                    else None,
-                    multi_source=is_multi_source,
+                    **_facebook_search_kwargs(
+                        facebook_runtime_context,
+                        is_multi_source=is_multi_source,
+                    ),
                 ),
                 timeout_seconds,
             )
@@ -470,61 +601,195 @@ async def _fetch_source(
                 connector.search(query=query, limit=fetch_limit, sort=sort), timeout_seconds
             )
         return src, listings, None
-    except asyncio.TimeoutError:
-        return (
-            src,
-            [],
-            SourceError(
-                code="TIMEOUT",
-                message=f"{src} source timed out.",
-                retryable=True,
-            ),
+    except Exception as exc:
+        return src, [], _source_failure_error(src, exc)
+
+
+async def _fetch_source_page(
+    *,
+    src: str,
+    query: str,
+    limit: int,
+    cursor: Any,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None = None,
+    is_multi_source: bool = False,
+) -> tuple[str, list[Listing], SourceError | None, Any | None]:
+    preflight_error = _source_preflight_error(src, facebook_runtime_context)
+    if preflight_error is not None:
+        return src, [], preflight_error, None
+
+    connector = CONNECTORS[src]
+    try:
+        timeout_seconds = _source_timeout_seconds(src, is_multi_source=is_multi_source)
+        if src == "facebook":
+            # Facebook has no resumable scroll position across requests, so its cursor is
+            # the plain offset used by the base connector; stay inside the scrape cap.
+            page_limit = max(1, int(limit))
+            cap = _facebook_fetch_cap(is_multi_source=is_multi_source)
+            if cap is not None:
+                page_limit = min(page_limit, cap - int(cursor or 0))
+                if page_limit <= 0:
+                    return src, [], None, None
+            listings, next_cursor = await _run_with_timeout(
+                connector.search_page(
+                    query=query,
+                    limit=page_limit,
+                    sort=sort,
+                    cursor=cursor,
+                    **_facebook_search_kwargs(
+                        facebook_runtime_context,
+                        is_multi_source=is_multi_source,
+                    ),
+                ),
+                timeout_seconds,
+            )
+        else:
+            listings, next_cursor = await _run_with_timeout(
+                connector.search_page(query=query, limit=limit, sort=sort, cursor=cursor),
+                timeout_seconds,
+            )
+        return src, listings, None, next_cursor
+    except Exception as exc:
+        return src, [], _source_failure_error(src, exc), None
+
+
+def _score_listings(query: str, items: list[Listing]) -> list[Listing]:
+    scored: list[Listing] = []
+    for item in items:
+        sr = score_listing(
+            query,
+            title=item.title,
+            snippet=getattr(item, "snippet", None),
+            has_price=item.price is not None,
         )
-    except FacebookConnectorError as exc:
-        logger.warning(
-            "facebook search failed code=%s message=%s details=%s",
-            exc.code.value,
-            exc.message,
-            exc.details,
+        item.score = sr.score
+        item.score_reason = sr.reason
+        scored.append(item)
+    return scored
+
+
+def _single_flight_redis_client():
+    if not settings.MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_ENABLED:
+        return None
+    return get_redis_client()
+
+
+def _forget_inflight_fetch(key: str, task: asyncio.Task) -> None:
+    if _inflight_fetches.get(key) is task:
+        _inflight_fetches.pop(key, None)
+
+
+async def _wait_for_shared_fetch(
+    redis_client,
+    *,
+    key: str,
+    lock_key: str,
+    result_key: str,
+) -> tuple[list[Listing], dict[str, SourceError], dict[str, int]] | None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0.0, float(settings.MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_WAIT_SECONDS))
+    while loop.time() < deadline:
+        await asyncio.sleep(_SINGLE_FLIGHT_POLL_SECONDS)
+        try:
+            raw = redis_client.get(result_key)
+            if raw:
+                return _decode_fetch_payload(raw)
+            if not redis_client.exists(lock_key):
+                # The leader gave up without publishing; fetch locally instead.
+                return None
+        except Exception as exc:
+            logger.warning("search single-flight wait failed key=%s error=%s", key, exc)
+            return None
+    return None
+
+
+def _claim_single_flight_lock(key: str):
+    # Returns (client, token): no client when Redis single-flight is off or unreachable, and
+    # no token when another worker already holds the fetch for this key.
+    redis_client = _single_flight_redis_client()
+    if redis_client is None:
+        return None, None
+    lock_token = uuid.uuid4().hex
+    lock_ms = max(1, int(float(settings.MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_LOCK_SECONDS) * 1000))
+    try:
+        acquired = bool(
+            redis_client.set(f"{_SINGLE_FLIGHT_LOCK_PREFIX}{key}", lock_token, nx=True, px=lock_ms)
         )
-        return src, [], _map_facebook_error(exc)
     except Exception as exc:
-        logger.warning("search failed for %s: %s", src, exc)
-        return (
-            src,
-            [],
-            SourceError(
-                code="UNAVAILABLE",
-                message=f"{src} source unavailable.",
-                retryable=True,
-            ),
+        logger.warning("search single-flight lock failed key=%s error=%s", key, exc)
+        return None, None
+    return redis_client, (lock_token if acquired else None)
+
+
+def _publish_single_flight_result(
+    redis_client,
+    key: str,
+    payload: tuple[list[Listing], dict[str, SourceError], dict[str, int]],
+) -> None:
+    try:
+        redis_client.setex(
+            f"{_SINGLE_FLIGHT_RESULT_PREFIX}{key}",
+            max(1, int(settings.CACHE_TTL_SECONDS)),
+            _encode_fetch_payload(payload),
         )
+    except Exception as exc:
+        logger.warning("search single-flight publish failed key=%s error=%s", key, exc)
 
 
-async def _fetch_and_score(
+def _release_single_flight_lock(redis_client, key: str, lock_token: str) -> None:
+    try:
+        release_redis_lock(redis_client, f"{_SINGLE_FLIGHT_LOCK_PREFIX}{key}", lock_token)
+    except Exception as exc:
+        logger.warning("search single-flight unlock failed key=%s error=%s", key, exc)
+
+
+async def _fetch_and_score_shared(
+    key: str,
     query: str,
     sources: list[str],
     fetch_limit: int,
     sort: SearchSort,
-    facebook_runtime_context: FacebookRuntimeContext | None = None,
-    search_location_context: ResolvedLocation | None = None,
+    facebook_runtime_context: FacebookRuntimeContext | None,
 ) -> tuple[list[Listing], dict[str, SourceError], dict[str, int]]:
-    key = _cache_key(
-        query,
-        sources,
-        fetch_limit,
-        sort,
-        facebook_runtime_context,
-        search_location_context,
-    )
-    cached = _cache.get(key)
-    if cached is not None:
-        # Backward-compatible with old cache entries that only stored 2 fields.
-        if isinstance(cached, tuple) and len(cached) == 2:
-            cached_scored, cached_errors = cached
-            return cached_scored, cached_errors, {}
-        return cached
+    redis_client, lock_token = _claim_single_flight_lock(key)
+    if redis_client is None:
+        return await _fetch_and_score_uncached(
+            key, query, sources, fetch_limit, sort, facebook_runtime_context
+        )
 
+    if lock_token is None:
+        shared = await _wait_for_shared_fetch(
+            redis_client,
+            key=key,
+            lock_key=f"{_SINGLE_FLIGHT_LOCK_PREFIX}{key}",
+            result_key=f"{_SINGLE_FLIGHT_RESULT_PREFIX}{key}",
+        )
+        if shared is not None:
+            _cache.set(key, shared, ttl_seconds=settings.CACHE_TTL_SECONDS)
+            return shared
+        return await _fetch_and_score_uncached(
+            key, query, sources, fetch_limit, sort, facebook_runtime_context
+        )
+
+    try:
+        payload = await _fetch_and_score_uncached(
+            key, query, sources, fetch_limit, sort, facebook_runtime_context
+        )
+        _publish_single_flight_result(redis_client, key, payload)
+        return payload
+    finally:
+        _release_single_flight_lock(redis_client, key, lock_token)
+
+
+async def _fetch_and_score_uncached(
+    key: str,
+    query: str,
+    sources: list[str],
+    fetch_limit: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None,
+) -> tuple[list[Listing], dict[str, SourceError], dict[str, int]]:
     tasks = [
         _fetch_source(
             src=src,
@@ -548,24 +813,162 @@ async def _fetch_and_score(
         if source_error is not None:
             source_errors[src] = source_error
 
-    results = _dedupe_listings(results)
-    scored: list[Listing] = []
-    for item in results:
-        sr = score_listing(
-            query,
-            title=item.title,
-            snippet=getattr(item, "snippet", None),
-            has_price=item.price is not None,
-        )
-        item.score = sr.score
-        item.score_reason = sr.reason
-        scored.append(item)
+    scored = _score_listings(query, _dedupe_listings(results))
 
     cached_payload = (scored, source_errors, source_counts)
     _cache.set(key, cached_payload, ttl_seconds=settings.CACHE_TTL_SECONDS)
     return cached_payload
 
 
+async def _fetch_and_score(
+    query: str,
+    sources: list[str],
+    fetch_limit: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None = None,
+    search_location_context: ResolvedLocation | None = None,
+) -> tuple[list[Listing], dict[str, SourceError], dict[str, int]]:
+    key = _cache_key(
+        query,
+        sources,
+        fetch_limit,
+        sort,
+        facebook_runtime_context,
+        search_location_context,
+    )
+    cached = _cache.get(key)
+    if cached is not None:
+        # Backward-compatible with old cache entries that only stored 2 fields.
+        if isinstance(cached, tuple) and len(cached) == 2:
+            cached_scored, cached_errors = cached
+            return cached_scored, cached_errors, {}
+        return cached
+
+    if not settings.MARKETLY_SEARCH_SINGLE_FLIGHT_ENABLED:
+        return await _fetch_and_score_uncached(
+            key, query, sources, fetch_limit, sort, facebook_runtime_context
+        )
+
+    # Concurrent callers for the same fetch window share one upstream fan-out. The
+    # shared task is shielded so one caller disconnecting does not cancel the others.
+    task = _inflight_fetches.get(key)
+    if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(
+            _fetch_and_score_shared(
+                key, query, sources, fetch_limit, sort, facebook_runtime_context
+            )
+        )
+        _inflight_fetches[key] = task
+        task.add_done_callback(lambda done, key=key: _forget_inflight_fetch(key, done))
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_score_page(
+    query: str,
+    sources: list[str],
+    cursors: dict[str, Any],
+    limit: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None = None,
+) -> tuple[list[Listing], dict[str, SourceError], dict[str, Any]]:
+    # Fetch the next slice from every source that still has a cursor. The merged pool is
+    # cached by the caller's pagination state, so this path skips the fetch cache.
+    active_sources = [src for src in sources if cursors.get(src) is not None]
+    fetched = await asyncio.gather(
+        *[
+            _fetch_source_page(
+                src=src,
+                query=query,
+                limit=limit,
+                cursor=cursors[src],
+                sort=sort,
+                facebook_runtime_context=facebook_runtime_context,
+                is_multi_source=len(sources) > 1,
+            )
+            for src in active_sources
+        ]
+    )
+
+    results: list[Listing] = []
+    source_errors: dict[str, SourceError] = {}
+    next_cursors = {src: cursors.get(src) for src in sources}
+    for src, listings, source_error, next_cursor in fetched:
+        results.extend(listings)
+        next_cursors[src] = next_cursor
+        if source_error is not None:
+            source_errors[src] = source_error
+
+    return _score_listings(query, _dedupe_listings(results)), source_errors, next_cursors
+
+
+def _resume_cursors(
+    *,
+    sources: list[str],
+    source_counts: dict[str, int],
+    fetch_limit: int,
+) -> dict[str, Any]:
+    cursors: dict[str, Any] = {}
+    for src in sources:
+        connector = CONNECTORS.get(src)
+        cursors[src] = (
+            connector.resume_cursor(fetch_limit, source_counts.get(src, 0))
+            if connector is not None
+            else None
+        )
+    return cursors
+
+
+def _multi_source_page(
+    ordered: list[Listing],
+    *,
+    offset: int,
+    limit: int,
+    can_expand: bool,
+) -> tuple[list[Listing], int | None, int | None]:
+    page = ordered[offset : offset + limit]
+    page_end = offset + len(page)
+
+    total = None if can_expand else len(ordered)
+    if page_end < len(ordered):
+        next_offset = page_end
+    elif page_end > offset and can_expand:
+        next_offset = page_end
+    else:
+        next_offset = None
+    return page, total, next_offset
+
+
+def _single_source_page(
+    ordered: list[Listing],
+    *,
+    offset: int,
+    limit: int,
+    fetch_limit: int,
+    facebook_only: bool,
+) -> tuple[list[Listing], int | None, int | None]:
+    total = len(ordered)
+    page = ordered[offset : offset + limit]
+    next_offset = offset + limit if offset + limit < total else None
+
+    # For single-source connectors, we often don't know global total upfront.
+    # If the current fetch window is fully filled, keep pagination alive.
+    if len(page) == limit and total == fetch_limit:
+        total = None
+        next_offset = offset + limit
+
+    # Facebook scraping does not expose a stable total count in advance.
+    # For facebook-only queries, keep pagination alive while each page is full.
+    # The next request increases fetch_limit (limit + offset), allowing deeper scroll extraction.
+    if facebook_only:
+        total = None
+        if len(page) == limit:
+            next_offset = offset + limit
+        else:
+            next_offset = None
+
+    return page, total, next_offset
+
+
 async def unified_search(
     query: str,
     sources: list[str],
@@ -612,22 +1015,17 @@ async def unified_search(
                 sort=sort,
                 search_location_context=search_location_context,
             )
-            page = ordered[safe_offset : safe_offset + limit]
-            page_end = safe_offset + len(page)
             can_expand = _multi_source_can_expand(
                 sources=sources,
                 source_counts=source_counts,
                 fetch_limit=fetch_limit,
             )
-
-            total = None if can_expand else len(ordered)
-            if page_end < len(ordered):
-                next_offset = page_end
-            elif page_end > safe_offset and can_expand:
-                next_offset = page_end
-            else:
-                next_offset = None
-
+            page, total, next_offset = _multi_source_page(
+                ordered,
+                offset=safe_offset,
+                limit=limit,
+                can_expand=can_expand,
+            )
             return page, total, next_offset, source_errors
 
         pagination_key = _pagination_key(
@@ -665,26 +1063,26 @@ async def unified_search(
                 sort=sort,
                 search_location_context=search_location_context,
             )
+            cursors = _resume_cursors(
+                sources=sources,
+                source_counts=source_counts,
+                fetch_limit=fetch_limit,
+            )
             pagination_state = {
-                "fetch_limit": fetch_limit,
                 "ordered": ordered,
                 "source_errors": source_errors,
-                "can_expand": _multi_source_can_expand(
-                    sources=sources,
-                    source_counts=source_counts,
-                    fetch_limit=fetch_limit,
-                ),
+                "cursors": cursors,
+                "can_expand": any(cursor is not None for cursor in cursors.values()),
             }
         else:
-            fetch_limit = int(pagination_state.get("fetch_limit", limit))
             ordered = list(pagination_state.get("ordered", []))
             source_errors = dict(pagination_state.get("source_errors", {}))
-            can_expand = bool(pagination_state.get("can_expand", False))
+            cursors = dict(pagination_state.get("cursors", {}))
             pagination_state = {
-                "fetch_limit": fetch_limit,
                 "ordered": ordered,
                 "source_errors": source_errors,
-                "can_expand": can_expand,
+                "cursors": cursors,
+                "can_expand": any(cursor is not None for cursor in cursors.values()),
             }
 
         expansions = 0
@@ -693,24 +1091,16 @@ async def unified_search(
             and pagination_state["can_expand"]
             and expansions < max_expansions
         ):
-            next_fetch_limit = int(pagination_state["fetch_limit"]) + limit
-            if facebook_runtime_context is None:
-                scored, incoming_source_errors, source_counts = await _fetch_and_score(
-                    query=query,
-                    sources=sources,
-                    fetch_limit=next_fetch_limit,
-                    sort=sort,
-                    search_location_context=search_location_context,
-                )
-            else:
-                scored, incoming_source_errors, source_counts = await _fetch_and_score(
-                    query=query,
-                    sources=sources,
-                    fetch_limit=next_fetch_limit,
-                    sort=sort,
-                    facebook_runtime_context=facebook_runtime_context,
-                    search_location_context=search_location_context,
-                )
+            # Each expansion only pulls the next slice from every source's cursor, so deep
+            # scroll costs one page upstream instead of refetching from offset 0.
+            scored, incoming_source_errors, next_cursors = await _fetch_and_score_page(
+                query=query,
+                sources=sources,
+                cursors=pagination_state["cursors"],
+                limit=limit,
+                sort=sort,
+                facebook_runtime_context=facebook_runtime_context,
+            )
             expanded_ordered = _order_with_location_context(
                 scored,
                 sources=sources,
@@ -731,11 +1121,9 @@ async def unified_search(
             merged_source_errors = dict(pagination_state["source_errors"])
             merged_source_errors.update(incoming_source_errors)
             pagination_state["source_errors"] = merged_source_errors
-            pagination_state["fetch_limit"] = next_fetch_limit
-            pagination_state["can_expand"] = _multi_source_can_expand(
-                sources=sources,
-                source_counts=source_counts,
-                fetch_limit=next_fetch_limit,
+            pagination_state["cursors"] = next_cursors
+            pagination_state["can_expand"] = any(
+                cursor is not None for cursor in next_cursors.values()
             )
 
             expansions += 1
@@ -750,18 +1138,12 @@ async def unified_search(
 
         ordered = pagination_state["ordered"]
         source_errors = pagination_state["source_errors"]
-        can_expand = bool(pagination_state["can_expand"])
-        page = ordered[safe_offset : safe_offset + limit]
-        page_end = safe_offset + len(page)
-
-        total = None if can_expand else len(ordered)
-        if page_end < len(ordered):
-            next_offset = page_end
-        elif page_end > safe_offset and can_expand:
-            next_offset = page_end
-        else:
-            next_offset = None
-
+        page, total, next_offset = _multi_source_page(
+            ordered,
+            offset=safe_offset,
+            limit=limit,
+            can_expand=bool(pagination_state["can_expand"]),
+        )
         return page, total, next_offset, source_errors
 
     fetch_limit = max(limit + safe_offset, limit)
@@ -790,24 +1172,249 @@ async def unified_search(
         search_location_context=search_location_context,
     )
 
-    total = len(ordered)
-    page = ordered[safe_offset : safe_offset + limit]
-    next_offset = safe_offset + limit if safe_offset + limit < total else None
+    page, total, next_offset = _single_source_page(
+        ordered,
+        offset=safe_offset,
+        limit=limit,
+        fetch_limit=fetch_limit,
+        facebook_only=facebook_only,
+    )
+    return page, total, next_offset, source_errors
 
-    # For single-source connectors, we often don't know global total upfront.
-    # If the current fetch window is fully filled, keep pagination alive.
-    if len(page) == limit and total == fetch_limit:
-        total = None
-        next_offset = safe_offset + limit
 
-    # Facebook scraping does not expose a stable total count in advance.
-    # For facebook-only queries, keep pagination alive while each page is full.
-    # The next request increases fetch_limit (limit + offset), allowing deeper scroll extraction.
-    if facebook_only:
-        total = None
-        if len(page) == limit:
-            next_offset = safe_offset + limit
+async def _fetch_scored_source(
+    *,
+    src: str,
+    query: str,
+    fetch_limit: int,
+    sort: SearchSort,
+    facebook_runtime_context: FacebookRuntimeContext | None,
+    is_multi_source: bool,
+) -> tuple[str, list[Listing], SourceError | None, int]:
+    src, listings, source_error = await _fetch_source(
+        src=src,
+        query=query,
+        fetch_limit=fetch_limit,
+        sort=sort,
+        facebook_runtime_context=facebook_runtime_context,
+        is_multi_source=is_multi_source,
+    )
+    return src, _score_listings(query, _dedupe_listings(listings)), source_error, len(listings)
+
+
+async def _merge_streamed_fetch(
+    key: str,
+    sources: list[str],
+    tasks: list[asyncio.Future],
+    *,
+    redis_client=None,
+    lock_token: str | None = None,
+) -> tuple[list[Listing], dict[str, SourceError], dict[str, int]]:
+    try:
+        fetched: dict[str, list[Listing]] = {}
+        source_errors: dict[str, SourceError] = {}
+        source_counts: dict[str, int] = {}
+        for src, src_scored, source_error, count in await asyncio.gather(*tasks):
+            fetched[src] = src_scored
+            source_counts[src] = count
+            if source_error is not None:
+                source_errors[src] = source_error
+
+        # Merge in request source order so the pool matches what _fetch_and_score builds,
+        # then seed the fetch cache so a follow-up /search page reuses it.
+        scored = _dedupe_listings([item for src in sources for item in fetched.get(src, [])])
+        payload = (scored, source_errors, source_counts)
+        _cache.set(key, payload, ttl_seconds=settings.CACHE_TTL_SECONDS)
+        if redis_client is not None and lock_token is not None:
+            _publish_single_flight_result(redis_client, key, payload)
+        return payload
+    finally:
+        if redis_client is not None and lock_token is not None:
+            _release_single_flight_lock(redis_client, key, lock_token)
+
+
+@dataclass
+class SearchStreamFrame:
+    event: str
+    source: str | None = None
+    results: list[Listing] | None = None
+    source_error: SourceError | None = None
+    total: int | None = None
+    next_offset: int | None = None
+    source_errors: dict[str, SourceError] | None = None
+
+
+async def stream_search(
+    query: str,
+    sources: list[str],
+    limit: int = 20,
+    offset: int = 0,
+    sort: SearchSort = "relevance",
+    facebook_runtime_context: FacebookRuntimeContext | None = None,
+    search_location_context: ResolvedLocation | None = None,
+):
+    safe_offset = max(0, offset)
+    fetch_limit = max(limit + safe_offset, limit)
+    multi_source = len(sources) > 1
+
+    if multi_source and safe_offset > 0:
+        # Deeper multi-source pages continue from the cursor state /search keeps, so a
+        # streamed page and a /search page at the same offset always agree.
+        page, total, next_offset, source_errors = await unified_search(
+            query=query,
+            sources=sources,
+            limit=limit,
+            offset=safe_offset,
+            sort=sort,
+            facebook_runtime_context=facebook_runtime_context,
+            search_location_context=search_location_context,
+        )
+        for src in sources:
+            yield SearchStreamFrame(
+                event="source",
+                source=src,
+                results=[item for item in page if item.source == src],
+                source_error=source_errors.get(src),
+            )
+        yield SearchStreamFrame(
+            event="complete",
+            results=page,
+            total=total,
+            next_offset=next_offset,
+            source_errors=source_errors,
+        )
+        return
+
+    key = _cache_key(
+        query,
+        sources,
+        fetch_limit,
+        sort,
+        facebook_runtime_context,
+        search_location_context,
+    )
+
+    cached = _cache.get(key)
+    if not (isinstance(cached, tuple) and len(cached) == 3):
+        cached = None
+    redis_client, lock_token = None, None
+    if cached is None and settings.MARKETLY_SEARCH_SINGLE_FLIGHT_ENABLED:
+        # Join a fetch another stream or /search already started for this window instead
+        # of fanning out to every connector again.
+        inflight = _inflight_fetches.get(key)
+        if (
+            inflight is not None
+            and not inflight.done()
+            and inflight.get_loop() is asyncio.get_running_loop()
+        ):
+            cached = await asyncio.shield(inflight)
         else:
-            next_offset = None
+            redis_client, lock_token = _claim_single_flight_lock(key)
+            if redis_client is not None and lock_token is None:
+                # Another worker holds the fetch; wait for its result the way /search does.
+                cached = await _fetch_and_score(
+                    query=query,
+                    sources=sources,
+                    fetch_limit=fetch_limit,
+                    sort=sort,
+                    facebook_runtime_context=facebook_runtime_context,
+                    search_location_context=search_location_context,
+                )
 
-    return page, total, next_offset, source_errors
+    if cached is not None:
+        scored, source_errors, source_counts = cached
+        for src in sources:
+            src_items = [item for item in scored if item.source == src]
+            yield SearchStreamFrame(
+                event="source",
+                source=src,
+                results=_order_with_location_context(
+                    src_items,
+                    sources=[src],
+                    sort=sort,
+                    search_location_context=search_location_context,
+                ),
+                source_error=source_errors.get(src),
+            )
+    else:
+        tasks = [
+            asyncio.ensure_future(
+                _fetch_scored_source(
+                    src=src,
+                    query=query,
+                    fetch_limit=fetch_limit,
+                    sort=sort,
+                    facebook_runtime_context=facebook_runtime_context,
+                    is_multi_source=multi_source,
+                )
+            )
+            for src in sources
+        ]
+        merged = asyncio.ensure_future(
+            _merge_streamed_fetch(
+                key,
+                sources,
+                tasks,
+                redis_client=redis_client,
+                lock_token=lock_token,
+            )
+        )
+        single_flight = settings.MARKETLY_SEARCH_SINGLE_FLIGHT_ENABLED
+        if single_flight:
+            _inflight_fetches[key] = merged
+            merged.add_done_callback(lambda done, key=key: _forget_inflight_fetch(key, done))
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                src, src_scored, source_error, _ = await next_done
+                yield SearchStreamFrame(
+                    event="source",
+                    source=src,
+                    results=_order_with_location_context(
+                        list(src_scored),
+                        sources=[src],
+                        sort=sort,
+                        search_location_context=search_location_context,
+                    ),
+                    source_error=source_error,
+                )
+        finally:
+            # Followers may be waiting on the shared fetch, so it only stops early when
+            # nobody else can be joined to it.
+            if not single_flight:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+        scored, source_errors, source_counts = await asyncio.shield(merged)
+
+    ordered = _order_with_location_context(
+        list(scored),
+        sources=sources,
+        sort=sort,
+        search_location_context=search_location_context,
+    )
+    if multi_source:
+        page, total, next_offset = _multi_source_page(
+            ordered,
+            offset=safe_offset,
+            limit=limit,
+            can_expand=_multi_source_can_expand(
+                sources=sources,
+                source_counts=source_counts,
+                fetch_limit=fetch_limit,
+            ),
+        )
+    else:
+        page, total, next_offset = _single_source_page(
+            ordered,
+            offset=safe_offset,
+            limit=limit,
+            fetch_limit=fetch_limit,
+            facebook_only=sources == ["facebook"],
+        )
+    yield SearchStreamFrame(
+        event="complete",
+        results=page,
+        total=total,
+        next_offset=next_offset,
+        source_errors=source_errors,
+    )
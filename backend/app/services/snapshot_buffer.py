@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.models.listing import Listing
+from app.services.listing_snapshots import SnapshotBatch, persist_snapshot_batches
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotBuffer:
+    # Process-wide write-behind queue: requests hand their snapshot rows over and a single
+    # flusher task writes them in a few large transactions instead of one per request.
+    def __init__(
+        self,
+        *,
+        max_pending_rows: int,
+        batch_rows: int,
+        flush_interval_seconds: float,
+        writer: Callable[[list[SnapshotBatch]], int] = persist_snapshot_batches,
+    ) -> None:
+        self.max_pending_rows = max(1, int(max_pending_rows))
+        self.batch_rows = max(1, int(batch_rows))
+        self.flush_interval_seconds = max(0.05, float(flush_interval_seconds))
+        self._writer = writer
+        self._pending: deque[SnapshotBatch] = deque()
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self.enqueued_rows = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.dropped_rows = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is None:
+            return
+        self._closing = True
+        self._notify()
+        try:
+            await task
+        finally:
+            self._task = None
+            logger.info("snapshot buffer stopped stats=%s", self.stats())
+
+    def offer(self, batch: SnapshotBatch) -> bool:
+        # False means the buffer is not running and the caller should write another way.
+        # A full buffer drops the batch and still returns True: the caller must not fall back.
+        if not self.running:
+            return False
+        row_count = len(batch.listings)
+        if row_count == 0:
+            return True
+
+        with self._lock:
+            if self._pending_rows + row_count > self.max_pending_rows:
+                self.dropped_rows += row_count
+                logger.warning(
+                    "snapshot buffer full, dropping rows=%s pending=%s dropped_total=%s",
+                    row_count,
+                    self._pending_rows,
+                    self.dropped_rows,
+                )
+                return True
+            self._pending.append(batch)
+            self._pending_rows += row_count
+            self.enqueued_rows += row_count
+            should_flush = self._pending_rows >= self.batch_rows
+        if should_flush:
+            self._notify()
+        return True
+
+    def pending_rows(self) -> int:
+        with self._lock:
+            return self._pending_rows
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "pending_rows": self._pending_rows,
+                "enqueued_rows": self.enqueued_rows,
+                "flushed_rows": self.flushed_rows,
+                "failed_rows": self.failed_rows,
+                "dropped_rows": self.dropped_rows,
+                "flushes": self.flushes,
+            }
+
+    def _notify(self) -> None:
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _take_chunk(self) -> list[SnapshotBatch]:
+        chunk: list[SnapshotBatch] = []
+        chunk_rows = 0
+        with self._lock:
+            while self._pending:
+                next_rows = len(self._pending[0].listings)
+                if chunk and chunk_rows + next_rows > self.batch_rows:
+                    break
+                chunk.append(self._pending.popleft())
+                chunk_rows += next_rows
+            self._pending_rows -= chunk_rows
+        return chunk
+
+    async def _flush_pending(self) -> None:
+        while True:
+            chunk = self._take_chunk()
+            if not chunk:
+                return
+            chunk_rows = sum(len(batch.listings) for batch in chunk)
+            try:
+                written = await asyncio.to_thread(self._writer, chunk)
+            except Exception as exc:
+                logger.warning("snapshot buffer flush failed rows=%s error=%s", chunk_rows, exc)
+                written = 0
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += written
+                self.failed_rows += max(0, chunk_rows - written)
+
+    async def _run(self) -> None:
+        wake = self._wake
+        if wake is None:
+            return
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            await self._flush_pending()
+            if self._closing:
+                return
+
+
+snapshot_buffer = SnapshotBuffer(
+    max_pending_rows=settings.MARKETLY_SNAPSHOT_BUFFER_MAX_ROWS,
+    batch_rows=settings.MARKETLY_SNAPSHOT_BUFFER_BATCH_ROWS,
+    flush_interval_seconds=settings.MARKETLY_SNAPSHOT_BUFFER_FLUSH_SECONDS,
+)
+
+
+def enqueue_listing_snapshots(
+    *,
+    query: str,
+    listings: list[Listing],
+    user_id: object | None = None,
+    saved_search_id: int | None = None,
+) -> bool:
+    return snapshot_buffer.offer(
+        SnapshotBatch(
+            query=query,
+            listings=list(listings),
+            user_id=user_id,
+            saved_search_id=saved_search_id,
+            observed_at=datetime.now(timezone.utc),
+        )
+    )
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.listing_snapshot import ListingSnapshot
+from app.models.listing_snapshot_token import ListingSnapshotToken
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TABLE = ListingSnapshot.__tablename__
+ARCHIVE_BATCH_SIZE = 1000
+_PARTITION_NAME_PATTERN = re.compile(rf"^{SNAPSHOT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value: date | datetime) -> date:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _month_bounds(month: date) -> tuple[datetime, datetime]:
+    lower = datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+    upper = datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+    return lower, upper
+
+
+def partition_name(month: date) -> str:
+    return f"{SNAPSHOT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    match = _PARTITION_NAME_PATTERN.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def snapshot_retention_days() -> int:
+    # Never drop history the valuation lookback still reads.
+    return max(int(settings.MARKETLY_SNAPSHOT_RETENTION_DAYS), int(settings.MARKETLY_VALUATION_LOOKBACK_DAYS))
+
+
+def snapshot_retained_since(now: datetime | None = None) -> datetime:
+    # Retention drops whole months, so everything from the start of the cutoff month is kept.
+    # Readers bound their scans with this so Postgres can prune the dropped partitions.
+    current = now or datetime.now(timezone.utc)
+    cutoff_month = month_start(current - timedelta(days=snapshot_retention_days()))
+    return _month_bounds(cutoff_month)[0]
+
+
+def snapshots_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    row = db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table_name AND pg_table_is_visible(c.oid)"
+        ),
+        {"table_name": SNAPSHOT_TABLE},
+    ).first()
+    return row is not None
+
+
+def list_snapshot_partitions(db: Session) -> list[str]:
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table_name AND pg_table_is_visible(parent.oid) "
+            "ORDER BY child.relname"
+        ),
+        {"table_name": SNAPSHOT_TABLE},
+    ).scalars()
+    return [str(name) for name in rows]
+
+
+def _create_partition_sql(month: date) -> list[str]:
+    name = partition_name(month)
+    lower, upper = _month_bounds(month)
+    # observation_key embeds the UTC day, so all rows sharing a key land in one partition and a
+    # per-partition unique index is as strong as the global one Postgres will not allow here.
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {SNAPSHOT_TABLE} "
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name}_observation_key ON {name} (observation_key)",
+    ]
+
+
+def ensure_snapshot_partitions(
+    db: Session,
+    *,
+    months_ahead: int | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    if not snapshots_partitioned(db):
+        return []
+    ahead = settings.MARKETLY_SNAPSHOT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    existing = set(list_snapshot_partitions(db))
+    current_month = month_start(now or datetime.now(timezone.utc))
+    created: list[str] = []
+    for offset in range(0, max(0, int(ahead)) + 1):
+        month = add_months(current_month, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        try:
+            # Fails when the default partition already holds rows for this month; those stay
+            # where they are and the month is retried on the next run.
+            with db.begin_nested():
+                for statement in _create_partition_sql(month):
+                    db.execute(text(statement))
+        except Exception as exc:
+            logger.warning("snapshot partition create failed partition=%s error=%s", name, exc)
+            continue
+        created.append(name)
+    return created
+
+
+def _json_default(value: object) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _archive_month(db: Session, month: date, archive_dir: Path) -> tuple[int, Path | None]:
+    lower, upper = _month_bounds(month)
+    table = ListingSnapshot.__table__
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archive_path = archive_dir / f"{partition_name(month)}.jsonl.gz"
+    temp_path = archive_path.with_name(archive_path.name + ".tmp")
+
+    row_count = 0
+    last_id = 0
+    with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+        while True:
+            rows = (
+                db.execute(
+                    select(table)
+                    .where(table.c.observed_at >= lower)
+                    .where(table.c.observed_at < upper)
+                    .where(table.c.id > last_id)
+                    .order_by(table.c.id.asc())
+                    .limit(ARCHIVE_BATCH_SIZE)
+                )
+                .mappings()
+                .all()
+            )
+            if not rows:
+                break
+            for row in rows:
+                handle.write(json.dumps(dict(row), default=_json_default) + "\n")
+            row_count += len(rows)
+            last_id = int(rows[-1]["id"])
+
+    if row_count == 0:
+        temp_path.unlink(missing_ok=True)
+        return 0, None
+    os.replace(temp_path, archive_path)
+    return row_count, archive_path
+
+
+def _expired_months(db: Session, *, cutoff_month: date, partitioned: bool) -> list[date]:
+    months: set[date] = set()
+    oldest = db.execute(
+        select(func.min(ListingSnapshot.observed_at)).where(
+            ListingSnapshot.observed_at < _month_bounds(cutoff_month)[0]
+        )
+    ).scalar()
+    if oldest is not None:
+        month = month_start(oldest)
+        while month < cutoff_month:
+            months.add(month)
+            month = add_months(month, 1)
+    if partitioned:
+        for name in list_snapshot_partitions(db):
+            month = partition_month(name)
+            if month is not None and month < cutoff_month:
+                months.add(month)
+    return sorted(months)
+
+
+def archive_expired_snapshots(
+    db: Session,
+    *,
+    archive_dir: str | Path | None = None,
+    archive: bool = True,
+    now: datetime | None = None,
+) -> list[dict[str, object]]:
+    cutoff_month = month_start(snapshot_retained_since(now))
+    partitioned = snapshots_partitioned(db)
+    partitions = set(list_snapshot_partitions(db)) if partitioned else set()
+    target_dir = Path(archive_dir or settings.MARKETLY_SNAPSHOT_ARCHIVE_DIR)
+
+    results: list[dict[str, object]] = []
+    for month in _expired_months(db, cutoff_month=cutoff_month, partitioned=partitioned):
+        lower, upper = _month_bounds(month)
+        archived_rows, archive_path = _archive_month(db, month, target_dir) if archive else (0, None)
+
+        month_ids = (
+            select(ListingSnapshot.id)
+            .where(ListingSnapshot.observed_at >= lower)
+            .where(ListingSnapshot.observed_at < upper)
+        )
+        db.execute(delete(ListingSnapshotToken).where(ListingSnapshotToken.snapshot_id.in_(month_ids)))
+
+        name = partition_name(month)
+        dropped_partition = name in partitions
+        if dropped_partition:
+            db.execute(text(f"ALTER TABLE {SNAPSHOT_TABLE} DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+        # Rows from a month without its own partition sit in the default partition (or in a
+        # plain table off Postgres) and are deleted row by row.
+        deleted_rows = db.execute(
+            delete(ListingSnapshot)
+            .where(ListingSnapshot.observed_at >= lower)
+            .where(ListingSnapshot.observed_at < upper)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.flush()
+        if not dropped_partition and not deleted_rows:
+            continue
+        results.append(
+            {
+                "month": month.strftime("%Y-%m"),
+                "archived_rows": archived_rows,
+                "archive_path": str(archive_path) if archive_path is not None else None,
+                "dropped_partition": dropped_partition,
+                "deleted_rows": int(deleted_rows or 0),
+            }
+        )
+    return results
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import logging
 
-import httpx
-
 from app.connectors.facebook_marketplace.models import FacebookNormalizedListing
 from app.core.config import settings
+from app.core.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -50,8 +49,13 @@ async def upsert_facebook_records(records: list[FacebookNormalizedListing]) -> i
 
     payload = [r.model_dump(mode="json", exclude_none=True) for r in records]
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.post(url, params=params, json=payload, headers=headers)
+    response = await get_http_client("supabase").post(
+        url,
+        params=params,
+        json=payload,
+        headers=headers,
+        timeout=30,
+    )
 
     if response.status_code >= 400:
         body = response.text[:600]
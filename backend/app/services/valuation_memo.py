@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from itertools import count
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.listing import ListingValuation
+
+_valuation_memo = TTLCache(max_items=max(1, int(settings.MARKETLY_VALUATION_MEMO_MAX_ITEMS)))
+_generations = count(1)
+_dependency_versions: dict[str, tuple[int, float]] = {}
+_versions_lock = Lock()
+_PENDING_BUMPS_KEY = "valuation_memo_pending_bumps"
+
+
+def valuation_memo_enabled() -> bool:
+    return int(settings.MARKETLY_VALUATION_MEMO_TTL_SECONDS) > 0
+
+
+def dependency_versions(dependencies: Iterable[str]) -> tuple[int, ...]:
+    with _versions_lock:
+        return tuple(_dependency_versions.get(dependency, (0, 0.0))[0] for dependency in dependencies)
+
+
+def bump_dependency_versions(dependencies: Iterable[str]) -> None:
+    now = time.monotonic()
+    with _versions_lock:
+        generation = next(_generations)
+        for dependency in dependencies:
+            _dependency_versions[dependency] = (generation, now)
+        if len(_dependency_versions) > 4 * int(settings.MARKETLY_VALUATION_MEMO_MAX_ITEMS):
+            # A dependency untouched for a full TTL can read as version 0 again: every memo
+            # entry built before its last bump has expired by then.
+            stale_before = now - max(1, int(settings.MARKETLY_VALUATION_MEMO_TTL_SECONDS))
+            for dependency, (_, bumped_at) in list(_dependency_versions.items()):
+                if bumped_at < stale_before:
+                    del _dependency_versions[dependency]
+
+
+def bump_dependency_versions_on_commit(db: Session, dependencies: Iterable[str]) -> None:
+    # Bumping before the commit would let a valuation computed in between read the old history
+    # and be memoized under the new version, so the bump waits for the commit.
+    db.info.setdefault(_PENDING_BUMPS_KEY, set()).update(dependencies)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_dependencies(db: Session) -> None:
+    if db.in_nested_transaction():
+        return
+    pending = db.info.pop(_PENDING_BUMPS_KEY, None)
+    if pending:
+        bump_dependency_versions(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_dependencies(db: Session) -> None:
+    if not db.in_nested_transaction():
+        db.info.pop(_PENDING_BUMPS_KEY, None)
+
+
+def get_memoized_valuation(key: str) -> ListingValuation | None:
+    valuation = _valuation_memo.get(key)
+    return valuation.model_copy() if valuation is not None else None
+
+
+def memoize_valuation(key: str, valuation: ListingValuation) -> None:
+    _valuation_memo.set(
+        key,
+        valuation.model_copy(),
+        ttl_seconds=int(settings.MARKETLY_VALUATION_MEMO_TTL_SECONDS),
+    )
+
+
+def clear_valuation_memo() -> None:
+    _valuation_memo.clear()
+    with _versions_lock:
+        _dependency_versions.clear()
+
+
+def valuation_memo_stats() -> dict[str, int]:
+    return _valuation_memo.stats()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.listing_snapshot import ListingSnapshot
+from app.models.valuation_rollup import ValuationRollup
+from app.services.listing_insights import DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT, _normalized_condition
+from app.services.valuation_memo import bump_dependency_versions_on_commit
+
+# A bucket never needs more than the exact tier reads, so the newest prices per day are enough.
+ROLLUP_PRICE_SAMPLE_LIMIT = DEFAULT_VALUATION_EXACT_SAMPLE_LIMIT
+UNKNOWN_CONDITION_BUCKET = "unknown"
+DEFAULT_REBUILD_BATCH_SIZE = 1000
+
+
+class SnapshotObservation(NamedTuple):
+    valuation_key: str
+    price_amount: float | None
+    condition: str | None
+    observed_at: datetime | None
+
+
+def rollup_bucket_date(observed_at: datetime | None) -> date:
+    if observed_at is None:
+        return datetime.now(timezone.utc).date()
+    if observed_at.tzinfo is not None:
+        observed_at = observed_at.astimezone(timezone.utc)
+    return observed_at.date()
+
+
+def _add_to_rollup(
+    rollup: ValuationRollup,
+    rows: Sequence[SnapshotObservation | ListingSnapshot],
+) -> None:
+    prices = list(rollup.recent_prices_json or [])
+    condition_counts = dict(rollup.condition_counts_json or {})
+    for row in rows:
+        prices.append(float(row.price_amount))
+        condition = _normalized_condition(row.condition) or UNKNOWN_CONDITION_BUCKET
+        condition_counts[condition] = int(condition_counts.get(condition, 0)) + 1
+
+    # Reassign rather than mutate so the JSON columns are marked dirty.
+    rollup.sample_count = int(rollup.sample_count or 0) + len(rows)
+    rollup.recent_prices_json = prices[-ROLLUP_PRICE_SAMPLE_LIMIT:]
+    rollup.condition_counts_json = condition_counts
+
+
+def record_valuation_rollups(
+    db: Session,
+    snapshots: Sequence[SnapshotObservation | ListingSnapshot],
+) -> int:
+    grouped: dict[tuple[str, date], list[SnapshotObservation | ListingSnapshot]] = defaultdict(list)
+    for row in snapshots:
+        if row.price_amount is None or float(row.price_amount) <= 0:
+            continue
+        grouped[(row.valuation_key, rollup_bucket_date(row.observed_at))].append(row)
+    if not grouped:
+        return 0
+
+    # Row locks serialize concurrent writers on a bucket (queue workers, concurrent checks),
+    # so no increment is lost to a read-modify-write race. Sorted to keep lock order stable.
+    existing_rows = (
+        db.query(ValuationRollup)
+        .filter(ValuationRollup.valuation_key.in_({key for key, _ in grouped}))
+        .filter(ValuationRollup.bucket_date.in_({bucket for _, bucket in grouped}))
+        .order_by(ValuationRollup.valuation_key.asc(), ValuationRollup.bucket_date.asc())
+        .with_for_update()
+        .all()
+    )
+    existing = {(row.valuation_key, row.bucket_date): row for row in existing_rows}
+
+    for valuation_key, bucket_date in sorted(grouped):
+        rows = grouped[(valuation_key, bucket_date)]
+        rollup = existing.get((valuation_key, bucket_date))
+        if rollup is not None:
+            _add_to_rollup(rollup, rows)
+            continue
+
+        rollup = ValuationRollup(
+            valuation_key=valuation_key,
+            bucket_date=bucket_date,
+            sample_count=0,
+            recent_prices_json=[],
+            condition_counts_json={},
+        )
+        _add_to_rollup(rollup, rows)
+        try:
+            with db.begin_nested():
+                db.add(rollup)
+        except IntegrityError:
+            # Another writer inserted this bucket first; lock its row and add to it instead.
+            rollup = (
+                db.query(ValuationRollup)
+                .filter(ValuationRollup.valuation_key == valuation_key)
+                .filter(ValuationRollup.bucket_date == bucket_date)
+                .with_for_update()
+                .one()
+            )
+            _add_to_rollup(rollup, rows)
+
+    return len(grouped)
+
+
+def rebuild_valuation_rollups(
+    db: Session,
+    *,
+    since: datetime | None = None,
+    batch_size: int = DEFAULT_REBUILD_BATCH_SIZE,
+) -> int:
+    rollup_query = db.query(ValuationRollup)
+    snapshot_query = (
+        db.query(ListingSnapshot)
+        .filter(ListingSnapshot.price_amount.isnot(None))
+        .filter(ListingSnapshot.price_amount > 0)
+    )
+    if since is not None:
+        since_date = rollup_bucket_date(since)
+        rollup_query = rollup_query.filter(ValuationRollup.bucket_date >= since_date)
+        snapshot_query = snapshot_query.filter(
+            ListingSnapshot.observed_at >= datetime.combine(since_date, datetime.min.time(), tzinfo=timezone.utc)
+        )
+    rollup_query.delete(synchronize_session=False)
+    db.flush()
+
+    # Keyset batches by id keep memory flat; ids follow insertion order, which is what the
+    # incremental path sees too.
+    processed = 0
+    last_id = 0
+    safe_batch_size = max(1, int(batch_size))
+    while True:
+        batch = (
+            snapshot_query.filter(ListingSnapshot.id > last_id)
+            .order_by(ListingSnapshot.id.asc())
+            .limit(safe_batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        record_valuation_rollups(db, batch)
+        db.flush()
+        bump_dependency_versions_on_commit(db, {f"key:{row.valuation_key}" for row in batch})
+        processed += len(batch)
+        last_id = int(batch[-1].id)
+    return processed
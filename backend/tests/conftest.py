@@ -16,3 +16,12 @@ def _reset_local_rate_limit_state():
     yield
     with _rate_limit_module._local_lock:
         _rate_limit_module._local_fixed_windows.clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_valuation_memo():
+    from app.services.valuation_memo import clear_valuation_memo
+
+    clear_valuation_memo()
+    yield
+    clear_valuation_memo()
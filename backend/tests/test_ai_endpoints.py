@@ -3,6 +3,7 @@ from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 
+from app import main as main_module
 from app.auth import get_current_user_id
 from app.core.config import settings
 from app.db import get_db
@@ -11,7 +12,7 @@ from app.models.listing import Listing, ListingRisk, ListingValuation, Money
 from app.models.saved_search import SavedSearch
 from app.models.saved_search_notification import SavedSearchNotification
 from app.schemas.copilot import CopilotQueryResponse
-from app.services.alerts import ALERT_BASELINE_VERSION
+from app.services.alerts import ALERT_BASELINE_VERSION, begin_alert_refresh, end_alert_refresh
 
 from .utils import build_test_session_factory, db_override_factory
 
@@ -308,7 +309,7 @@ def test_copilot_query_allows_missing_query_and_empty_listings(monkeypatch):
     assert captured["listings"] == []
 
 
-def test_notifications_endpoint_refreshes_alerts_before_listing(monkeypatch):
+def test_notifications_endpoint_schedules_alert_refresh_after_listing(monkeypatch):
     engine, session_factory = build_test_session_factory()
     app.dependency_overrides[get_current_user_id] = _override_auth
     app.dependency_overrides[get_db] = db_override_factory(session_factory)
@@ -362,6 +363,7 @@ def test_notifications_endpoint_refreshes_alerts_before_listing(monkeypatch):
     notifications_res = client.get("/me/notifications")
 
     assert notifications_res.status_code == 200
+    assert notifications_res.headers["X-Alerts-Refresh"] == "started"
     assert called == {"user_id": "user-123"}
     assert len(notifications_res.json()) == 1
     assert notifications_res.json()[0]["summary"] == "1 new listing for road bike"
@@ -426,9 +428,17 @@ def test_notifications_endpoint_rebaselines_invalid_saved_search_and_clears_fals
     monkeypatch.setattr("app.services.alerts.enrich_listings_with_insights", lambda db, query, results: results)
     monkeypatch.setattr("app.services.alerts.persist_listing_snapshots", lambda **kwargs: len(kwargs["listings"]))
 
+    # The refresh runs after the response, so the first read still lists the old row.
     notifications_res = client.get("/me/notifications")
 
     assert notifications_res.status_code == 200
+    assert notifications_res.headers["X-Alerts-Refresh"] == "started"
+    assert len(notifications_res.json()) == 1
+
+    notifications_res = client.get("/me/notifications")
+
+    assert notifications_res.status_code == 200
+    assert notifications_res.headers["X-Alerts-Refresh"] == "idle"
     assert notifications_res.json() == []
 
     db = session_factory()
@@ -1143,3 +1153,156 @@ def test_saved_search_run_passes_newest_sort(monkeypatch):
 
     app.dependency_overrides.clear()
     engine.dispose()
+
+
+def test_notifications_endpoint_does_not_start_a_second_refresh_for_the_same_user(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    app.dependency_overrides[get_current_user_id] = _override_auth
+    app.dependency_overrides[get_db] = db_override_factory(session_factory)
+
+    calls: list[str] = []
+
+    async def fake_refresh_saved_search_alerts_for_user(db, *, user_id):
+        calls.append(user_id)
+        return True
+
+    monkeypatch.setattr("app.main.refresh_saved_search_alerts_for_user", fake_refresh_saved_search_alerts_for_user)
+
+    db = session_factory()
+    try:
+        db.add(SavedSearch(user_id="user-123", query="road bike", sources="ebay", alerts_enabled=True))
+        db.commit()
+    finally:
+        db.close()
+
+    assert begin_alert_refresh("user-123") is True
+    try:
+        notifications_res = client.get("/me/notifications")
+    finally:
+        end_alert_refresh("user-123")
+
+    assert notifications_res.status_code == 200
+    assert notifications_res.headers["X-Alerts-Refresh"] == "running"
+    assert calls == []
+
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def test_notifications_poll_returns_rows_newer_than_cursor(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    app.dependency_overrides[get_current_user_id] = _override_auth
+    app.dependency_overrides[get_db] = db_override_factory(session_factory)
+    monkeypatch.setattr(settings, "MARKETLY_NOTIFICATIONS_POLL_INTERVAL_SECONDS", 0.05)
+
+    db = session_factory()
+    try:
+        saved_search = SavedSearch(user_id="user-123", query="road bike", sources="ebay", alerts_enabled=True)
+        db.add(saved_search)
+        db.commit()
+        db.refresh(saved_search)
+        for summary in ("older", "newer"):
+            db.add(
+                SavedSearchNotification(
+                    user_id="user-123",
+                    saved_search_id=saved_search.id,
+                    saved_search_query="road bike",
+                    summary_text=summary,
+                    items_json=[],
+                )
+            )
+        db.add(
+            SavedSearchNotification(
+                user_id="someone-else",
+                saved_search_id=saved_search.id,
+                saved_search_query="road bike",
+                summary_text="other user",
+                items_json=[],
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    poll_res = client.get("/me/notifications/poll", params={"after_id": 1, "timeout": 0})
+
+    assert poll_res.status_code == 200
+    assert [entry["id"] for entry in poll_res.json()] == [2]
+    assert poll_res.headers["X-Alerts-Refresh"] == "idle"
+
+    calls = {"purge": 0, "read": 0}
+    purge = main_module.commit_stale_notification_purge
+    read = main_module.list_notifications_since
+
+    def counting_purge(*args, **kwargs):
+        calls["purge"] += 1
+        return purge(*args, **kwargs)
+
+    def counting_read(*args, **kwargs):
+        calls["read"] += 1
+        return read(*args, **kwargs)
+
+    monkeypatch.setattr(main_module, "commit_stale_notification_purge", counting_purge)
+    monkeypatch.setattr(main_module, "list_notifications_since", counting_read)
+    empty_res = client.get("/me/notifications/poll", params={"after_id": 2, "timeout": 0.2})
+
+    assert empty_res.status_code == 200
+    assert empty_res.json() == []
+    # The full-scan purge runs once per poll; only the cursor read repeats while waiting.
+    assert calls["purge"] == 1
+    assert calls["read"] > 1
+
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def test_notifications_poll_pages_forward_from_the_cursor_without_gaps(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    app.dependency_overrides[get_current_user_id] = _override_auth
+    app.dependency_overrides[get_db] = db_override_factory(session_factory)
+
+    db = session_factory()
+    try:
+        saved_search = SavedSearch(user_id="user-123", query="road bike", sources="ebay", alerts_enabled=True)
+        db.add(saved_search)
+        db.commit()
+        db.refresh(saved_search)
+        for index in range(5):
+            db.add(
+                SavedSearchNotification(
+                    user_id="user-123",
+                    saved_search_id=saved_search.id,
+                    saved_search_query="road bike",
+                    summary_text=f"alert {index}",
+                    items_json=[],
+                )
+            )
+        # A notification for a query the saved search no longer has is stale and purged.
+        db.add(
+            SavedSearchNotification(
+                user_id="user-123",
+                saved_search_id=saved_search.id,
+                saved_search_query="mountain bike",
+                summary_text="stale",
+                items_json=[],
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    after_id = 0
+    pages = []
+    while True:
+        poll_res = client.get("/me/notifications/poll", params={"after_id": after_id, "limit": 2, "timeout": 0})
+        assert poll_res.status_code == 200
+        page = [entry["id"] for entry in poll_res.json()]
+        if not page:
+            break
+        pages.append(page)
+        after_id = page[-1]
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+    app.dependency_overrides.clear()
+    engine.dispose()
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models.saved_search import SavedSearch
+from app.models.saved_search_alert_job import SavedSearchAlertJob
+from app.services import alerts as alerts_module
+from app.services.alert_queue import (
+    alert_queue_counts,
+    enqueue_alert_checks,
+    finish_alert_jobs,
+    lease_alert_jobs,
+    run_alert_queue_worker,
+)
+from app.services.alerts import SavedSearchAlertCheckOutcome
+
+from .utils import build_test_session_factory
+
+
+def _failed_outcome() -> SavedSearchAlertCheckOutcome:
+    return SavedSearchAlertCheckOutcome(
+        successful_check=False,
+        error_code="SOURCE_ERRORS",
+        error_message="eBay unavailable.",
+    )
+
+
+def test_alert_queue_leases_each_check_once_and_takes_over_expired_leases():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    db.add_all(
+        [
+            SavedSearch(user_id="user-a", query="desk", sources="ebay", alerts_enabled=True),
+            SavedSearch(user_id="user-b", query="chair", sources="kijiji", alerts_enabled=True),
+            SavedSearch(user_id="user-c", query="lamp", sources="ebay", alerts_enabled=False),
+        ]
+    )
+    db.commit()
+
+    now = datetime.now(timezone.utc)
+    assert enqueue_alert_checks(db, now=now) == 2
+    # Open checks are not queued twice.
+    assert enqueue_alert_checks(db, now=now) == 0
+
+    first = lease_alert_jobs(db, worker_id="worker-1", limit=1, lease_seconds=60, now=now)
+    second = lease_alert_jobs(db, worker_id="worker-2", limit=5, lease_seconds=600, now=now)
+    assert len(first) == 1
+    assert len(second) == 1
+    assert first[0].saved_search_id != second[0].saved_search_id
+    assert lease_alert_jobs(db, worker_id="worker-3", limit=5, now=now) == []
+
+    # worker-1 stalls past its lease, so worker-3 takes the check over and worker-1's result is ignored.
+    taken_over = lease_alert_jobs(db, worker_id="worker-3", limit=5, now=now + timedelta(seconds=61))
+    assert [job.id for job in taken_over] == [first[0].id]
+    assert taken_over[0].attempts == 2
+    assert finish_alert_jobs(db, [(first[0].id, None)], worker_id="worker-1") == {
+        "done": 0,
+        "retried": 0,
+        "dead": 0,
+        "lost": 1,
+    }
+    finish_alert_jobs(db, [(first[0].id, None)], worker_id="worker-3")
+    finish_alert_jobs(db, [(second[0].id, None)], worker_id="worker-2")
+
+    assert alert_queue_counts(db) == {"pending": 0, "leased": 0, "done": 2, "dead": 0}
+    assert enqueue_alert_checks(db, now=now + timedelta(minutes=5)) == 2
+
+    db.close()
+    engine.dispose()
+
+
+def test_alert_queue_retries_failed_checks_with_backoff_then_dead_letters(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    saved_search = SavedSearch(user_id="user-a", query="desk", sources="ebay", alerts_enabled=True)
+    db.add(saved_search)
+    db.commit()
+
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_QUEUE_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_QUEUE_RETRY_BASE_SECONDS", 30)
+
+    now = datetime.now(timezone.utc)
+    enqueue_alert_checks(db, now=now)
+    job = lease_alert_jobs(db, worker_id="worker-1", limit=1, now=now)[0]
+    assert finish_alert_jobs(db, [(job.id, _failed_outcome())], worker_id="worker-1", now=now)["retried"] == 1
+
+    # The retry is not due until the backoff has passed.
+    assert lease_alert_jobs(db, worker_id="worker-1", limit=1, now=now + timedelta(seconds=29)) == []
+    retry = lease_alert_jobs(db, worker_id="worker-1", limit=1, now=now + timedelta(seconds=30))
+    assert [leased.id for leased in retry] == [job.id]
+    assert finish_alert_jobs(db, [(job.id, _failed_outcome())], worker_id="worker-1", now=now)["dead"] == 1
+
+    row = db.query(SavedSearchAlertJob).filter(SavedSearchAlertJob.id == job.id).one()
+    assert row.status == "dead"
+    assert row.attempts == 2
+    assert row.last_error_code == "SOURCE_ERRORS"
+    assert lease_alert_jobs(db, worker_id="worker-1", limit=1, now=now + timedelta(days=1)) == []
+
+    db.close()
+    engine.dispose()
+
+
+def test_run_alert_queue_worker_drains_due_checks(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    for index in range(5):
+        db.add(SavedSearch(user_id=f"user-{index}", query=f"desk {index}", sources="ebay", alerts_enabled=True))
+    db.commit()
+    enqueue_alert_checks(db)
+
+    checked: list[int] = []
+
+    async def fake_execute_saved_search_alert_check(check_db, *, saved_search_id, limit_per_search):
+        checked.append(saved_search_id)
+        await asyncio.sleep(0)
+        if saved_search_id == 1:
+            return _failed_outcome()
+        return SavedSearchAlertCheckOutcome(successful_check=True, notification_created=True)
+
+    monkeypatch.setattr(alerts_module, "execute_saved_search_alert_check", fake_execute_saved_search_alert_check)
+
+    result = asyncio.run(
+        run_alert_queue_worker(
+            session_factory,
+            worker_id="worker-1",
+            limit_per_search=5,
+            batch_size=2,
+            concurrency=2,
+            drain=True,
+        )
+    )
+
+    assert sorted(checked) == [1, 2, 3, 4, 5]
+    assert result["batches"] == 3
+    assert result["leased"] == 5
+    assert result["done"] == 4
+    assert result["retried"] == 1
+    assert alert_queue_counts(db) == {"pending": 1, "leased": 0, "done": 4, "dead": 0}
+
+    db.close()
+    engine.dispose()
@@ -10,12 +10,17 @@ from app.models.saved_search import SavedSearch
 from app.models.saved_search_notification import SavedSearchNotification
 from app.models.user_facebook_credential import UserFacebookCredential
 from app.models.user_location_preference import UserLocationPreference
+from app.services import alerts as alerts_module
 from app.services.alerts import (
     ALERT_BASELINE_VERSION,
+    SavedSearchAlertCheckOutcome,
     execute_saved_search_alert_check,
+    next_alert_check_interval,
+    record_saved_search_alert_failure,
     refresh_saved_search_alerts_for_user,
     run_saved_search_alert_check,
     run_saved_search_alert_job,
+    select_alert_saved_searches,
     serialize_notification,
 )
 from app.services.facebook_verification import FacebookCredentialVerificationOutcome
@@ -168,6 +173,9 @@ def test_run_saved_search_alert_job_creates_digest_for_new_high_confidence_listi
     assert saved_search.last_alert_result_count == 2
     assert saved_search.last_alert_notified_at is not None
     assert saved_search.last_alert_checked_at is not None
+    # One unseen listing halves the default eight hour cadence.
+    assert saved_search.alert_check_interval_seconds == 14400
+    assert _as_utc(saved_search.next_alert_check_at) == _as_utc(saved_search.last_alert_checked_at) + timedelta(hours=4)
 
     db.close()
     engine.dispose()
@@ -890,7 +898,10 @@ def test_refresh_saved_search_alerts_for_user_runs_only_when_stale(monkeypatch):
 
     calls: list[tuple[int, str | None]] = []
 
-    async def fake_run_saved_search_alert_job(db, *, limit_per_search, user_id=None, saved_search_id=None):
+    async def fake_run_saved_search_alert_job(
+        db, *, limit_per_search, user_id=None, saved_search_id=None, due_only=False
+    ):
+        assert due_only is True
         calls.append((limit_per_search, user_id))
         saved_search.last_alert_checked_at = datetime.now(timezone.utc)
         db.commit()
@@ -930,7 +941,10 @@ def test_refresh_saved_search_alerts_for_user_bypasses_refresh_window_for_pendin
 
     calls: list[tuple[int, str | None]] = []
 
-    async def fake_run_saved_search_alert_job(db, *, limit_per_search, user_id=None, saved_search_id=None):
+    async def fake_run_saved_search_alert_job(
+        db, *, limit_per_search, user_id=None, saved_search_id=None, due_only=False
+    ):
+        assert due_only is True
         calls.append((limit_per_search, user_id))
         saved_search.last_alert_checked_at = datetime.now(timezone.utc)
         db.commit()
@@ -1464,3 +1478,231 @@ def test_execute_saved_search_alert_check_preserves_last_successful_check_on_fai
 
     db.close()
     engine.dispose()
+
+
+def test_run_saved_search_alert_job_runs_checks_concurrently_within_source_budgets(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    for index in range(3):
+        db.add(SavedSearch(user_id=f"fb-user-{index}", query=f"desk {index}", sources="facebook,kijiji", alerts_enabled=True))
+        db.add(SavedSearch(user_id=f"ebay-user-{index}", query=f"chair {index}", sources="ebay", alerts_enabled=True))
+    db.commit()
+
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_JOB_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_FACEBOOK_CONCURRENCY", 1)
+
+    in_flight = {"all": 0, "facebook": 0}
+    peaks = {"all": 0, "facebook": 0}
+    check_sessions: list[object] = []
+
+    async def fake_execute_saved_search_alert_check(check_db, *, saved_search_id, limit_per_search):
+        saved_search = check_db.query(SavedSearch).filter(SavedSearch.id == saved_search_id).one()
+        uses_facebook = "facebook" in saved_search.sources
+        check_sessions.append(check_db)
+        in_flight["all"] += 1
+        in_flight["facebook"] += int(uses_facebook)
+        peaks["all"] = max(peaks["all"], in_flight["all"])
+        peaks["facebook"] = max(peaks["facebook"], in_flight["facebook"])
+        await asyncio.sleep(0.01)
+        in_flight["all"] -= 1
+        in_flight["facebook"] -= int(uses_facebook)
+        if saved_search.query == "desk 0":
+            return SavedSearchAlertCheckOutcome(
+                successful_check=False,
+                error_code="SOURCE_ERRORS",
+                error_message="Facebook unavailable.",
+            )
+        return SavedSearchAlertCheckOutcome(
+            successful_check=True,
+            notification_created=saved_search.query.startswith("chair"),
+        )
+
+    monkeypatch.setattr(alerts_module, "execute_saved_search_alert_check", fake_execute_saved_search_alert_check)
+
+    result = asyncio.run(
+        run_saved_search_alert_job(db, limit_per_search=5, session_factory=session_factory)
+    )
+
+    assert result["checked"] == 6
+    assert result["failed"] == 1
+    assert result["notifications_created"] == 3
+    assert result["concurrency"] == 3
+    assert peaks["facebook"] == 1
+    assert 1 < peaks["all"] <= 3
+    assert len({id(check_db) for check_db in check_sessions}) == 6
+    assert all(check_db is not db for check_db in check_sessions)
+
+    db.close()
+    engine.dispose()
+
+
+def test_run_saved_search_alert_job_shares_one_fetch_per_query_group(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    shared_searches = [
+        SavedSearch(user_id="user-a", query="Road Bike", sources="ebay", alerts_enabled=True),
+        SavedSearch(user_id="user-b", query="road  bike", sources="ebay", alerts_enabled=True),
+    ]
+    solo_search = SavedSearch(user_id="user-c", query="gravel bike", sources="ebay", alerts_enabled=True)
+    db.add_all([*shared_searches, solo_search])
+    db.commit()
+    for saved_search in [*shared_searches, solo_search]:
+        db.refresh(saved_search)
+        saved_search.last_alert_checked_at = datetime.now(timezone.utc) - timedelta(days=1)
+        _mark_verified_baseline(saved_search, result_count=1)
+    db.commit()
+
+    seen_listing = _build_listing(
+        source_listing_id="old-1",
+        title="Road bike old listing",
+        price_amount=500,
+        snippet="Old result",
+    )
+    new_listing = _build_listing(
+        source_listing_id="new-1",
+        title="Road bike fresh listing",
+        price_amount=430,
+        snippet="Clean frame and detailed listing.",
+    )
+    archived_listing = _build_listing(
+        source_listing_id="archived-1",
+        title="Bike archived listing",
+        price_amount=300,
+        snippet="Archived result",
+    )
+    # Every search has a baseline, but only user-a has seen the old listing, so the shared
+    # results diff differently per saved search.
+    for saved_search, baseline_listing in [
+        (shared_searches[0], seen_listing),
+        (shared_searches[1], archived_listing),
+        (solo_search, archived_listing),
+    ]:
+        db.add(
+            ListingSnapshot(
+                user_id=saved_search.user_id,
+                saved_search_id=saved_search.id,
+                source=baseline_listing.source,
+                source_listing_id=baseline_listing.source_listing_id,
+                listing_fingerprint=listing_fingerprint(baseline_listing),
+                query=saved_search.query,
+                title=baseline_listing.title,
+                price_amount=baseline_listing.price.amount if baseline_listing.price else None,
+                price_currency="CAD",
+                location=baseline_listing.location,
+                condition=None,
+                snippet=baseline_listing.snippet,
+                image_count=1,
+                url=baseline_listing.url,
+                valuation_key="road|bike",
+                observed_at=datetime.now(timezone.utc) - timedelta(days=2),
+            )
+        )
+    db.commit()
+
+    searched_queries: list[str] = []
+
+    async def fake_unified_search(**kwargs):
+        searched_queries.append(kwargs["query"])
+        await asyncio.sleep(0.01)
+        return [seen_listing, new_listing], None, None, {}
+
+    persisted: list[tuple[int, list[str]]] = []
+
+    def fake_persist_listing_snapshots(**kwargs):
+        persisted.append(
+            (kwargs["saved_search_id"], [item.source_listing_id for item in kwargs["listings"]])
+        )
+        return len(kwargs["listings"])
+
+    monkeypatch.setattr("app.services.alerts.unified_search", fake_unified_search)
+    monkeypatch.setattr("app.services.alerts.enrich_listings_with_insights", lambda db, query, results: results)
+    monkeypatch.setattr("app.services.alerts.persist_listing_snapshots", fake_persist_listing_snapshots)
+
+    result = asyncio.run(
+        run_saved_search_alert_job(db, limit_per_search=20, concurrency=3, session_factory=session_factory)
+    )
+
+    assert len(searched_queries) == 2
+    assert "gravel bike" in searched_queries
+    assert result["checked"] == 3
+    assert result["shared_fetches"] == 1
+    assert result["notifications_created"] == 3
+
+    notifications = {
+        row.saved_search_id: [item["source_listing_id"] for item in row.items_json]
+        for row in db.query(SavedSearchNotification).all()
+    }
+    assert notifications[shared_searches[0].id] == ["new-1"]
+    assert sorted(notifications[shared_searches[1].id]) == ["new-1", "old-1"]
+    assert {saved_search_id for saved_search_id, _ in persisted} == {
+        shared_searches[0].id,
+        shared_searches[1].id,
+        solo_search.id,
+    }
+
+    db.close()
+    engine.dispose()
+
+
+def test_select_alert_saved_searches_due_only_keeps_per_user_cap(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    monkeypatch.setattr(settings, "MARKETLY_SAVED_SEARCH_MAX_PER_USER", 2)
+
+    now = datetime.now(timezone.utc)
+    base_time = now - timedelta(days=10)
+    rows = {
+        # The oldest search is due but beyond user-a's cap of two, so it stays inactive.
+        "a-oldest": SavedSearch(user_id="user-a", query="desk", sources="ebay", next_alert_check_at=now - timedelta(hours=1)),
+        "a-quiet": SavedSearch(user_id="user-a", query="chair", sources="ebay", next_alert_check_at=now + timedelta(hours=1)),
+        "a-due": SavedSearch(user_id="user-a", query="lamp", sources="ebay", next_alert_check_at=now - timedelta(minutes=5)),
+        "b-new": SavedSearch(user_id="user-b", query="sofa", sources="kijiji", next_alert_check_at=None),
+        "b-muted": SavedSearch(user_id="user-b", query="rug", sources="kijiji", alerts_enabled=False),
+    }
+    for offset, row in enumerate(rows.values()):
+        row.created_at = base_time + timedelta(hours=offset)
+        if row.alerts_enabled is None:
+            row.alerts_enabled = True
+        db.add(row)
+    db.commit()
+
+    due_ids = {row.id for row in select_alert_saved_searches(db, due_only=True, now=now)}
+    all_ids = {row.id for row in select_alert_saved_searches(db, now=now)}
+
+    assert due_ids == {rows["a-due"].id, rows["b-new"].id}
+    assert all_ids == {rows["a-quiet"].id, rows["a-due"].id, rows["b-new"].id}
+    assert [row.id for row in select_alert_saved_searches(db, saved_search_id=rows["a-oldest"].id, due_only=True)] == [
+        rows["a-oldest"].id
+    ]
+
+    db.close()
+    engine.dispose()
+
+
+def test_alert_check_cadence_speeds_up_for_new_listings_and_backs_off_when_quiet(monkeypatch):
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_STALE_AFTER_SECONDS", 28800)
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_MIN_CHECK_INTERVAL_SECONDS", 1800)
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_MAX_CHECK_INTERVAL_SECONDS", 86400)
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_ADAPTIVE_CADENCE_ENABLED", True)
+
+    fresh = SimpleNamespace(alert_check_interval_seconds=None)
+    assert next_alert_check_interval(fresh, new_listing_count=3) == 14400
+    assert next_alert_check_interval(fresh, new_listing_count=0) == 57600
+    assert next_alert_check_interval(fresh, new_listing_count=None) == 28800
+    assert next_alert_check_interval(SimpleNamespace(alert_check_interval_seconds=2000), new_listing_count=1) == 1800
+    assert next_alert_check_interval(SimpleNamespace(alert_check_interval_seconds=57600), new_listing_count=0) == 86400
+
+    monkeypatch.setattr(settings, "MARKETLY_ALERTS_ADAPTIVE_CADENCE_ENABLED", False)
+    assert next_alert_check_interval(SimpleNamespace(alert_check_interval_seconds=1800), new_listing_count=5) == 28800
+
+    failed = SavedSearch(user_id="user-a", query="desk", sources="ebay")
+    attempted_at = datetime(2026, 5, 20, 12, 0, tzinfo=timezone.utc)
+    record_saved_search_alert_failure(
+        failed,
+        attempted_at=attempted_at,
+        error_code="SOURCE_ERRORS",
+        error_message="eBay unavailable.",
+    )
+    assert failed.next_alert_check_at == attempted_at + timedelta(seconds=1800)
@@ -339,3 +339,131 @@ def test_facebook_unified_connector_extracts_vehicle_mileage_from_candidate_scop
 
     assert listing.vehicle_mileage_km == 186000.0
     assert listing.snippet == "186,000 km"
+
+
+def _kijiji_results_page(page: int, count: int) -> str:
+    cards = "".join(
+        f'<li><div><div><a href="/v-road-bike/toronto/road-bike-{page}-{index}/{page * 1000 + index}">'
+        f"Road bike {page}-{index}</a><p>$100 Toronto, ON</p></div></div></li>"
+        for index in range(count)
+    )
+    return f"<html><body><ul>{cards}</ul></body></html>"
+
+
+class _FakeKijijiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+def test_kijiji_search_fetches_later_pages_concurrently_and_stops_on_empty_page(monkeypatch):
+    import asyncio
+
+    from app.connectors import kijiji_scrape
+
+    requested_pages: list[int] = []
+    cancelled_pages: list[int] = []
+    in_flight = 0
+    peak_in_flight = 0
+
+    class FakeClient:
+        async def get(self, url, **kwargs):
+            nonlocal in_flight, peak_in_flight
+            page = int(url.split("/page-")[1].split("/")[0]) if "/page-" in url else 1
+            requested_pages.append(page)
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            try:
+                # Later pages finish first so ordering has to come from the page number.
+                await asyncio.sleep(0.01 if page == 2 else 0.02 if page == 3 else 0.05)
+            except asyncio.CancelledError:
+                cancelled_pages.append(page)
+                raise
+            finally:
+                in_flight -= 1
+            return _FakeKijijiResponse(_kijiji_results_page(page, 0 if page == 3 else 2))
+
+    monkeypatch.setattr(kijiji_scrape, "get_http_client", lambda name: FakeClient())
+    monkeypatch.setattr(kijiji_scrape.settings, "MARKETLY_KIJIJI_PAGE_FETCH_CONCURRENCY", 3)
+
+    results = asyncio.run(KijijiScrapeConnector().search("road bike", limit=120, sort="newest"))
+
+    assert [listing.source_listing_id for listing in results] == ["1000", "1001", "2000", "2001"]
+    assert requested_pages[0] == 1
+    assert peak_in_flight == 3
+    assert sorted(requested_pages) == [1, 2, 3, 4, 5]
+    assert sorted(cancelled_pages) == [4, 5]
+
+
+def test_kijiji_selectolax_parser_matches_beautifulsoup_on_saved_pages():
+    from pathlib import Path
+
+    from app.connectors.kijiji_scrape import extract_kijiji_candidates
+
+    pages = sorted((Path(__file__).parent / "fixtures" / "kijiji").glob("*.html"))
+    assert pages
+
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        reference = extract_kijiji_candidates(html, query="road bike", parser="bs4")
+        fast = extract_kijiji_candidates(html, query="road bike", parser="selectolax")
+
+        assert len(reference) == 40
+        assert fast == reference
+
+    # Already-seen listings are skipped by both backends.
+    seen = {candidate[1] for candidate in reference[:10]}
+    remaining = extract_kijiji_candidates(html, query="road bike", seen_urls=seen, parser="selectolax")
+    assert remaining == reference[10:]
+
+
+def test_kijiji_parse_runs_in_process_pool(monkeypatch):
+    import asyncio
+    from pathlib import Path
+
+    from app.connectors import kijiji_scrape
+
+    html = (Path(__file__).parent / "fixtures" / "kijiji" / "search_results_page_1.html").read_text(
+        encoding="utf-8"
+    )
+    monkeypatch.setattr(kijiji_scrape.settings, "MARKETLY_KIJIJI_PARSE_EXECUTOR", "process")
+    monkeypatch.setattr(kijiji_scrape.settings, "MARKETLY_KIJIJI_PARSE_PROCESS_WORKERS", 1)
+    monkeypatch.setattr(kijiji_scrape.settings, "MARKETLY_KIJIJI_HTML_PARSER", "selectolax")
+    try:
+        candidates = asyncio.run(kijiji_scrape.parse_kijiji_candidates(html, query="road bike"))
+    finally:
+        kijiji_scrape.shutdown_kijiji_parse_pool()
+
+    assert candidates == kijiji_scrape.extract_kijiji_candidates(html, query="road bike")
+
+
+def test_kijiji_search_page_resumes_from_page_cursor(monkeypatch):
+    import asyncio
+
+    from app.connectors import kijiji_scrape
+
+    requested_pages: list[int] = []
+
+    async def fake_fetch_page_html(self, query, page, *, sort):
+        requested_pages.append(page)
+        return _kijiji_results_page(page, 0 if page > 3 else 30)
+
+    monkeypatch.setattr(KijijiScrapeConnector, "_fetch_page_html", fake_fetch_page_html)
+    connector = KijijiScrapeConnector()
+
+    listings, cursor = asyncio.run(connector.search_page("road bike", limit=24, sort="newest", cursor=2))
+    assert requested_pages == [2]
+    assert cursor == 3
+    assert len(listings) == 30
+    assert listings[0].source_listing_id == "2000"
+
+    listings, cursor = asyncio.run(connector.search_page("road bike", limit=24, sort="newest", cursor=cursor))
+    assert requested_pages == [2, 3]
+    assert [listing.source_listing_id for listing in listings][:2] == ["3000", "3001"]
+
+    listings, cursor = asyncio.run(connector.search_page("road bike", limit=24, sort="newest", cursor=4))
+    assert listings == []
+    assert cursor is None
+    assert kijiji_scrape.KijijiScrapeConnector().resume_cursor(24, 24) == 1
@@ -462,3 +462,140 @@ def test_load_search_results_page_keeps_domcontentloaded_for_non_automotive_quer
 
     assert page.goto_calls[0][1]["wait_until"] == "domcontentloaded"
     assert page.selector_calls == []
+
+
+class _PooledSearchPage:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _PooledContext:
+    def __init__(self) -> None:
+        self.cookie_loads = 0
+        self.pages: list[_PooledSearchPage] = []
+        self.closed = False
+
+    def set_default_timeout(self, timeout: int) -> None:
+        self.default_timeout = timeout
+
+    async def add_cookies(self, cookies) -> None:
+        self.cookie_loads += 1
+
+    async def new_page(self) -> _PooledSearchPage:
+        page = _PooledSearchPage()
+        self.pages.append(page)
+        return page
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _PooledBrowser:
+    def __init__(self) -> None:
+        self.contexts: list[_PooledContext] = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    async def new_context(self, **kwargs) -> _PooledContext:
+        context = _PooledContext()
+        self.contexts.append(context)
+        return context
+
+
+def _pooled_connector(monkeypatch, browser: _PooledBrowser, *, max_uses: int = 20) -> FacebookMarketplaceConnector:
+    monkeypatch.setattr(connector_module.settings, "MARKETLY_FACEBOOK_CONTEXT_POOL_MAX_CONTEXTS", 2)
+    monkeypatch.setattr(connector_module.settings, "MARKETLY_FACEBOOK_CONTEXT_POOL_MAX_USES", max_uses)
+    connector = FacebookMarketplaceConnector(retries=1)
+
+    async def fake_get_browser():
+        return browser
+
+    async def fake_load_page(**kwargs):
+        return None
+
+    async def fake_scroll(**kwargs):
+        return [{"href": "/marketplace/item/1/"}]
+
+    async def fake_enrich(**kwargs):
+        return None
+
+    monkeypatch.setattr(connector, "_get_browser", fake_get_browser)
+    monkeypatch.setattr(connector, "_load_search_results_page", fake_load_page)
+    monkeypatch.setattr(connector, "_scroll_and_extract", fake_scroll)
+    monkeypatch.setattr(connector, "_normalize_cards", lambda raw_cards, limit: [_sample_record()])
+    monkeypatch.setattr(connector, "_enrich_vehicle_records_from_detail_pages", fake_enrich)
+    monkeypatch.setattr(
+        connector_module,
+        "sanitize_cookie_payload",
+        lambda payload: ([{"name": "c_user", "value": "1", "domain": ".facebook.com", "path": "/"}], ["c_user"]),
+    )
+    return connector
+
+
+def _cookie_request(fingerprint: str | None) -> connector_module.FacebookSearchRequest:
+    return connector_module.FacebookSearchRequest(
+        query="road bike",
+        limit=5,
+        auth_mode="cookie",
+        cookie_payload=[{"name": "c_user"}],
+        credential_fingerprint_sha256=fingerprint,
+    )
+
+
+def test_search_reuses_warm_context_for_same_credential_fingerprint(monkeypatch):
+    browser = _PooledBrowser()
+    connector = _pooled_connector(monkeypatch, browser)
+
+    async def run():
+        await connector._search_once(_cookie_request("fp-a"))
+        await connector._search_once(_cookie_request("fp-a"))
+        await connector._search_once(_cookie_request("fp-b"))
+
+    asyncio.run(run())
+
+    assert len(browser.contexts) == 2
+    assert browser.contexts[0].cookie_loads == 1
+    assert len(browser.contexts[0].pages) == 2
+    assert all(page.closed for page in browser.contexts[0].pages)
+    assert not any(context.closed for context in browser.contexts)
+
+
+def test_search_recycles_pooled_context_after_max_uses_and_failures(monkeypatch):
+    browser = _PooledBrowser()
+    connector = _pooled_connector(monkeypatch, browser, max_uses=2)
+
+    async def run():
+        await connector._search_once(_cookie_request("fp-a"))
+        await connector._search_once(_cookie_request("fp-a"))
+        monkeypatch.setattr(connector, "_normalize_cards", lambda raw_cards, limit: [])
+
+        async def not_blocked(page, *, extracted_cards=0):
+            return None
+
+        monkeypatch.setattr(connector, "_raise_if_blocked", not_blocked)
+        try:
+            await connector._search_once(_cookie_request("fp-a"))
+        except FacebookConnectorError:
+            pass
+
+    asyncio.run(run())
+
+    assert len(browser.contexts) == 2
+    assert browser.contexts[0].closed is True
+    assert browser.contexts[1].closed is True
+    assert connector._context_pool.idle_count() == 0
+
+
+def test_search_without_fingerprint_uses_throwaway_context(monkeypatch):
+    browser = _PooledBrowser()
+    connector = _pooled_connector(monkeypatch, browser)
+
+    asyncio.run(connector._search_once(_cookie_request(None)))
+
+    assert len(browser.contexts) == 1
+    assert browser.contexts[0].closed is True
+    assert browser.contexts[0].cookie_loads == 1
@@ -31,16 +31,8 @@ def test_request_gemini_structured_json_uses_generate_content_payload(monkeypatc
             }
 
     class DummyClient:
-        def __init__(self, *args, **kwargs):
-            captured["timeout"] = kwargs.get("timeout")
-
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            return False
-
-        async def post(self, url, *, headers=None, json=None):
+        async def post(self, url, *, headers=None, json=None, timeout=None):
+            captured["timeout"] = timeout
             captured["url"] = url
             captured["headers"] = headers
             captured["json"] = json
@@ -50,7 +42,7 @@ def test_request_gemini_structured_json_uses_generate_content_payload(monkeypatc
     monkeypatch.setattr(settings, "GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
     monkeypatch.setattr(settings, "MARKETLY_GEMINI_MODEL", "gemini-2.5-flash-lite")
     monkeypatch.setattr(settings, "MARKETLY_GEMINI_TIMEOUT_SECONDS", 13.0)
-    monkeypatch.setattr("app.services.gemini_client.httpx.AsyncClient", DummyClient)
+    monkeypatch.setattr("app.services.gemini_client.get_http_client", lambda name: DummyClient())
 
     schema = {
         "type": "object",
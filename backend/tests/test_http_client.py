@@ -0,0 +1,33 @@
+import asyncio
+
+from app.core import http_client
+
+
+def test_get_http_client_reuses_client_within_event_loop(monkeypatch):
+    monkeypatch.setattr(http_client, "_clients", {})
+
+    async def run():
+        first = http_client.get_http_client("ebay")
+        second = http_client.get_http_client("ebay")
+        other = http_client.get_http_client("kijiji")
+        await http_client.close_http_clients()
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+
+    assert first is second
+    assert first is not other
+    assert first.is_closed and other.is_closed
+    assert http_client._clients == {}
+
+
+def test_get_http_client_rebuilds_client_for_new_event_loop(monkeypatch):
+    monkeypatch.setattr(http_client, "_clients", {})
+
+    async def get_client():
+        return http_client.get_http_client("gemini")
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+
+    assert first is not second
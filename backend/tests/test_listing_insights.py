@@ -1,9 +1,36 @@
+import random
 from datetime import datetime, timedelta, timezone
 
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
 from app.core.config import settings
+from app.db import Base
 from app.models.listing import Listing, Money
 from app.models.listing_snapshot import ListingSnapshot
-from app.services.listing_insights import enrich_listings_with_insights, valuation_key_for_listing
+from app.models.listing_snapshot_token import ListingSnapshotToken
+from app.models.valuation_rollup import ValuationRollup
+from app.services import listing_insights
+from app.services.listing_insights import (
+    _compute_valuation_stats,
+    compute_valuation_stats_batch,
+    enrich_listings_with_insights,
+    snapshot_memo_dependencies,
+    valuation_key_for_listing,
+)
+from app.services.listing_snapshots import (
+    backfill_listing_snapshot_features,
+    backfill_listing_snapshot_tokens,
+    persist_listing_snapshots,
+)
+from app.services.valuation_memo import dependency_versions
+from app.services.valuation_rollups import (
+    SnapshotObservation,
+    rebuild_valuation_rollups,
+    record_valuation_rollups,
+    rollup_bucket_date,
+)
 
 from .utils import build_test_session_factory
 
@@ -443,3 +470,583 @@ def test_enrich_listings_with_insights_keeps_pending_when_no_signal_exists():
 
     db.close()
     engine.dispose()
+
+
+def test_persist_listing_snapshots_maintains_rollups_used_by_exact_valuation():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "trek road bike"
+    history = [
+        _listing(
+            source_listing_id=f"hist-{index}",
+            title="Trek Domane road bike",
+            price_amount=price,
+            query=query,
+            condition="used" if index % 2 else "like new",
+        )
+        for index, price in enumerate([760, 780, 800, 820, 790, 810], start=1)
+    ]
+    assert persist_listing_snapshots(query=query, listings=history[:4], db=db) == 4
+    assert persist_listing_snapshots(query=query, listings=history[4:], db=db) == 2
+    db.commit()
+
+    rollups = db.query(ValuationRollup).all()
+    assert len(rollups) == 1
+    assert rollups[0].valuation_key == valuation_key_for_listing(query, history[0])
+    assert rollups[0].sample_count == 6
+    assert rollups[0].recent_prices_json == [760.0, 780.0, 800.0, 820.0, 790.0, 810.0]
+    assert sum(rollups[0].condition_counts_json.values()) == 6
+
+    # Exact valuation reads the rollup, not the raw snapshot rows.
+    db.query(ListingSnapshot).delete()
+    db.commit()
+
+    listing = _listing(
+        source_listing_id="listing-1",
+        title="Trek Domane road bike",
+        price_amount=520,
+        query=query,
+        condition="used",
+    )
+    enrich_listings_with_insights(db, query, [listing])
+
+    assert listing.valuation is not None
+    assert listing.valuation.estimate_source == "historical_exact"
+    assert listing.valuation.sample_count == 6
+    assert listing.valuation.verdict == "underpriced"
+
+    db.close()
+    engine.dispose()
+
+
+def test_exact_valuation_reads_raw_history_older_than_the_first_rollup():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "trek road bike"
+    listing = _listing(
+        source_listing_id="listing-1",
+        title="Trek Domane road bike",
+        price_amount=520,
+        query=query,
+        condition="used",
+    )
+    valuation_key = valuation_key_for_listing(query, listing)
+    now = datetime.now(timezone.utc)
+    # Written before the rollups existed and never backfilled.
+    db.add_all(
+        [
+            _snapshot(
+                query=query,
+                source_listing_id=f"legacy-{index}",
+                title="Trek Domane road bike",
+                price_amount=price,
+                valuation_key=valuation_key,
+                observed_at=now - timedelta(days=3 + index),
+            )
+            for index, price in enumerate([760, 780, 800, 820])
+        ]
+    )
+    db.commit()
+
+    new_history = [
+        _listing(
+            source_listing_id=f"hist-{index}",
+            title="Trek Domane road bike",
+            price_amount=price,
+            query=query,
+            condition="used",
+        )
+        for index, price in enumerate([790, 810])
+    ]
+    assert persist_listing_snapshots(query=query, listings=new_history, db=db) == 2
+    db.commit()
+    assert db.query(ValuationRollup).count() == 1
+
+    enrich_listings_with_insights(db, query, [listing])
+
+    assert listing.valuation is not None
+    assert listing.valuation.estimate_source == "historical_exact"
+    assert listing.valuation.sample_count == 6
+
+    db.close()
+    engine.dispose()
+
+
+def test_rebuild_valuation_rollups_backfills_day_buckets_within_lookback(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "trek road bike"
+    listing = _listing(
+        source_listing_id="listing-backfill",
+        title="Trek Domane road bike",
+        price_amount=520,
+        query=query,
+    )
+    valuation_key = valuation_key_for_listing(query, listing)
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        [
+            _snapshot(
+                query=query,
+                source_listing_id=f"hist-{index}",
+                title="Trek Domane road bike",
+                price_amount=price,
+                valuation_key=valuation_key,
+                observed_at=now - timedelta(days=days_ago),
+            )
+            for index, (price, days_ago) in enumerate(
+                [(760, 2), (780, 2), (800, 5), (820, 5), (790, 8), (810, 60)],
+                start=1,
+            )
+        ]
+    )
+    db.commit()
+
+    assert rebuild_valuation_rollups(db, batch_size=4) == 6
+    db.commit()
+    assert db.query(ValuationRollup).count() == 4
+
+    # Rebuilding a trailing window replaces only those buckets.
+    assert rebuild_valuation_rollups(db, since=now - timedelta(days=10)) == 5
+    db.commit()
+    assert db.query(ValuationRollup).count() == 4
+
+    monkeypatch.setattr(settings, "MARKETLY_VALUATION_LOOKBACK_DAYS", 30)
+    enrich_listings_with_insights(db, query, [listing])
+
+    assert listing.valuation is not None
+    assert listing.valuation.estimate_source == "historical_exact"
+    assert listing.valuation.sample_count == 5
+
+    db.close()
+    engine.dispose()
+
+
+def test_record_valuation_rollups_adds_to_a_bucket_another_writer_inserted_first(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    db = session_factory()
+
+    observed_at = datetime.now(timezone.utc)
+    bucket_date = rollup_bucket_date(observed_at)
+    raced = {"done": False}
+
+    @event.listens_for(db, "do_orm_execute")
+    def _insert_after_lookup(orm_execute_state):
+        if raced["done"] or not orm_execute_state.is_select:
+            return None
+        raced["done"] = True
+        result = orm_execute_state.invoke_statement().freeze()
+        # A second worker inserts the same bucket after the lookup missed it.
+        other = session_factory()
+        other.add(
+            ValuationRollup(
+                valuation_key="trek-domane",
+                bucket_date=bucket_date,
+                sample_count=2,
+                recent_prices_json=[760.0, 780.0],
+                condition_counts_json={"used": 2},
+            )
+        )
+        other.commit()
+        other.close()
+        return result()
+
+    observations = [
+        SnapshotObservation("trek-domane", 800.0, "used", observed_at),
+        SnapshotObservation("trek-domane", 820.0, None, observed_at),
+    ]
+    assert record_valuation_rollups(db, observations) == 1
+    db.commit()
+
+    rollup = db.query(ValuationRollup).one()
+    assert rollup.sample_count == 4
+    assert rollup.recent_prices_json == [760.0, 780.0, 800.0, 820.0]
+    assert rollup.condition_counts_json == {"used": 3, "unknown": 1}
+
+    db.close()
+    engine.dispose()
+
+
+def test_enrich_listings_with_insights_finds_family_history_through_token_index(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "road bike"
+    listing = _listing(
+        source_listing_id="listing-tokens",
+        title="Specialized Allez road bike Shimano Claris",
+        price_amount=705,
+        query=query,
+        snippet="54cm alloy frame.",
+        condition="used",
+    )
+    history = [
+        ("road bike", "hist-1", "Specialized road bike Claris 54cm", 700, "Light alloy frame."),
+        ("bike road", "hist-2", "Allez road bike Shimano 56cm", 715, "Claris groupset and tuned."),
+        ("road bike", "hist-3", "Road bike Claris Specialized frame", 725, "Fast commuter build."),
+    ]
+    for history_query, source_listing_id, title, price_amount, snippet in history:
+        persisted = persist_listing_snapshots(
+            query=history_query,
+            listings=[
+                _listing(
+                    source_listing_id=source_listing_id,
+                    title=title,
+                    price_amount=price_amount,
+                    query=history_query,
+                    snippet=snippet,
+                    condition="used",
+                )
+            ],
+            db=db,
+        )
+        assert persisted == 1
+    db.commit()
+
+    assert {row.token for row in db.query(ListingSnapshotToken).all()} == {"road", "bike"}
+    assert db.query(ListingSnapshotToken).count() == 6
+
+    monkeypatch.setattr(settings, "MARKETLY_VALUATION_TOKEN_INDEX_FALLBACK", False)
+    enrich_listings_with_insights(db, query, [listing])
+
+    assert listing.valuation is not None
+    assert listing.valuation.estimate_source == "historical_relaxed"
+    assert listing.valuation.sample_count == 3
+
+    db.close()
+    engine.dispose()
+
+
+def test_backfill_listing_snapshot_tokens_indexes_legacy_snapshots(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "bicycle"
+    db.add_all(
+        [
+            _snapshot(
+                query=snapshot_query,
+                source_listing_id=f"broad-{index}",
+                title=title,
+                price_amount=price_amount,
+                valuation_key=f"legacy|{index}",
+            )
+            for index, (snapshot_query, title, price_amount) in enumerate(
+                [
+                    ("bicycle", "Bicycle trailer rack", 210),
+                    ("used bicycle", "Bicycle trainer stand", 235),
+                    ("bicycle", "Bicycle wheel set", 260),
+                ],
+                start=1,
+            )
+        ]
+    )
+    db.commit()
+    monkeypatch.setattr(settings, "MARKETLY_VALUATION_TOKEN_INDEX_FALLBACK", False)
+
+    before_backfill = _listing(
+        source_listing_id="listing-before",
+        title="Vintage city commuter bicycle",
+        price_amount=250,
+        query=query,
+    )
+    enrich_listings_with_insights(db, query, [before_backfill])
+    assert before_backfill.valuation is not None
+    assert before_backfill.valuation.estimate_source != "category_prior"
+
+    assert backfill_listing_snapshot_tokens(db, batch_size=2) == 3
+    assert backfill_listing_snapshot_tokens(db) == 0
+    db.commit()
+
+    after_backfill = _listing(
+        source_listing_id="listing-after",
+        title="Vintage city commuter bicycle",
+        price_amount=250,
+        query=query,
+    )
+    enrich_listings_with_insights(db, query, [after_backfill])
+    assert after_backfill.valuation is not None
+    assert after_backfill.valuation.estimate_source == "category_prior"
+    assert after_backfill.valuation.sample_count == 3
+
+    db.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_compute_valuation_stats_batch_matches_per_group_stats(monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(settings, "MARKETLY_VALUATION_VECTORIZED_STATS", vectorized)
+    rng = random.Random(11)
+    price_groups = [[], [0.0, -5.0], [410.0], [100.0, 200.0, None, 300.0], [250.0] * 6]
+    for _ in range(60):
+        center = rng.uniform(20, 3000)
+        spread = rng.choice([0.05, 0.3, 1.5])
+        price_groups.append(
+            [round(rng.gauss(center, center * spread), 2) for _ in range(rng.randint(0, 90))]
+        )
+
+    for min_samples in (1, 3, 5):
+        expected = [_compute_valuation_stats(prices, min_samples=min_samples) for prices in price_groups]
+        assert compute_valuation_stats_batch(price_groups, min_samples=min_samples) == expected
+
+
+def test_family_samples_read_persisted_features_without_reparsing_text(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "iphone 13"
+    history = [
+        _listing(
+            source_listing_id=f"hist-{index}",
+            title=f"iPhone 13 Pro 128GB unlocked {color}",
+            price_amount=price,
+            query=query,
+            snippet="Battery health 90%.",
+            condition="used",
+        )
+        for index, (color, price) in enumerate(
+            [("blue", 640), ("graphite", 655), ("gold", 670), ("silver", 660)],
+            start=1,
+        )
+    ]
+    assert persist_listing_snapshots(query=query, listings=history, db=db) == 4
+    db.commit()
+
+    stored = db.query(ListingSnapshot).first()
+    assert stored.features_version == listing_insights.SNAPSHOT_FEATURES_VERSION
+    assert stored.profile_storage == "128gb"
+    assert stored.profile_lock_state == "unlocked"
+    assert stored.profile_variant == "pro"
+    assert stored.normalized_condition == "used"
+
+    def fail_reparse(row):
+        raise AssertionError("snapshot text should not be re-parsed")
+
+    monkeypatch.setattr(listing_insights, "_snapshot_sample_from_row", fail_reparse)
+    listing = _listing(
+        source_listing_id="listing-features",
+        title="iPhone 13 Pro 128GB unlocked green",
+        price_amount=600,
+        query=query,
+        snippet="Includes case.",
+        condition="used",
+    )
+    enrich_listings_with_insights(db, query, [listing])
+
+    assert listing.valuation is not None
+    assert listing.valuation.estimate_source == "historical_relaxed"
+    assert listing.valuation.sample_count == 4
+
+    db.close()
+    engine.dispose()
+
+
+def test_backfill_listing_snapshot_features_matches_text_derived_samples():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    db.add_all(
+        [
+            _snapshot(
+                query="macbook pro",
+                source_listing_id=f"legacy-{index}",
+                title=title,
+                price_amount=price_amount,
+                valuation_key=f"legacy|{index}",
+                snippet=snippet,
+                condition=condition,
+            )
+            for index, (title, price_amount, snippet, condition) in enumerate(
+                [
+                    ("MacBook Pro 2019 512GB", 900, "Space grey, AppleCare.", "like new"),
+                    ("MacBook Pro M1 256 GB", 1100, None, "refurbished"),
+                    ("Macbook pro for parts", 150, "Cracked screen.", None),
+                ],
+                start=1,
+            )
+        ]
+    )
+    db.commit()
+
+    legacy_rows = db.query(ListingSnapshot).order_by(ListingSnapshot.id).all()
+    expected = [listing_insights._snapshot_sample_from_row(row) for row in legacy_rows]
+
+    assert backfill_listing_snapshot_features(db, batch_size=2) == 3
+    assert backfill_listing_snapshot_features(db) == 0
+    db.commit()
+
+    refreshed = db.query(ListingSnapshot).order_by(ListingSnapshot.id).all()
+    assert [listing_insights._snapshot_sample_from_features(row) for row in refreshed] == expected
+
+    db.close()
+    engine.dispose()
+
+
+def _brute_force_live_cohort_samples(item, listings, listing_tokens_by_key, comparable_profiles_by_key):
+    current_key = listing_insights.listing_key(item)
+    listing_tokens = listing_tokens_by_key[current_key]
+    comparable_profile = comparable_profiles_by_key[current_key]
+    prices = []
+    hard_match_counts = []
+    for peer in listings:
+        peer_key = listing_insights.listing_key(peer)
+        if peer_key == current_key:
+            continue
+        if peer.price is None or float(peer.price.amount) <= 0:
+            continue
+        if len(listing_tokens & listing_tokens_by_key.get(peer_key, frozenset())) < 2:
+            continue
+        peer_profile = comparable_profiles_by_key.get(peer_key)
+        if peer_profile is None or not listing_insights._profiles_compatible(comparable_profile, peer_profile):
+            continue
+        prices.append(float(peer.price.amount))
+        hard_match_counts.append(listing_insights._hard_attribute_match_count(comparable_profile, peer_profile))
+    return prices, hard_match_counts
+
+
+def test_live_cohort_index_matches_pairwise_comparison():
+    rng = random.Random(5)
+    query = "iphone"
+    words = ["iphone", "13", "14", "pro", "max", "mini", "128gb", "256gb", "unlocked", "rogers", "case", "blue"]
+    conditions = [None, "used", "like new", "for parts", "brand new"]
+    listings = []
+    for index in range(120):
+        title = " ".join(rng.sample(words, rng.randint(1, 6)))
+        listings.append(
+            _listing(
+                # A few repeated ids exercise the duplicate-key handling of the pairwise loop.
+                source_listing_id=f"live-{index % 110}",
+                title=title,
+                price_amount=rng.choice([0, 350, 420, 510, 640, 800, 975]),
+                query=query,
+                snippet=rng.choice([None, "Minor scratches.", "Comes with 2 cases."]),
+                condition=rng.choice(conditions),
+            )
+        )
+
+    listing_tokens_by_key = {
+        listing_insights.listing_key(item): listing_insights._listing_similarity_tokens(item)
+        for item in listings
+    }
+    comparable_profiles_by_key = {
+        listing_insights.listing_key(item): listing_insights.comparable_profile_for_text(
+            query=query,
+            title=item.title,
+            snippet=item.snippet,
+            condition=item.condition,
+        )
+        for item in listings
+    }
+    index = listing_insights._build_live_cohort_index(
+        listings,
+        listing_tokens_by_key=listing_tokens_by_key,
+        comparable_profiles_by_key=comparable_profiles_by_key,
+    )
+
+    matched = 0
+    for position, item in enumerate(listings):
+        key = listing_insights.listing_key(item)
+        samples = listing_insights._live_cohort_samples(
+            index,
+            position,
+            listing_tokens=listing_tokens_by_key[key],
+            comparable_profile=comparable_profiles_by_key[key],
+        )
+        expected_prices, expected_hard_matches = _brute_force_live_cohort_samples(
+            item,
+            listings,
+            listing_tokens_by_key,
+            comparable_profiles_by_key,
+        )
+        assert samples.prices == expected_prices
+        assert samples.hard_match_counts == expected_hard_matches
+        matched += bool(expected_prices)
+    assert matched > 0
+
+
+def test_enrich_listings_with_insights_memoizes_valuations_until_new_history_arrives(monkeypatch):
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "trek road bike"
+    listing = _listing(
+        source_listing_id="listing-1",
+        title="Trek Domane road bike",
+        price_amount=520,
+        query=query,
+        condition="used",
+    )
+    history = [
+        _listing(source_listing_id=f"hist-{index}", title="Trek Domane road bike", price_amount=price, query=query)
+        for index, price in enumerate([760, 780, 800, 820, 790], start=1)
+    ]
+    persist_listing_snapshots(query=query, listings=history, db=db)
+    db.commit()
+
+    history_loads: list[str] = []
+    load_recent_snapshot_samples = listing_insights._load_recent_snapshot_samples
+
+    def _counting_load(*args, **kwargs):
+        history_loads.append(kwargs["query"])
+        return load_recent_snapshot_samples(*args, **kwargs)
+
+    monkeypatch.setattr(listing_insights, "_load_recent_snapshot_samples", _counting_load)
+
+    enrich_listings_with_insights(db, query, [listing])
+    first_valuation = listing.valuation
+    assert first_valuation is not None
+    assert first_valuation.sample_count == 5
+
+    repeat = listing.model_copy(update={"valuation": None, "risk": None})
+    enrich_listings_with_insights(db, query, [repeat])
+    assert history_loads == [query]
+    assert repeat.valuation == first_valuation
+    assert repeat.risk == listing.risk
+
+    # A new observation for the same valuation key invalidates the memoized result.
+    persist_listing_snapshots(
+        query=query,
+        listings=[_listing(source_listing_id="hist-6", title="Trek Domane road bike", price_amount=810, query=query)],
+        db=db,
+    )
+    db.commit()
+    refreshed = listing.model_copy(update={"valuation": None, "risk": None})
+    enrich_listings_with_insights(db, query, [refreshed])
+    assert history_loads == [query, query]
+    assert refreshed.valuation is not None
+    assert refreshed.valuation.sample_count == 6
+
+    db.close()
+    engine.dispose()
+
+
+def test_persisting_snapshots_bumps_memo_versions_only_when_the_caller_commits():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+
+    query = "trek road bike"
+    history = _listing(source_listing_id="hist-1", title="Trek Domane road bike", price_amount=760, query=query)
+    dependencies = snapshot_memo_dependencies(query, valuation_key_for_listing(query, history))
+    before = dependency_versions(dependencies)
+
+    persist_listing_snapshots(query=query, listings=[history], db=db)
+    # Until the commit, other sessions still read the old history, so the version must not move.
+    assert dependency_versions(dependencies) == before
+    db.rollback()
+    db.commit()
+    assert dependency_versions(dependencies) == before
+
+    second = history.model_copy(update={"source_listing_id": "hist-2"})
+    persist_listing_snapshots(query=query, listings=[second], db=db)
+    db.commit()
+    assert all(version > old for version, old in zip(dependency_versions(dependencies), before))
+
+    db.close()
+    engine.dispose()
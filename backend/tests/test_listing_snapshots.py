@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.listing import Listing, Money
+from app.models.listing_snapshot import ListingSnapshot
+from app.models.listing_snapshot_token import ListingSnapshotToken
+from app.models.valuation_rollup import ValuationRollup
+from app.services.listing_snapshots import (
+    copy_csv_payload,
+    has_historical_snapshot_baseline,
+    persist_listing_snapshots,
+    previously_seen_fingerprints,
+)
+
+from .utils import build_test_session_factory
+
+
+def _listing(source_listing_id: str, title: str, price_amount: float | None) -> Listing:
+    return Listing(
+        source="kijiji",
+        source_listing_id=source_listing_id,
+        title=title,
+        price=Money(amount=price_amount, currency="CAD") if price_amount is not None else None,
+        url=f"https://example.com/{source_listing_id}",
+        image_urls=[],
+        location="Ottawa",
+        condition="used",
+        snippet=None,
+        score=5.0,
+    )
+
+
+def test_persist_listing_snapshots_bulk_inserts_without_hydrating_snapshots():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    observed_at = datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+    listings = [_listing(f"item-{index}", f"Standing desk {index}", 100 + index) for index in range(25)]
+    listings.append(_listing("item-free", "Standing desk frame", None))
+    persisted = persist_listing_snapshots(
+        query="standing desk",
+        listings=listings,
+        saved_search_id=7,
+        observed_at=observed_at,
+        db=db,
+    )
+
+    assert persisted == 26
+    assert not any(isinstance(obj, ListingSnapshot) for obj in db.identity_map.values())
+    db.commit()
+
+    rows = db.query(ListingSnapshot).order_by(ListingSnapshot.id).all()
+    assert [row.source_listing_id for row in rows] == [item.source_listing_id for item in listings]
+    assert rows[-1].price_amount is None
+    assert {row.saved_search_id for row in rows} == {7}
+
+    tokens_by_snapshot: dict[int, set[str]] = {}
+    for token_row in db.query(ListingSnapshotToken).all():
+        tokens_by_snapshot.setdefault(token_row.snapshot_id, set()).add(token_row.token)
+    assert tokens_by_snapshot == {row.id: {"standing", "desk"} for row in rows}
+
+    db.close()
+    engine.dispose()
+
+
+def test_persist_listing_snapshots_dedupes_repeat_observations_per_day_and_price():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    first_seen = datetime(2026, 5, 1, 9, 0, tzinfo=timezone.utc)
+
+    listings = [_listing("item-1", "Standing desk", 150), _listing("item-2", "Standing desk frame", 90)]
+    for offset_minutes in (0, 5, 30):
+        persisted = persist_listing_snapshots(
+            query="standing desk",
+            listings=listings,
+            user_id=f"user-{offset_minutes}",
+            observed_at=first_seen + timedelta(minutes=offset_minutes),
+            db=db,
+        )
+        assert persisted == 2
+    # A price change and a new day are new observations.
+    persist_listing_snapshots(
+        query="standing desk",
+        listings=[_listing("item-1", "Standing desk", 140)],
+        observed_at=first_seen + timedelta(hours=1),
+        db=db,
+    )
+    persist_listing_snapshots(
+        query="standing desk",
+        listings=[_listing("item-2", "Standing desk frame", 90)],
+        observed_at=first_seen + timedelta(days=1),
+        db=db,
+    )
+    db.commit()
+
+    rows = db.query(ListingSnapshot).order_by(ListingSnapshot.id).all()
+    assert [(row.source_listing_id, row.price_amount, row.observation_count) for row in rows] == [
+        ("item-1", 150, 3),
+        ("item-2", 90, 3),
+        ("item-1", 140, 1),
+        ("item-2", 90, 1),
+    ]
+    assert rows[0].observed_at.replace(tzinfo=timezone.utc) == first_seen
+    assert rows[0].last_observed_at.replace(tzinfo=timezone.utc) == first_seen + timedelta(minutes=30)
+    assert db.query(ListingSnapshotToken).count() == 4 * 2
+    assert sum(row.sample_count for row in db.query(ValuationRollup).all()) == 4
+
+    db.close()
+    engine.dispose()
+
+
+def test_copy_csv_payload_keeps_nulls_distinct_from_empty_strings():
+    payload = copy_csv_payload(
+        ["title", "snippet", "location", "price_amount", "query_tokens_json", "observed_at"],
+        [
+            {
+                "title": 'Desk "solid oak", 60in',
+                "snippet": None,
+                "location": "",
+                "price_amount": 120.5,
+                "query_tokens_json": ["desk", "oak"],
+                "observed_at": datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc),
+            }
+        ],
+    )
+
+    assert payload == (
+        '"Desk ""solid oak"", 60in",,"","120.5","[""desk"", ""oak""]","2026-05-01T12:30:00+00:00"\n'
+    )
+
+
+def test_seen_before_checks_keep_rows_older_than_retention_on_unpartitioned_tables():
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    observed_at = datetime.now(timezone.utc) - timedelta(days=400)
+
+    persist_listing_snapshots(
+        query="standing desk",
+        listings=[_listing("item-old", "Standing desk", 120)],
+        saved_search_id=7,
+        observed_at=observed_at,
+        db=db,
+    )
+    db.commit()
+
+    # No partitions were dropped, so a listing last seen long ago is still not new.
+    seen_before = datetime.now(timezone.utc)
+    assert previously_seen_fingerprints(
+        db,
+        saved_search_id=7,
+        listing_fingerprints=["kijiji:item-old"],
+        seen_before=seen_before,
+    ) == {"kijiji:item-old"}
+    assert has_historical_snapshot_baseline(db, saved_search_id=7, seen_before=seen_before)
+
+    db.close()
+    engine.dispose()
@@ -1,5 +1,4 @@
-from collections import OrderedDict
-
+from app.core.cache import TTLCache
 from app.services import rate_limit
 
 
@@ -84,7 +83,7 @@ def test_rate_limit_local_fallback_blocks_over_limit_when_redis_missing(monkeypa
     monkeypatch.setattr(rate_limit.settings, "MARKETLY_RATE_LIMIT_LOCAL_FALLBACK_ENABLED", True)
     monkeypatch.setattr(rate_limit.settings, "MARKETLY_RATE_LIMIT_LOCAL_MAX_KEYS", 100)
     monkeypatch.setattr(rate_limit, "get_redis_client", lambda: None)
-    monkeypatch.setattr(rate_limit, "_local_fixed_windows", OrderedDict())
+    monkeypatch.setattr(rate_limit, "_local_fixed_windows", TTLCache(max_items=100))
     monkeypatch.setattr(rate_limit.time, "time", lambda: 1000)
 
     first = rate_limit.check_rate_limit(
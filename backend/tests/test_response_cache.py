@@ -1,3 +1,4 @@
+import json
 from types import SimpleNamespace
 
 from app.core.cache import TTLCache
@@ -15,6 +16,21 @@ class FakeRedis:
         self.values[key] = payload
         return True
 
+    def set(self, key: str, value: str, nx: bool = False, ex: int | None = None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def delete(self, key: str):
+        self.values.pop(key, None)
+
+    def eval(self, script: str, numkeys: int, key: str, token: str):
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
 
 def test_cache_key_varies_by_facebook_context():
     ctx_a = SimpleNamespace(
@@ -169,3 +185,63 @@ def test_response_cache_read_fail_returns_none(monkeypatch):
     monkeypatch.setattr(response_cache, "get_redis_client", lambda: BrokenRedis())
 
     assert response_cache.get_cached_search_response("marketly:test:key") is None
+
+
+def test_response_cache_serves_stale_payload_after_soft_ttl(monkeypatch):
+    fake_redis = FakeRedis()
+    clock = {"now": 1_000.0}
+    monkeypatch.setattr(response_cache.settings, "MARKETLY_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(response_cache.settings, "MARKETLY_RESPONSE_CACHE_TTL_SECONDS", 45)
+    monkeypatch.setattr(response_cache.settings, "MARKETLY_RESPONSE_CACHE_STALE_TTL_SECONDS", 120)
+    monkeypatch.setattr(response_cache, "get_redis_client", lambda: fake_redis)
+    monkeypatch.setattr(response_cache.time, "time", lambda: clock["now"])
+
+    key = "marketly:test:stale"
+    payload = {"query": "iphone", "sources": ["ebay"], "count": 0, "results": [], "source_errors": {}}
+    response_cache.set_cached_search_response(key, payload)
+
+    assert response_cache.get_cached_search_response(key) == payload
+    assert response_cache.get_stale_search_response(key) is None
+
+    clock["now"] += 46
+    assert response_cache.get_cached_search_response(key) is None
+    assert response_cache.get_stale_search_response(key) == payload
+
+
+def test_response_cache_reads_legacy_unwrapped_payload(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(response_cache.settings, "MARKETLY_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(response_cache, "get_redis_client", lambda: fake_redis)
+
+    payload = {"query": "iphone", "sources": ["ebay"], "count": 0, "results": [], "source_errors": {}}
+    fake_redis.values["marketly:test:legacy"] = json.dumps(payload)
+
+    assert response_cache.get_cached_search_response("marketly:test:legacy") == payload
+
+
+def test_search_response_refresh_lock_allows_single_holder(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(response_cache, "get_redis_client", lambda: fake_redis)
+
+    token = response_cache.try_acquire_search_response_refresh("marketly:test:key")
+    assert token is not None
+    assert response_cache.try_acquire_search_response_refresh("marketly:test:key") is None
+
+    response_cache.release_search_response_refresh("marketly:test:key", token)
+    assert response_cache.try_acquire_search_response_refresh("marketly:test:key") is not None
+
+
+def test_search_response_refresh_release_keeps_a_lock_taken_over_after_expiry(monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(response_cache, "get_redis_client", lambda: fake_redis)
+
+    token = response_cache.try_acquire_search_response_refresh("marketly:test:key")
+    assert token is not None
+    lock_key = next(iter(fake_redis.values))
+    # The lock expires and another worker takes it before this worker releases.
+    fake_redis.values[lock_key] = "other-worker"
+
+    response_cache.release_search_response_refresh("marketly:test:key", token)
+
+    assert fake_redis.values[lock_key] == "other-worker"
+    assert response_cache.try_acquire_search_response_refresh("marketly:test:key") is None
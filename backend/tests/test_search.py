@@ -1,3 +1,5 @@
+import asyncio
+import json
 from types import SimpleNamespace
 
 import pytest
@@ -9,6 +11,7 @@ from app.db import get_db
 from app.main import app
 from app.models.listing import Listing, Money, SourceError
 from app.models.saved_search import SavedSearch
+from app.services import search_service
 
 from .utils import build_test_session_factory, db_override_factory
 
@@ -621,6 +624,157 @@ def test_search_local_cache_fallback_miss_then_hit(monkeypatch):
     assert calls["unified_search"] == 1
 
 
+def test_search_serves_stale_cache_and_revalidates_in_background(monkeypatch):
+    calls = {"unified_search": 0}
+    clock = {"now": 1_000.0}
+
+    async def fake_unified_search(query, sources, limit=20, offset=0, sort="relevance", **kwargs):
+        calls["unified_search"] += 1
+        return ([_sample_listing("ebay", str(calls["unified_search"]))], 1, None, {})
+
+    monkeypatch.setattr("app.main.unified_search", fake_unified_search)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_LOCAL_FALLBACK_ENABLED", True)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_TTL_SECONDS", 45)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_STALE_TTL_SECONDS", 120)
+    monkeypatch.setattr("app.services.response_cache.get_redis_client", lambda: None)
+    monkeypatch.setattr("app.services.response_cache._local_response_cache", TTLCache(max_items=8))
+    monkeypatch.setattr("app.services.response_cache._local_refresh_locks", TTLCache(max_items=8))
+    monkeypatch.setattr("app.services.response_cache.time.time", lambda: clock["now"])
+    monkeypatch.setattr("app.main._enrich_results", lambda db, *, query, results: results)
+    monkeypatch.setattr("app.main.persist_listing_snapshots", lambda **kwargs: 1)
+
+    first = client.get("/search", params={"q": "iphone", "sources": "ebay"})
+    clock["now"] += 60
+    stale = client.get("/search", params={"q": "iphone", "sources": "ebay"})
+    refreshed = client.get("/search", params={"q": "iphone", "sources": "ebay"})
+
+    assert first.headers.get("x-cache") == "MISS"
+    assert stale.headers.get("x-cache") == "STALE"
+    assert stale.json()["results"][0]["source_listing_id"] == "1"
+    assert refreshed.headers.get("x-cache") == "HIT"
+    assert refreshed.json()["results"][0]["source_listing_id"] == "2"
+    assert calls["unified_search"] == 2
+
+
+def test_search_revalidation_runs_enrichment_and_snapshot_writes_off_the_event_loop(monkeypatch):
+    import threading
+
+    clock = {"now": 1_000.0}
+    threads: dict[str, list[int]] = {"loop": [], "enrich": [], "persist": []}
+
+    async def fake_unified_search(query, sources, limit=20, offset=0, sort="relevance", **kwargs):
+        threads["loop"].append(threading.get_ident())
+        return ([_sample_listing("ebay", "1")], 1, None, {})
+
+    def fake_enrich(db, *, query, results):
+        threads["enrich"].append(threading.get_ident())
+        return results
+
+    def fake_persist(**kwargs):
+        threads["persist"].append(threading.get_ident())
+        return 1
+
+    monkeypatch.setattr("app.main.unified_search", fake_unified_search)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_LOCAL_FALLBACK_ENABLED", True)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_TTL_SECONDS", 45)
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_STALE_TTL_SECONDS", 120)
+    monkeypatch.setattr("app.services.response_cache.get_redis_client", lambda: None)
+    monkeypatch.setattr("app.services.response_cache._local_response_cache", TTLCache(max_items=8))
+    monkeypatch.setattr("app.services.response_cache._local_refresh_locks", TTLCache(max_items=8))
+    monkeypatch.setattr("app.services.response_cache.time.time", lambda: clock["now"])
+    monkeypatch.setattr("app.main._enrich_results", fake_enrich)
+    monkeypatch.setattr("app.main.persist_listing_snapshots", fake_persist)
+    # The snapshot buffer is full, so revalidation writes the snapshots itself.
+    monkeypatch.setattr("app.main.enqueue_listing_snapshots", lambda **kwargs: False)
+
+    client.get("/search", params={"q": "iphone", "sources": "ebay"})
+    clock["now"] += 60
+    threads["enrich"].clear()
+    threads["persist"].clear()
+    stale = client.get("/search", params={"q": "iphone", "sources": "ebay"})
+
+    assert stale.headers.get("x-cache") == "STALE"
+    revalidation_loop = threads["loop"][-1]
+    assert len(threads["enrich"]) == 1
+    assert threads["enrich"][0] != revalidation_loop
+    # The stale response's own snapshot task and the revalidation write both stay off the loop.
+    assert len(threads["persist"]) == 2
+    assert revalidation_loop not in threads["persist"]
+
+
+def test_search_stream_emits_fastest_source_first_then_merged_page(monkeypatch):
+    class FastEbayConnector:
+        async def search(self, **kwargs):
+            return [_sample_listing("ebay", "1")]
+
+    class SlowKijijiConnector:
+        async def search(self, **kwargs):
+            await asyncio.sleep(0.05)
+            return [_sample_listing("kijiji", "2")]
+
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", FastEbayConnector())
+    monkeypatch.setitem(search_service.CONNECTORS, "kijiji", SlowKijijiConnector())
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr("app.main._enrich_results", lambda db, *, query, results: results)
+    monkeypatch.setattr("app.main.persist_listing_snapshots", lambda **kwargs: 1)
+
+    response = client.get("/search/stream", params={"q": "bike", "sources": "kijiji,ebay"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    frames = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [frame["event"] for frame in frames] == ["source", "source", "complete"]
+    assert [frame["source"] for frame in frames[:2]] == ["ebay", "kijiji"]
+    assert frames[0]["results"][0]["source_listing_id"] == "1"
+    assert frames[2]["count"] == 2
+    assert {item["source"] for item in frames[2]["results"]} == {"ebay", "kijiji"}
+
+
+def test_search_stream_deeper_multi_source_page_matches_search_page(monkeypatch):
+    from app.connectors.base import MarketplaceConnector
+
+    class PricedConnector(MarketplaceConnector):
+        def __init__(self, source: str, base_price: int):
+            self.source_name = source
+            self.pool = []
+            for index in range(10):
+                listing = _sample_listing(source, str(index))
+                listing.price = Money(amount=base_price + index, currency="CAD")
+                self.pool.append(listing)
+
+        async def search(self, query, limit=20, *, sort="relevance", **kwargs):
+            return self.pool[:limit]
+
+    monkeypatch.setattr(search_service.settings, "MARKETLY_MULTI_SOURCE_MAX_EXPANSIONS", 4)
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    monkeypatch.setattr(search_service, "_pagination_cache", TTLCache())
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", PricedConnector("ebay", 100))
+    monkeypatch.setitem(search_service.CONNECTORS, "kijiji", PricedConnector("kijiji", 1))
+    monkeypatch.setattr("app.main.settings.MARKETLY_RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr("app.main._enrich_results", lambda db, *, query, results: results)
+    monkeypatch.setattr("app.main.persist_listing_snapshots", lambda **kwargs: 1)
+
+    params = {"q": "bike", "sources": "ebay,kijiji", "limit": 4, "sort": "price_asc"}
+    first = client.get("/search", params=params)
+    streamed = client.get("/search/stream", params={**params, "offset": 4})
+    second = client.get("/search", params={**params, "offset": 4})
+
+    assert streamed.status_code == 200
+    frames = [json.loads(line) for line in streamed.text.splitlines() if line]
+    assert frames[-1]["event"] == "complete"
+
+    def page_ids(payload):
+        return [(item["source"], item["source_listing_id"]) for item in payload["results"]]
+
+    assert page_ids(frames[-1]) == page_ids(second.json())
+    assert frames[-1]["next_offset"] == second.json()["next_offset"]
+    assert not set(page_ids(first.json())) & set(page_ids(second.json()))
+    assert page_ids(second.json()) == [("ebay", str(index)) for index in range(4)]
+
+
 def test_search_rate_limit_returns_429(monkeypatch):
     monkeypatch.setattr("app.main.settings.MARKETLY_RATE_LIMIT_ENABLED", True)
     monkeypatch.setattr(
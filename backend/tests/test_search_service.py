@@ -1,5 +1,6 @@
 import asyncio
 
+from app.core.cache import TTLCache
 from app.models.listing import Listing, SourceError
 from app.schemas.location import ResolvedLocation
 from app.services import search_service
@@ -35,29 +36,31 @@ def test_unified_search_multi_source_keeps_fetch_window_stable(monkeypatch):
     limit = 24
     monkeypatch.setattr(search_service.settings, "MARKETLY_DISABLE_FACEBOOK_MULTI_SOURCE_EXPANSION", False)
     monkeypatch.setattr(search_service.settings, "MARKETLY_MULTI_SOURCE_MAX_EXPANSIONS", 4)
-    monkeypatch.setattr(search_service, "_pagination_cache", search_service.TTLCache())
+    monkeypatch.setattr(search_service, "_pagination_cache", TTLCache())
     base_pool = [_listing(idx) for idx in range(72)]
-    expanded_pool = (
-        [_listing(100 + idx, source="kijiji") for idx in range(20)]
-        + base_pool
-        + [_listing(200 + idx, source="facebook") for idx in range(20)]
-    )
+    next_slice = [_listing(100 + idx, source="kijiji") for idx in range(20)] + [
+        _listing(200 + idx, source="facebook") for idx in range(20)
+    ]
     fetch_limits: list[int] = []
+    page_cursors: list[dict] = []
 
     async def fake_fetch_and_score(query, sources, fetch_limit, sort, **kwargs):
         fetch_limits.append(fetch_limit)
-        if fetch_limit <= limit:
-            return (
-                base_pool,
-                {},
-                {"ebay": limit, "kijiji": limit, "facebook": limit},
-            )
         return (
-            expanded_pool,
+            base_pool,
+            {},
+            {"ebay": limit, "kijiji": limit, "facebook": limit},
+        )
+
+    async def fake_fetch_and_score_page(query, sources, cursors, limit, sort, **kwargs):
+        page_cursors.append(dict(cursors))
+        return (
+            [_listing(5), *next_slice],
             {},
-            {"ebay": 30, "kijiji": 32, "facebook": 28},
+            {"ebay": None, "kijiji": None, "facebook": None},
         )
 
+    monkeypatch.setattr(search_service, "_fetch_and_score_page", fake_fetch_and_score_page)
     monkeypatch.setattr(search_service, "_fetch_and_score", fake_fetch_and_score)
     monkeypatch.setattr(search_service, "_sort_results", lambda items, sort: items)
 
@@ -98,7 +101,8 @@ def test_unified_search_multi_source_keeps_fetch_window_stable(monkeypatch):
         )
     )
 
-    assert fetch_limits == [limit, 48]
+    assert fetch_limits == [limit]
+    assert page_cursors == [{"ebay": limit, "kijiji": 1, "facebook": limit}]
     assert [item.source_listing_id for item in page1] == [str(idx) for idx in range(24)]
     assert [item.source_listing_id for item in page2] == [str(idx) for idx in range(24, 48)]
     assert [item.source_listing_id for item in page3] == [str(idx) for idx in range(48, 72)]
@@ -121,7 +125,7 @@ def test_unified_search_multi_source_skips_expansion_when_facebook_guard_enabled
     limit = 24
     monkeypatch.setattr(search_service.settings, "MARKETLY_DISABLE_FACEBOOK_MULTI_SOURCE_EXPANSION", True)
     monkeypatch.setattr(search_service.settings, "MARKETLY_MULTI_SOURCE_MAX_EXPANSIONS", 4)
-    monkeypatch.setattr(search_service, "_pagination_cache", search_service.TTLCache())
+    monkeypatch.setattr(search_service, "_pagination_cache", TTLCache())
     base_pool = [_listing(idx) for idx in range(limit * 2)]
     fetch_limits: list[int] = []
 
@@ -439,8 +443,8 @@ def test_fetch_source_facebook_single_source_not_capped(monkeypatch):
 def test_unified_search_multi_source_vehicle_query_returns_facebook_results(monkeypatch):
     monkeypatch.setattr(search_service.settings, "MARKETLY_ENABLE_FACEBOOK", True)
     monkeypatch.setattr(search_service.settings, "MARKETLY_DISABLE_FACEBOOK_MULTI_SOURCE_EXPANSION", True)
-    monkeypatch.setattr(search_service, "_cache", search_service.TTLCache())
-    monkeypatch.setattr(search_service, "_pagination_cache", search_service.TTLCache())
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    monkeypatch.setattr(search_service, "_pagination_cache", TTLCache())
 
     class FakeFacebookConnector:
         async def search(self, **kwargs):
@@ -477,7 +481,7 @@ def test_unified_search_multi_source_vehicle_query_returns_facebook_results(monk
 
 def test_unified_search_facebook_only_vehicle_query_returns_results(monkeypatch):
     monkeypatch.setattr(search_service.settings, "MARKETLY_ENABLE_FACEBOOK", True)
-    monkeypatch.setattr(search_service, "_cache", search_service.TTLCache())
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
 
     class FakeFacebookConnector:
         async def search(self, **kwargs):
@@ -740,3 +744,353 @@ def test_order_with_location_context_geocodes_canadian_text_without_fabricating_
     assert unresolved.distance_km is None
     assert unresolved.latitude is None
     assert unresolved.longitude is None
+
+
+def test_fetch_and_score_coalesces_concurrent_identical_fetches(monkeypatch):
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    calls: list[int] = []
+
+    class SlowEbayConnector:
+        async def search(self, **kwargs):
+            calls.append(kwargs["limit"])
+            await asyncio.sleep(0.02)
+            return [_listing(1, source="ebay"), _listing(2, source="ebay")]
+
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", SlowEbayConnector())
+
+    async def run_concurrently():
+        return await asyncio.gather(
+            *[
+                search_service._fetch_and_score(
+                    query="bike",
+                    sources=["ebay"],
+                    fetch_limit=24,
+                    sort="relevance",
+                )
+                for _ in range(5)
+            ]
+        )
+
+    results = asyncio.run(run_concurrently())
+
+    assert calls == [24]
+    assert all(len(scored) == 2 for scored, _, _ in results)
+    assert search_service._inflight_fetches == {}
+
+
+def test_fetch_and_score_waits_for_redis_single_flight_leader(monkeypatch):
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    monkeypatch.setattr(search_service.settings, "MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_ENABLED", True)
+
+    key = search_service._cache_key("bike", ["ebay"], 24, "relevance")
+    shared_payload = (
+        [_listing(7, source="ebay", score=3.0)],
+        {"kijiji": SourceError(code="TIMEOUT", message="kijiji source timed out.", retryable=True)},
+        {"ebay": 1},
+    )
+
+    class FakeRedis:
+        def __init__(self):
+            self.store = {
+                f"marketly:search_fetch_lock:{key}": "other-worker",
+                f"marketly:search_fetch_result:{key}": search_service._encode_fetch_payload(shared_payload),
+            }
+
+        def set(self, name, value, nx=False, px=None):
+            if nx and name in self.store:
+                return None
+            self.store[name] = value
+            return True
+
+        def get(self, name):
+            return self.store.get(name)
+
+        def exists(self, name):
+            return int(name in self.store)
+
+    class FailingConnector:
+        async def search(self, **kwargs):
+            raise AssertionError("follower should reuse the leader result")
+
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(search_service, "get_redis_client", lambda: fake_redis)
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", FailingConnector())
+
+    scored, source_errors, source_counts = asyncio.run(
+        search_service._fetch_and_score(
+            query="bike",
+            sources=["ebay"],
+            fetch_limit=24,
+            sort="relevance",
+        )
+    )
+
+    assert [item.source_listing_id for item in scored] == ["7"]
+    assert scored[0].score == 3.0
+    assert source_errors["kijiji"].code == "TIMEOUT"
+    assert source_counts == {"ebay": 1}
+    assert search_service._cache.get(key) is not None
+
+
+def test_stream_search_seeds_fetch_cache_with_merged_pool(monkeypatch):
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+
+    class EbayConnector:
+        async def search(self, **kwargs):
+            await asyncio.sleep(0.02)
+            return [_listing(1, source="ebay")]
+
+    class KijijiConnector:
+        async def search(self, **kwargs):
+            raise RuntimeError("boom")
+
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", EbayConnector())
+    monkeypatch.setitem(search_service.CONNECTORS, "kijiji", KijijiConnector())
+
+    async def collect():
+        return [
+            frame
+            async for frame in search_service.stream_search(
+                query="item",
+                sources=["ebay", "kijiji"],
+                limit=24,
+            )
+        ]
+
+    frames = asyncio.run(collect())
+
+    assert [(frame.event, frame.source) for frame in frames] == [
+        ("source", "kijiji"),
+        ("source", "ebay"),
+        ("complete", None),
+    ]
+    assert frames[0].source_error.code == "UNAVAILABLE"
+    assert [item.source_listing_id for item in frames[2].results] == ["1"]
+    assert frames[2].source_errors["kijiji"].code == "UNAVAILABLE"
+
+    cached = search_service._cache.get(search_service._cache_key("item", ["ebay", "kijiji"], 24, "relevance"))
+    assert cached is not None
+    assert [item.source_listing_id for item in cached[0]] == ["1"]
+
+
+def test_concurrent_streams_and_search_share_one_upstream_fetch(monkeypatch):
+    from app.connectors.base import MarketplaceConnector
+
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    monkeypatch.setattr(search_service, "_inflight_fetches", {})
+    monkeypatch.setattr(search_service.settings, "MARKETLY_SEARCH_SINGLE_FLIGHT_ENABLED", True)
+    monkeypatch.setattr(search_service.settings, "MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_ENABLED", False)
+    calls = {"ebay": 0, "kijiji": 0}
+
+    class CountingConnector(MarketplaceConnector):
+        def __init__(self, source: str, idx: int):
+            self.source_name = source
+            self.idx = idx
+
+        async def search(self, query, limit=20, *, sort="relevance", **kwargs):
+            calls[self.source_name] += 1
+            await asyncio.sleep(0.05)
+            return [_listing(self.idx, source=self.source_name)]
+
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", CountingConnector("ebay", 1))
+    monkeypatch.setitem(search_service.CONNECTORS, "kijiji", CountingConnector("kijiji", 2))
+
+    async def collect():
+        return [
+            frame
+            async for frame in search_service.stream_search(
+                query="item",
+                sources=["ebay", "kijiji"],
+                limit=24,
+            )
+        ]
+
+    async def run_all():
+        first = asyncio.ensure_future(collect())
+        await asyncio.sleep(0)
+        return await asyncio.gather(
+            first,
+            collect(),
+            search_service.unified_search(query="item", sources=["ebay", "kijiji"], limit=24),
+        )
+
+    leader, follower, (page, _, _, _) = asyncio.run(run_all())
+
+    assert calls == {"ebay": 1, "kijiji": 1}
+    assert [frame.event for frame in follower] == ["source", "source", "complete"]
+    for frames in (leader, follower):
+        assert {item.source_listing_id for item in frames[-1].results} == {"1", "2"}
+    assert {item.source_listing_id for item in page} == {"1", "2"}
+    assert search_service._inflight_fetches == {}
+
+
+def test_unified_search_multi_source_expansion_fetches_only_next_slice(monkeypatch):
+    from app.connectors.base import MarketplaceConnector
+
+    limit = 4
+    monkeypatch.setattr(search_service.settings, "MARKETLY_MULTI_SOURCE_MAX_EXPANSIONS", 4)
+    monkeypatch.setattr(search_service, "_pagination_cache", TTLCache())
+    monkeypatch.setattr(search_service, "_cache", TTLCache())
+    upstream_windows: list[tuple[str, int, int]] = []
+
+    class PagedConnector(MarketplaceConnector):
+        def __init__(self, source: str, start: int, size: int):
+            self.source_name = source
+            self.pool = [_listing(start + idx, source=source) for idx in range(size)]
+
+        async def search(self, query, limit=20, *, sort="relevance", **kwargs):
+            upstream_windows.append((self.source_name, 0, limit))
+            return self.pool[:limit]
+
+        async def search_page(self, query, limit=20, *, sort="relevance", cursor=None, **kwargs):
+            offset = int(cursor or 0)
+            upstream_windows.append((self.source_name, offset, limit))
+            page = self.pool[offset : offset + limit]
+            return page, (offset + limit if offset + limit < len(self.pool) else None)
+
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", PagedConnector("ebay", 0, 10))
+    monkeypatch.setitem(search_service.CONNECTORS, "kijiji", PagedConnector("kijiji", 100, 6))
+
+    pages = []
+    for offset in (0, 4, 8, 12):
+        page, total, next_offset, _ = asyncio.run(
+            search_service.unified_search(
+                query="item",
+                sources=["ebay", "kijiji"],
+                limit=limit,
+                offset=offset,
+                sort="newest",
+            )
+        )
+        pages.append((page, total, next_offset))
+
+    assert upstream_windows == [
+        ("ebay", 0, 4),
+        ("kijiji", 0, 4),
+        ("ebay", 4, 4),
+        ("kijiji", 4, 4),
+        ("ebay", 8, 4),
+    ]
+    seen_ids = [item.source_listing_id for page, _, _ in pages for item in page]
+    assert len(seen_ids) == 16
+    assert len(set(seen_ids)) == 16
+    assert pages[-1][1] == 16
+    assert pages[-1][2] is None
+
+
+def test_pagination_state_survives_worker_hop_with_redis_cache(monkeypatch):
+    from app.core import redis_client
+
+    class FakeRedis:
+        def __init__(self):
+            self.values: dict[str, str] = {}
+
+        def get(self, key):
+            return self.values.get(key)
+
+        def setex(self, key, ttl_seconds, payload):
+            self.values[key] = payload
+
+        def delete(self, key):
+            self.values.pop(key, None)
+
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis_client", lambda: fake_redis)
+    monkeypatch.setattr(search_service.settings, "MARKETLY_MULTI_SOURCE_MAX_EXPANSIONS", 4)
+    monkeypatch.setattr(search_service, "_sort_results", lambda items, sort: items)
+
+    def new_worker_cache():
+        return search_service.build_cache(
+            "redis",
+            prefix="marketly:search_pagination:",
+            max_items=8,
+            encode=search_service._encode_pagination_state,
+            decode=search_service._decode_pagination_state,
+        )
+
+    fetch_calls: list[int] = []
+
+    async def fake_fetch_and_score(query, sources, fetch_limit, sort, **kwargs):
+        fetch_calls.append(fetch_limit)
+        pool = [_listing(idx) for idx in range(8)] + [_listing(100 + idx, source="kijiji") for idx in range(8)]
+        return pool, {"facebook": SourceError(code="DISABLED", message="off")}, {"ebay": 8, "kijiji": 8}
+
+    monkeypatch.setattr(search_service, "_fetch_and_score", fake_fetch_and_score)
+
+    monkeypatch.setattr(search_service, "_pagination_cache", new_worker_cache())
+    asyncio.run(
+        search_service.unified_search(query="item", sources=["ebay", "kijiji"], limit=4, offset=0)
+    )
+
+    monkeypatch.setattr(search_service, "_pagination_cache", new_worker_cache())
+    page, _, next_offset, source_errors = asyncio.run(
+        search_service.unified_search(query="item", sources=["ebay", "kijiji"], limit=4, offset=4)
+    )
+
+    assert fetch_calls == [4]
+    assert [item.source_listing_id for item in page] == ["2", "102", "3", "103"]
+    assert next_offset == 8
+    assert source_errors["facebook"].code == "DISABLED"
+
+
+def test_fetch_and_score_leader_releases_only_its_own_lock_atomically(monkeypatch):
+    monkeypatch.setattr(search_service.settings, "MARKETLY_SEARCH_SINGLE_FLIGHT_REDIS_ENABLED", True)
+
+    key = search_service._cache_key("bike", ["ebay"], 24, "relevance")
+    lock_key = f"marketly:search_fetch_lock:{key}"
+
+    class FakeRedis:
+        def __init__(self):
+            self.store: dict[str, str] = {}
+
+        def set(self, name, value, nx=False, px=None):
+            if nx and name in self.store:
+                return None
+            self.store[name] = value
+            return True
+
+        def setex(self, name, ttl_seconds, value):
+            self.store[name] = value
+
+        def get(self, name):
+            return self.store.get(name)
+
+        def delete(self, name):
+            raise AssertionError("a separate GET and DEL can drop another worker's lock")
+
+        def eval(self, script, numkeys, name, token):
+            if self.store.get(name) == token:
+                del self.store[name]
+                return 1
+            return 0
+
+    fake_redis = FakeRedis()
+    take_over = {"enabled": False}
+
+    class Connector:
+        async def search(self, **kwargs):
+            if take_over["enabled"]:
+                # The leader's lock expires mid-fetch and another worker takes it.
+                fake_redis.store[lock_key] = "other-worker"
+            return []
+
+    monkeypatch.setattr(search_service, "get_redis_client", lambda: fake_redis)
+    monkeypatch.setitem(search_service.CONNECTORS, "ebay", Connector())
+
+    def run_fetch():
+        monkeypatch.setattr(search_service, "_cache", TTLCache())
+        asyncio.run(
+            search_service._fetch_and_score(
+                query="bike",
+                sources=["ebay"],
+                fetch_limit=24,
+                sort="relevance",
+            )
+        )
+
+    run_fetch()
+    assert lock_key not in fake_redis.store
+
+    take_over["enabled"] = True
+    run_fetch()
+    assert fake_redis.store[lock_key] == "other-worker"
@@ -0,0 +1,108 @@
+import asyncio
+
+from app.models.listing import Listing, Money
+from app.services.listing_snapshots import SnapshotBatch
+from app.services.snapshot_buffer import SnapshotBuffer
+
+
+def _batch(query: str, count: int) -> SnapshotBatch:
+    listings = [
+        Listing(
+            source="kijiji",
+            source_listing_id=f"{query}-{index}",
+            title=f"{query} {index}",
+            price=Money(amount=100 + index, currency="CAD"),
+            url=f"https://example.com/{query}-{index}",
+            image_urls=[],
+            location="Ottawa",
+            condition="used",
+            snippet=None,
+            score=5.0,
+        )
+        for index in range(count)
+    ]
+    return SnapshotBatch(query=query, listings=listings)
+
+
+class _RecordingWriter:
+    def __init__(self) -> None:
+        self.calls: list[list[SnapshotBatch]] = []
+
+    def __call__(self, batches: list[SnapshotBatch]) -> int:
+        self.calls.append(list(batches))
+        return sum(len(batch.listings) for batch in batches)
+
+
+def test_snapshot_buffer_flushes_when_batch_size_is_reached():
+    writer = _RecordingWriter()
+    buffer = SnapshotBuffer(max_pending_rows=100, batch_rows=4, flush_interval_seconds=60, writer=writer)
+
+    async def scenario() -> None:
+        buffer.start()
+        assert buffer.offer(_batch("desk", 2))
+        assert buffer.offer(_batch("chair", 2))
+        for _ in range(50):
+            if writer.calls:
+                break
+            await asyncio.sleep(0.01)
+        assert [[batch.query for batch in call] for call in writer.calls] == [["desk", "chair"]]
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert buffer.stats()["flushed_rows"] == 4
+    assert buffer.stats()["flushes"] == 1
+
+
+def test_snapshot_buffer_flushes_partial_batches_on_interval():
+    writer = _RecordingWriter()
+    buffer = SnapshotBuffer(max_pending_rows=100, batch_rows=50, flush_interval_seconds=0.05, writer=writer)
+
+    async def scenario() -> None:
+        buffer.start()
+        buffer.offer(_batch("desk", 3))
+        await asyncio.sleep(0.2)
+        assert len(writer.calls) == 1
+        assert buffer.pending_rows() == 0
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_buffer_drops_rows_when_full_and_flushes_on_stop():
+    writer = _RecordingWriter()
+    buffer = SnapshotBuffer(max_pending_rows=5, batch_rows=2, flush_interval_seconds=60, writer=writer)
+
+    async def scenario() -> None:
+        buffer.start()
+        # Nothing yields to the flusher between offers, so the queue fills up.
+        assert buffer.offer(_batch("desk", 3))
+        assert buffer.offer(_batch("chair", 2))
+        assert buffer.offer(_batch("lamp", 4))
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    stats = buffer.stats()
+    assert stats["dropped_rows"] == 4
+    assert stats["flushed_rows"] == 5
+    assert stats["pending_rows"] == 0
+    assert [[batch.query for batch in call] for call in writer.calls] == [["desk"], ["chair"]]
+
+
+def test_snapshot_buffer_rejects_offers_when_not_running_and_counts_failed_writes():
+    buffer = SnapshotBuffer(max_pending_rows=10, batch_rows=10, flush_interval_seconds=60)
+    assert buffer.offer(_batch("desk", 1)) is False
+
+    def failing_writer(_batches: list[SnapshotBatch]) -> int:
+        raise RuntimeError("database unavailable")
+
+    failing = SnapshotBuffer(max_pending_rows=10, batch_rows=10, flush_interval_seconds=60, writer=failing_writer)
+
+    async def scenario() -> None:
+        failing.start()
+        failing.offer(_batch("desk", 2))
+        await failing.stop()
+        assert failing.offer(_batch("chair", 1)) is False
+
+    asyncio.run(scenario())
+    assert failing.stats()["failed_rows"] == 2
+    assert failing.stats()["flushed_rows"] == 0
@@ -0,0 +1,94 @@
+import gzip
+import json
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models.listing import Listing, Money
+from app.models.listing_snapshot import ListingSnapshot
+from app.models.listing_snapshot_token import ListingSnapshotToken
+from app.services.listing_snapshots import persist_listing_snapshots
+from app.services.snapshot_partitions import (
+    add_months,
+    archive_expired_snapshots,
+    partition_month,
+    partition_name,
+    snapshot_retained_since,
+)
+
+from .utils import build_test_session_factory
+
+
+def _listing(source_listing_id: str, price_amount: float) -> Listing:
+    return Listing(
+        source="kijiji",
+        source_listing_id=source_listing_id,
+        title=f"Road bike {source_listing_id}",
+        price=Money(amount=price_amount, currency="CAD"),
+        url=f"https://example.com/{source_listing_id}",
+        image_urls=[],
+        location="Ottawa",
+        condition="used",
+        snippet=None,
+        score=5.0,
+    )
+
+
+def test_partition_helpers_round_trip_months_and_keep_the_valuation_lookback(monkeypatch):
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name(date(2026, 5, 1)) == "listing_snapshots_p2026_05"
+    assert partition_month("listing_snapshots_p2026_05") == date(2026, 5, 1)
+    assert partition_month("listing_snapshots_default") is None
+
+    now = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+    monkeypatch.setattr(settings, "MARKETLY_VALUATION_LOOKBACK_DAYS", 120)
+    monkeypatch.setattr(settings, "MARKETLY_SNAPSHOT_RETENTION_DAYS", 30)
+    # Retention shorter than the lookback is raised to it, then rounded down to a month start.
+    assert snapshot_retained_since(now) == datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def test_archive_expired_snapshots_writes_month_files_and_deletes_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "MARKETLY_VALUATION_LOOKBACK_DAYS", 30)
+    monkeypatch.setattr(settings, "MARKETLY_SNAPSHOT_RETENTION_DAYS", 30)
+    engine, session_factory = build_test_session_factory()
+    db = session_factory()
+    now = datetime.now(timezone.utc)
+
+    old_observed_at = datetime.combine(
+        add_months(snapshot_retained_since(now).date(), -2),
+        datetime.min.time(),
+        tzinfo=timezone.utc,
+    ) + timedelta(days=3)
+    persist_listing_snapshots(
+        query="road bike",
+        listings=[_listing("old-1", 400), _listing("old-2", 550)],
+        observed_at=old_observed_at,
+        db=db,
+    )
+    persist_listing_snapshots(
+        query="road bike",
+        listings=[_listing("recent-1", 600)],
+        observed_at=now,
+        db=db,
+    )
+    db.commit()
+
+    results = archive_expired_snapshots(db, archive_dir=tmp_path, now=now)
+    db.commit()
+
+    assert len(results) == 1
+    assert results[0]["month"] == old_observed_at.strftime("%Y-%m")
+    assert results[0]["archived_rows"] == 2
+    assert results[0]["deleted_rows"] == 2
+    assert results[0]["dropped_partition"] is False
+
+    with gzip.open(results[0]["archive_path"], "rt", encoding="utf-8") as handle:
+        archived = [json.loads(line) for line in handle]
+    assert sorted(row["source_listing_id"] for row in archived) == ["old-1", "old-2"]
+
+    remaining = db.query(ListingSnapshot).all()
+    assert [row.source_listing_id for row in remaining] == ["recent-1"]
+    assert {row.snapshot_id for row in db.query(ListingSnapshotToken).all()} == {remaining[0].id}
+
+    db.close()
+    engine.dispose()
@@ -1,4 +1,8 @@
-from app.core.cache import TTLCache
+import json
+
+import pytest
+
+from app.core.cache import TTLCache, build_cache
 
 
 def test_ttl_cache_expires_entries(monkeypatch):
@@ -29,3 +33,124 @@ def test_ttl_cache_max_items_uses_lru_eviction(monkeypatch):
     assert cache.get("b") is None
     assert cache.get("a") == 1
     assert cache.get("c") == 3
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    def get(self, key: str):
+        return self.values.get(key)
+
+    def setex(self, key: str, ttl_seconds: int, payload: str):
+        self.values[key] = payload
+        return True
+
+    def ttl(self, key: str):
+        return 30 if key in self.values else -2
+
+    def delete(self, key: str):
+        self.values.pop(key, None)
+
+
+def test_shared_cache_is_visible_across_instances_and_falls_back_locally(monkeypatch):
+    import json
+
+    from app.core import redis_client
+    from app.core.cache import build_cache
+
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis_client", lambda: fake_redis)
+
+    def make(backend: str):
+        return build_cache(backend, prefix="test:", max_items=4, encode=json.dumps, decode=json.loads)
+
+    worker_a = make("redis")
+    worker_b = make("tiered")
+    worker_a.set("key", {"page": 1}, ttl_seconds=30)
+
+    assert fake_redis.values == {"test:key": '{"page": 1}'}
+    assert worker_b.get("key") == {"page": 1}
+
+    # The tiered cache keeps serving its local copy once Redis goes away.
+    monkeypatch.setattr(redis_client, "get_redis_client", lambda: None)
+    assert worker_b.get("key") == {"page": 1}
+    assert worker_a.get("key") is None
+
+    worker_a.set("offline", {"page": 2}, ttl_seconds=30)
+    assert worker_a.get("offline") == {"page": 2}
+    assert isinstance(make("local"), TTLCache)
+
+
+def test_ttl_cache_sweeps_expired_entries_from_heap_and_tracks_stats(monkeypatch):
+    now = {"value": 100.0}
+    monkeypatch.setattr("app.core.cache.time.time", lambda: now["value"])
+
+    cache = TTLCache(max_items=100)
+    for idx in range(10):
+        cache.set(f"short-{idx}", idx, ttl_seconds=5)
+    cache.set("long", "kept", ttl_seconds=60)
+    cache.set("short-0", "overwritten", ttl_seconds=60)
+
+    assert cache.get("short-1") == 1
+    assert cache.get("missing") is None
+
+    now["value"] = 106.0
+    cache.set("fresh", "new", ttl_seconds=5)
+
+    assert len(cache) == 3
+    assert cache.get("short-0") == "overwritten"
+    assert cache.get("long") == "kept"
+    stats = cache.stats()
+    assert stats["expirations"] == 9
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("long") is None
+
+
+def test_ttl_cache_max_bytes_evicts_least_recently_used(monkeypatch):
+    now = {"value": 100.0}
+    monkeypatch.setattr("app.core.cache.time.time", lambda: now["value"])
+
+    cache = TTLCache(max_bytes=10, size_of=len)
+    cache.set("a", "aaaa", ttl_seconds=30)
+    cache.set("b", "bbbb", ttl_seconds=30)
+    assert cache.get("a") == "aaaa"
+
+    cache.set("c", "cccc", ttl_seconds=30)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_max_bytes_requires_a_size_measure():
+    with pytest.raises(ValueError):
+        TTLCache(max_bytes=10)
+
+
+def test_build_cache_byte_cap_measures_encoded_payload():
+    cache = build_cache(
+        "local",
+        prefix="test:",
+        max_items=None,
+        encode=json.dumps,
+        decode=json.loads,
+        max_bytes=150,
+    )
+    small = {"items": ["a"]}
+    large = {"items": ["x" * 40 for _ in range(3)]}
+
+    cache.set("small", small, ttl_seconds=30)
+    assert cache.stats()["bytes"] == len(json.dumps(small))
+
+    # Together the encoded payloads pass the cap, so the older entry is evicted.
+    cache.set("large", large, ttl_seconds=30)
+    assert cache.get("small") is None
+    assert cache.get("large") == large
+    assert cache.stats()["bytes"] == len(json.dumps(large))
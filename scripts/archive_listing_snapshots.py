@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.snapshot_partitions import (  # noqa: E402
+    archive_expired_snapshots,
+    ensure_snapshot_partitions,
+    snapshot_retention_days,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Create upcoming listing snapshot partitions and archive months past the retention window."
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default=settings.MARKETLY_SNAPSHOT_ARCHIVE_DIR,
+        help="Directory for the gzipped JSONL month archives.",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Drop expired months without writing archive files.",
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=settings.MARKETLY_SNAPSHOT_PARTITION_MONTHS_AHEAD,
+        help="Monthly partitions to keep created ahead of the current month.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    db = SessionLocal()
+    try:
+        created = ensure_snapshot_partitions(db, months_ahead=args.months_ahead)
+        db.commit()
+        archived = archive_expired_snapshots(db, archive_dir=args.archive_dir, archive=not args.no_archive)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(
+        json.dumps(
+            {
+                "retention_days": snapshot_retention_days(),
+                "partitions_created": created,
+                "months_archived": archived,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
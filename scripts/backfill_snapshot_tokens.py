@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.db import SessionLocal  # noqa: E402
+from app.services.listing_snapshots import (  # noqa: E402
+    DEFAULT_TOKEN_BACKFILL_BATCH_SIZE,
+    backfill_listing_snapshot_tokens,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Index query tokens for listing snapshots written before the token table.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_TOKEN_BACKFILL_BATCH_SIZE,
+        help="Snapshots indexed per flush.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    db = SessionLocal()
+    try:
+        processed = backfill_listing_snapshot_tokens(db, batch_size=args.batch_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(json.dumps({"snapshots_indexed": processed}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.valuation_rollups import DEFAULT_REBUILD_BATCH_SIZE, rebuild_valuation_rollups  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild Marketly valuation rollups from listing snapshots.")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=int(settings.MARKETLY_VALUATION_LOOKBACK_DAYS),
+        help="Rebuild this many trailing days. Use 0 to rebuild all history.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_REBUILD_BATCH_SIZE,
+        help="Snapshots folded into rollups per flush.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    since = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days > 0 else None
+    db = SessionLocal()
+    try:
+        processed = rebuild_valuation_rollups(db, since=since, batch_size=args.batch_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(json.dumps({"snapshots_processed": processed, "since": since.isoformat() if since else None}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.connectors.kijiji_scrape import extract_kijiji_candidates  # noqa: E402
+
+DEFAULT_FIXTURE_DIR = BACKEND_ROOT / "tests" / "fixtures" / "kijiji"
+PARSERS = ("bs4", "selectolax")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare Kijiji HTML parser backends on saved pages.")
+    parser.add_argument(
+        "pages",
+        nargs="*",
+        type=Path,
+        help="HTML pages to parse. Defaults to the saved test fixtures.",
+    )
+    parser.add_argument("--query", default="road bike", help="Query used for token scoring.")
+    parser.add_argument("--rounds", type=int, default=50, help="Timed parses per page and parser.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    pages = args.pages or sorted(DEFAULT_FIXTURE_DIR.glob("*.html"))
+    if not pages:
+        print(f"no HTML pages found in {DEFAULT_FIXTURE_DIR}")
+        return 1
+
+    rounds = max(1, args.rounds)
+    mismatches = 0
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        reference = extract_kijiji_candidates(html, query=args.query, parser="bs4")
+        print(f"{page.name}: {len(html) / 1024:.1f} KiB, {len(reference)} candidates")
+
+        timings: dict[str, float] = {}
+        for parser_name in PARSERS:
+            candidates = extract_kijiji_candidates(html, query=args.query, parser=parser_name)
+            if candidates != reference:
+                mismatches += 1
+                print(f"  {parser_name}: output differs from bs4")
+
+            samples = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                extract_kijiji_candidates(html, query=args.query, parser=parser_name)
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[parser_name] = statistics.median(samples)
+            print(
+                f"  {parser_name:<10} median={timings[parser_name]:.2f}ms "
+                f"p95={sorted(samples)[int(len(samples) * 0.95) - 1]:.2f}ms"
+            )
+
+        if timings["selectolax"] > 0:
+            print(f"  speedup={timings['bs4'] / timings['selectolax']:.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.core.config import settings  # noqa: E402
+from app.services.listing_insights import (  # noqa: E402
+    DEFAULT_VALUATION_FALLBACK_MIN_SAMPLES,
+    _compute_valuation_stats,
+    compute_valuation_stats_batch,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare per-listing and batched valuation statistics.")
+    parser.add_argument("--listings", type=int, default=50, help="Listings per synthetic page.")
+    parser.add_argument("--samples", type=int, default=400, help="Sample prices per listing and tier.")
+    parser.add_argument("--tiers", type=int, default=3, help="Candidate tiers computed per listing.")
+    parser.add_argument("--rounds", type=int, default=30, help="Timed runs per engine.")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def build_page(*, listings: int, samples: int, tiers: int, seed: int) -> list[list[float]]:
+    rng = random.Random(seed)
+    groups: list[list[float]] = []
+    for _ in range(listings * tiers):
+        center = rng.uniform(50, 2500)
+        size = rng.randint(0, samples)
+        groups.append([round(max(0.0, rng.gauss(center, center * 0.2)), 2) for _ in range(size)])
+    return groups
+
+
+def time_engine(run, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> int:
+    args = parse_args()
+    groups = build_page(listings=args.listings, samples=args.samples, tiers=args.tiers, seed=args.seed)
+    min_samples = DEFAULT_VALUATION_FALLBACK_MIN_SAMPLES
+
+    def per_listing():
+        return [_compute_valuation_stats(prices, min_samples=min_samples) for prices in groups]
+
+    def batched():
+        return compute_valuation_stats_batch(groups, min_samples=min_samples)
+
+    settings.MARKETLY_VALUATION_VECTORIZED_STATS = True
+    reference = per_listing()
+    vectorized = batched()
+    if vectorized != reference:
+        print("batched stats differ from per-listing stats")
+        return 1
+
+    print(f"{len(groups)} groups, {sum(len(prices) for prices in groups)} prices")
+    timings = {}
+    for name, run in (("per_listing", per_listing), ("batched", batched)):
+        samples = time_engine(run, max(1, args.rounds))
+        timings[name] = statistics.median(samples)
+        print(f"  {name:<12} median={timings[name]:.2f}ms min={min(samples):.2f}ms")
+    if timings["batched"] > 0:
+        print(f"  speedup={timings['per_listing'] / timings['batched']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
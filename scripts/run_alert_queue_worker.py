@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.services.alert_queue import alert_queue_counts, run_alert_queue_worker  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a Marketly saved-search alert queue worker.")
+    parser.add_argument(
+        "--worker-id",
+        type=str,
+        default=f"{socket.gethostname()}:{os.getpid()}",
+        help="Name recorded on leased checks (defaults to host:pid).",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=int(settings.MARKETLY_ALERTS_SEARCH_LIMIT),
+        help="How many listings to evaluate per saved search.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Checks leased per batch (defaults to MARKETLY_ALERTS_QUEUE_BATCH_SIZE).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Saved searches checked at once (defaults to MARKETLY_ALERTS_JOB_CONCURRENCY).",
+    )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Exit once no checks are due instead of polling for more.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = asyncio.run(
+        run_alert_queue_worker(
+            SessionLocal,
+            worker_id=args.worker_id,
+            limit_per_search=max(1, args.limit),
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            drain=args.drain,
+        )
+    )
+
+    db = SessionLocal()
+    try:
+        queue = alert_queue_counts(db)
+    finally:
+        db.close()
+    print(json.dumps({"worker_id": args.worker_id, **result, "queue": queue}))
+
+
+if __name__ == "__main__":
+    main()
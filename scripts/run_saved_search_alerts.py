@@ -14,6 +14,7 @@ if str(BACKEND_ROOT) not in sys.path:
 
 from app.core.config import settings  # noqa: E402
 from app.db import SessionLocal  # noqa: E402
+from app.services.alert_queue import enqueue_alert_checks  # noqa: E402
 from app.services.alerts import run_saved_search_alert_job  # noqa: E402
 
 
@@ -37,6 +38,23 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional saved search id for targeted runs.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Saved searches checked at once (defaults to MARKETLY_ALERTS_JOB_CONCURRENCY).",
+    )
+    parser.add_argument(
+        "--all",
+        dest="all_searches",
+        action="store_true",
+        help="Check every active saved search, not only those whose next check is due.",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Queue the checks for run_alert_queue_worker.py instead of running them here.",
+    )
     return parser.parse_args()
 
 
@@ -44,12 +62,24 @@ def main() -> None:
     args = parse_args()
     db = SessionLocal()
     try:
+        if args.enqueue:
+            enqueued = enqueue_alert_checks(
+                db,
+                user_id=args.user_id,
+                saved_search_id=args.saved_search_id,
+                due_only=not args.all_searches,
+            )
+            print(json.dumps({"enqueued": enqueued}))
+            return
         result = asyncio.run(
             run_saved_search_alert_job(
                 db,
                 limit_per_search=max(1, args.limit),
                 user_id=args.user_id,
                 saved_search_id=args.saved_search_id,
+                concurrency=args.concurrency,
+                session_factory=SessionLocal,
+                due_only=not args.all_searches,
             )
         )
     finally: